@@ -0,0 +1,50 @@
+"""
+This test will write values with CDisk and the plain Disk, then reopen the
+cache with CodecDisk and check that old and new rows read back side by side
+"""
+
+import tempfile
+
+from lazy.io.cachez import Cache, CDisk, CodecDisk, Disk
+from lazy.utils import get_logger
+
+logger = get_logger('lazytest')
+
+values = {
+    'small': {'a': 1, 'b': [1, 2, 3]},
+    'large': {'rows': [{'id': i, 'name': f'name-{i}'} for i in range(5000)]},
+    'text': 'x' * 100000,
+    'binary': b'y' * 100000,
+    'number': 42,
+}
+
+
+def check_disk(disk):
+    directory = tempfile.mkdtemp(prefix = 'cachez-codec-')
+    cache = Cache(directory, disk = disk)
+    for key, value in values.items():
+        cache.set(key, value)
+    cache.set(('tuple', 'key'), 'legacy key')
+    cache.close()
+
+    cache = Cache(directory, disk = CodecDisk)
+    for key, value in values.items():
+        assert cache.get(key) == value, f'[{disk.__name__}] {key} did not read back through CodecDisk'
+    assert ('tuple', 'key') in set(cache.iterkeys())
+    cache.set('codec', {'new': True})
+    assert cache.get('codec') == {'new': True}
+    assert cache.get('small') == values['small']
+    logger(f'[{disk.__name__}] Read {len(cache)} Items through CodecDisk')
+
+
+def test_cdisk_rows():
+    check_disk(CDisk)
+
+
+def test_disk_rows():
+    check_disk(Disk)
+
+
+if __name__ == '__main__':
+    test_cdisk_rows()
+    test_disk_rows()
@@ -0,0 +1,48 @@
+"""
+This test will save cachez snapshots, compressed and with incremental deltas,
+and check that load / async_load restore every item
+"""
+
+import asyncio
+import tempfile
+
+from lazy.io.cachez import Cache
+from lazy.utils import get_logger
+
+logger = get_logger('lazytest')
+num_items = 100
+
+
+def make_snapshot(compressed: bool = True):
+    cache = Cache(tempfile.mkdtemp(prefix = 'cachez-src-'), track_changes = True)
+    for i in range(num_items):
+        cache.set(i, f'value-{i}')
+    out = tempfile.mkdtemp(prefix = 'cachez-out-')
+    path = cache.save(out, compressed = compressed)
+    cache.set('after_base', 'delta')
+    cache.save(out, compressed = compressed, incremental = True)
+    return path.string
+
+
+def check_loaded(cache: Cache, name: str):
+    assert len(cache) == num_items + 1, f'[{name}] loaded {len(cache)} items, expected {num_items + 1}'
+    assert cache.get(0) == 'value-0'
+    assert cache.get('after_base') == 'delta'
+    logger(f'[{name}] Loaded {len(cache)} Items from {cache.filepath.string}')
+
+
+def test_load(compressed: bool = True):
+    path = make_snapshot(compressed)
+    check_loaded(Cache.load(path, tempfile.mkdtemp(prefix = 'cachez-dst-')), f'load compressed={compressed}')
+
+
+def test_async_load(compressed: bool = True):
+    path = make_snapshot(compressed)
+    cache = asyncio.run(Cache.async_load(path, tempfile.mkdtemp(prefix = 'cachez-dst-')))
+    check_loaded(cache, f'async_load compressed={compressed}')
+
+
+if __name__ == '__main__':
+    for compressed in (True, False):
+        test_load(compressed)
+        test_async_load(compressed)
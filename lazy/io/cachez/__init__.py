@@ -9,4 +9,6 @@ from .base import (
     UnknownFileWarning,
 )
 from ._json import OrJSONDisk, JSONDisk
-from .persistent import Index, Deque
\ No newline at end of file
+from ._codec import CodecDisk, Serializer, Compressor, register_serializer, register_compressor
+from .persistent import Index, Deque
+from .db import CacheDB
\ No newline at end of file
@@ -0,0 +1,368 @@
+"""
+Codec registry Disk for Cachez.
+
+Values are serialized and compressed by codecs looked up in a registry.
+Each stored value is prefixed with the ids of the serializer and compressor
+that produced it, so rows written with other codec settings, and rows written
+by the plain `Disk` or the zlib `CDisk`, stay readable side by side.
+"""
+
+import sqlite3
+import functools as ft
+import os.path as op
+from typing import Any, Dict, Iterable, Type
+
+from lazy.libz import Lib
+
+from . import base as _base
+from .static import *
+from .base import Disk
+from .config import CachezConfigz
+
+__all__ = (
+    'Serializer',
+    'Compressor',
+    'CodecDisk',
+    'register_serializer',
+    'register_compressor',
+)
+
+_HEADER_SIZE = 2
+
+
+def _legacy_decompress(data) -> bytes:
+    """Decompress zlib pickles written by `CDisk`, others are returned as is.
+    Pickles start with the PROTO opcode (0x80) or, before protocol 2, another
+    opcode, never with the 0x78 first byte of a zlib stream.
+    """
+    if len(data) > 1 and data[0] == 0x78 and ((data[0] << 8) | data[1]) % 31 == 0:
+        return _base._zlib.decompress(data)
+    return data
+
+_serializers: Dict[Any, Type['Serializer']] = {}
+_compressors: Dict[Any, Type['Compressor']] = {}
+
+
+def register_serializer(cls: Type['Serializer']) -> Type['Serializer']:
+    """Register a serializer class by its `name` and `codec_id`.
+    Ids are written with every value so they must never be reused.
+    """
+    if _serializers.get(cls.codec_id, cls) is not cls:
+        raise ValueError(f'serializer id {cls.codec_id} already registered')
+    _serializers[cls.name] = _serializers[cls.codec_id] = cls
+    return cls
+
+
+def register_compressor(cls: Type['Compressor']) -> Type['Compressor']:
+    """Register a compressor class by its `name` and `codec_id`.
+    Ids are written with every value so they must never be reused.
+    """
+    if _compressors.get(cls.codec_id, cls) is not cls:
+        raise ValueError(f'compressor id {cls.codec_id} already registered')
+    _compressors[cls.name] = _compressors[cls.codec_id] = cls
+    return cls
+
+
+class Serializer:
+    "Converts values to bytes and back."
+
+    name: str = None
+    codec_id: int = None
+
+    def __init__(self, disk: 'CodecDisk'):
+        self.disk = disk
+
+    def dumps(self, value) -> bytes:
+        """Serialize `value`.
+        :raises TypeError: if `value` is not supported, the pickle serializer
+            is used instead
+        """
+        raise NotImplementedError
+
+    def loads(self, data: bytes):
+        raise NotImplementedError
+
+
+class Compressor:
+    "Compresses serialized values."
+
+    name: str = None
+    codec_id: int = None
+
+    def __init__(self, disk: 'CodecDisk'):
+        self.disk = disk
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+@register_serializer
+class PickleSerializer(Serializer):
+    name = 'pickle'
+    codec_id = 0
+
+    def dumps(self, value) -> bytes:
+        return _base.pkl.dumps(value, protocol=self.disk.pickle_protocol)
+
+    def loads(self, data: bytes):
+        return _base.pkl.loads(data)
+
+
+@register_serializer
+class MsgpackSerializer(Serializer):
+    """msgpack serialization.
+    Uses strict types so tuples, subclasses and other values msgpack would
+    not round trip exactly raise TypeError and fall back to pickle.
+    """
+    name = 'msgpack'
+    codec_id = 1
+
+    def __init__(self, disk: 'CodecDisk'):
+        super().__init__(disk)
+        self._msgpack = Lib.import_lib('msgpack')
+        self._packer = ft.partial(self._msgpack.packb, use_bin_type=True, strict_types=True)
+        self._unpacker = ft.partial(self._msgpack.unpackb, raw=False, strict_map_key=False)
+
+    def dumps(self, value) -> bytes:
+        try:
+            return self._packer(value)
+        except OverflowError as error:
+            raise TypeError(str(error)) from error
+
+    def loads(self, data: bytes):
+        return self._unpacker(data)
+
+
+@register_compressor
+class ZlibCompressor(Compressor):
+    "zlib, or isal when available."
+    name = 'zlib'
+    codec_id = 1
+
+    def compress(self, data: bytes) -> bytes:
+        level = self.disk.compress_level
+        if level is None: return _base._zlib.compress(data)
+        return _base._zlib.compress(data, level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return _base._zlib.decompress(data)
+
+
+@register_compressor
+class ZstdCompressor(Compressor):
+    name = 'zstd'
+    codec_id = 2
+
+    def __init__(self, disk: 'CodecDisk'):
+        super().__init__(disk)
+        self._zstd = Lib.import_lib('zstandard')
+        level = 3 if disk.compress_level is None else disk.compress_level
+        self._compressor = self._zstd.ZstdCompressor(level=level, **self._options())
+        self._decompressor = self._zstd.ZstdDecompressor(**self._options())
+
+    def _options(self) -> Dict[str, Any]:
+        return {}
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+@register_compressor
+class ZstdDictCompressor(ZstdCompressor):
+    "zstd with the trained dictionary of the disk, see `CodecDisk.train_dictionary`."
+    name = 'zstd_dict'
+    codec_id = 4
+
+    def _options(self) -> Dict[str, Any]:
+        if not self.disk.zstd_dict:
+            raise ValueError('zstd_dict compressor requires a dictionary')
+        return {'dict_data': self._zstd.ZstdCompressionDict(bytes(self.disk.zstd_dict))}
+
+
+@register_compressor
+class LZ4Compressor(Compressor):
+    name = 'lz4'
+    codec_id = 3
+
+    def __init__(self, disk: 'CodecDisk'):
+        super().__init__(disk)
+        self._lz4 = Lib.import_module('lz4.frame', 'lz4')
+
+    def compress(self, data: bytes) -> bytes:
+        level = self.disk.compress_level or 0
+        return self._lz4.compress(data, compression_level=level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._lz4.decompress(data)
+
+
+class CodecDisk(Disk):
+    "Cache key and value using registered serializer and compressor codecs."
+
+    def __init__(self, directory: str = None, serializer: str = None, compressor: str = None, compress_level: int = None, compress_threshold: int = None, zstd_dict: bytes = None, **config):
+        """Initialize codec disk instance.
+        Keys, and int, float, str and bytes values, are stored as with
+        `Disk`. Other values are serialized with `serializer` and compressed
+        with `compressor` when the serialized size is at least
+        `compress_threshold` and compression makes it smaller. When
+        `zstd_dict` is given, the zstd compressor uses the dictionary.
+        :param str directory: directory path
+        :param str serializer: serializer name (default CachezConfigz.codec_serializer)
+        :param str compressor: compressor name or 'none' (default CachezConfigz.codec_compressor)
+        :param int compress_level: compressor specific level (default None)
+        :param int compress_threshold: minimum serialized size to compress (default CachezConfigz.codec_threshold)
+        :param bytes zstd_dict: trained zstd dictionary (default None)
+        :param kwargs: super class arguments
+        """
+        super().__init__(directory, **config)
+        self._codecs: Dict[Any, Any] = {}
+        self.serializer = serializer or CachezConfigz.codec_serializer
+        self.compressor = compressor or CachezConfigz.codec_compressor
+        self.compress_level = compress_level
+        self.compress_threshold = CachezConfigz.codec_threshold if compress_threshold is None else compress_threshold
+        self.zstd_dict = zstd_dict
+
+    def __setattr__(self, name, value):
+        # Settings updated through `Cache.reset` rebuild the codecs.
+        if name in {'serializer', 'compressor', 'compress_level', 'zstd_dict'}:
+            self.__dict__['_codecs'] = {}
+        super().__setattr__(name, value)
+
+    def _get_codec(self, registry: Dict[Any, type], name):
+        try:
+            cls = registry[name]
+        except KeyError:
+            raise ValueError(f'unknown codec: {name!r}') from None
+        codec = self._codecs.get(cls)
+        if codec is None:
+            codec = self._codecs[cls] = cls(self)
+        return codec
+
+    def _compressor_name(self):
+        if self.compressor in (None, 'none'): return None
+        if self.compressor == 'zstd' and self.zstd_dict: return 'zstd_dict'
+        return self.compressor
+
+    def encode(self, value) -> bytes:
+        """Serialize and compress `value` prefixed with the codec ids.
+        :param value: value to encode
+        :return: encoded bytes
+        """
+        serializer = self._get_codec(_serializers, self.serializer)
+        try:
+            data = serializer.dumps(value)
+        except TypeError:
+            serializer = self._get_codec(_serializers, PickleSerializer.name)
+            data = serializer.dumps(value)
+
+        compressor_id = 0
+        name = self._compressor_name()
+        if name is not None and len(data) >= self.compress_threshold:
+            compressor = self._get_codec(_compressors, name)
+            packed = compressor.compress(data)
+            if len(packed) < len(data):
+                data, compressor_id = packed, compressor.codec_id
+
+        return bytes((serializer.codec_id, compressor_id)) + data
+
+    def decode(self, data: bytes):
+        """Convert bytes made by `encode` back to the value.
+        :param bytes data: encoded bytes
+        :return: corresponding Python value
+        """
+        serializer_id, compressor_id = data[0], data[1]
+        payload = memoryview(data)[_HEADER_SIZE:]
+        if compressor_id:
+            payload = self._get_codec(_compressors, compressor_id).decompress(payload)
+        return self._get_codec(_serializers, serializer_id).loads(payload)
+
+    def store(self, value, read, key=UNKNOWN):
+        """Convert `value` to fields size, mode, filename, and value for Cache
+        table.
+        :param value: value to convert
+        :param bool read: True when value is file-like object
+        :param key: key for item (default UNKNOWN)
+        :return: (size, mode, filename, value) tuple for Cache table
+        """
+        # pylint: disable=unidiomatic-typecheck
+        type_value = type(value)
+        if (
+            read
+            or type_value is str
+            or type_value is bytes
+            or type_value is float
+            or (
+                type_value is int
+                and -9223372036854775808 <= value <= 9223372036854775807
+            )
+        ):
+            return super().store(value, read, key=key)
+
+        data = self.encode(value)
+        if len(data) < self.min_file_size:
+            return 0, MODE_CODEC, None, sqlite3.Binary(data)
+
+        filename, full_path = self.filename(key, value)
+        with open(full_path, 'xb') as writer:
+            writer.write(data)
+
+        return len(data), MODE_CODEC, filename, None
+
+    def get(self, key, raw):
+        """Convert fields `key` and `raw` from Cache table to key.
+        Pickled keys written by `CDisk` are decompressed first. Those keys
+        are listed, but lookups by them miss as `put` pickles without zlib.
+        :param key: database key to convert
+        :param bool raw: flag indicating raw database storage
+        :return: corresponding Python key
+        """
+        if raw: return super().get(key, raw)
+        return _base.pkl.loads(_legacy_decompress(key))
+
+    def fetch(self, mode, filename, value, read):
+        """Convert fields `mode`, `filename`, and `value` from Cache table to
+        value.
+        Pickles written by `CDisk` are decompressed first, its text and
+        binary values are stored uncompressed like those of `Disk`.
+        :param int mode: value mode raw, binary, text, pickle or codec
+        :param str filename: filename of corresponding value
+        :param value: database value
+        :param bool read: when True, return an open file handle
+        :return: corresponding Python value
+        """
+        if mode == MODE_PICKLE:
+            if value is None:
+                with open(op.join(self._directory, filename), 'rb') as reader:
+                    value = reader.read()
+            return _base.pkl.loads(_legacy_decompress(value))
+        if mode != MODE_CODEC:
+            return super().fetch(mode, filename, value, read)
+        if value is None:
+            with open(op.join(self._directory, filename), 'rb') as reader:
+                value = reader.read()
+        return self.decode(value)
+
+    def train_dictionary(self, samples: Iterable[Any], dict_size: int = 112640) -> bytes:
+        """Train a zstd dictionary on serialized `samples`.
+        Dictionaries help most for many small values with shared structure.
+        Pass the result as `zstd_dict` (or the `disk_zstd_dict` setting) and
+        keep it for as long as values compressed with it are stored.
+        :param samples: sample values
+        :param int dict_size: maximum dictionary size in bytes (default 110 KiB)
+        :return: dictionary bytes
+        """
+        zstd = Lib.import_lib('zstandard')
+        serializer = self._get_codec(_serializers, self.serializer)
+        data = []
+        for sample in samples:
+            try:
+                data.append(serializer.dumps(sample))
+            except TypeError:
+                data.append(self._get_codec(_serializers, PickleSerializer.name).dumps(sample))
+        return zstd.train_dictionary(dict_size, data).as_bytes()
@@ -17,6 +17,9 @@ __all__ = ('JSONDisk', 'OrJSONDisk')
 class JSONDisk(Disk):
     "Cache key and value using JSON serialization with zlib compression."
 
+    # Keys are stored compressed.
+    sorted_keys = False
+
     def __init__(self, directory, compress_level: int = CachezConfigz.compression_lvl, **kwargs):
         """Initialize JSON disk instance.
         Keys and values are compressed using the zlib library. The
@@ -51,10 +54,17 @@ class JSONDisk(Disk):
             data = _defaultjson.loads(_zlib.decompress(data).decode('utf-8'))
         return data
 
+    def view(self, mode, filename, value):
+        # Values are compressed JSON, there are no raw bytes to map.
+        return self.fetch(mode, filename, value, False)
+
 
 class OrJSONDisk(Disk):
     "Cache key and value using JSON serialization with _zlib compression."
 
+    # Keys are stored compressed.
+    sorted_keys = False
+
     def __init__(self, directory, compress_level: int = CachezConfigz.compression_lvl, **kwargs):
         """Initialize JSON disk instance.
         Keys and values are compressed using the _zlib library. The
@@ -88,3 +98,7 @@ class OrJSONDisk(Disk):
         if not read: data = _orjson.loads(_zlib.decompress(data))
         return data
 
+    def view(self, mode, filename, value):
+        # Values are compressed JSON, there are no raw bytes to map.
+        return self.fetch(mode, filename, value, False)
+
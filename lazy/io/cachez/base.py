@@ -10,19 +10,25 @@ v2 enhancements:
 - Handles switching to using isal when available for better compression perf
 - Allows setting of custom serializer lib
 
-See Performance in perf.txt
+See Performance with `python -m lazy.io.cachez.benchmark`
 """
 
 import sys
+import asyncio
 import codecs
+import contextvars
 import contextlib as cl
 import errno
 import functools as ft
 import inspect
 import io
+import math
+import mmap
 import os
 import os.path as op
 import pickletools
+import random
+import shutil
 import sqlite3
 import struct
 import tempfile
@@ -30,12 +36,17 @@ import threading
 import time
 import warnings
 
-from typing import Type, Dict, Any
+from concurrent import futures
+from typing import Type, Dict, Any, List, Tuple
 from lazy.libz import Lib
 from lazy.utils import get_logger
 
 from .static import *
 from .config import CachezConfigz, SqlConfig
+from .memory import MemoryCache
+from .maintenance import MaintenanceWorker, referenced_files
+from .metrics import Metrics, to_prometheus
+from .writer import WriteBehind
 
 import pickle as pkl
 if CachezConfigz.serializer == 'dill':
@@ -76,6 +87,9 @@ logger = get_logger('cachez')
 class Disk:
     "Cache key and value serialization for SQLite database and files."
 
+    # Raw keys keep their order in the key column, see `Cache.irange`.
+    sorted_keys = True
+
     def __init__(self, directory: str = None, min_file_size: int = 0, pickle_protocol: int = 3, **config):
         """Initialize disk instance.
         :param str directory: directory path
@@ -195,9 +209,11 @@ class Disk:
 
             return size, MODE_BINARY, filename, None
         else:
-            result = pkl.dumps(value, protocol=self.pickle_protocol)
+            result = self._dump(value, key)
 
-            if len(result) < min_file_size:
+            if type(result) is tuple:
+                return result
+            elif len(result) < min_file_size:
                 return 0, MODE_PICKLE, None, sqlite3.Binary(result)
             else:
                 filename, full_path = self.filename(key, value)
@@ -235,6 +251,106 @@ class Disk:
                     return pkl.load(reader)
             else:
                 return pkl.load(io.BytesIO(value))
+        elif mode == MODE_PICKLE_OOB:
+            return self._load(filename)
+
+    def view(self, mode, filename, value):
+        """Like `fetch` but map value files into memory instead of copying
+        them.
+        Binary values are returned as a read-only memoryview of the value file
+        (or of the database value), and pickles with out-of-band buffers load
+        those buffers straight from the mapping. Other values are fetched as
+        usual. The mapping stays valid after the item is deleted, but on
+        Windows the value file is only removed once the view is released.
+        :param int mode: value mode
+        :param str filename: filename of corresponding value
+        :param value: database value
+        :return: corresponding Python value or memoryview
+        """
+        if mode == MODE_BINARY:
+            return self._map(filename)
+        if mode == MODE_PICKLE_OOB:
+            return self._load(filename, view=True)
+        if mode == MODE_RAW and type(value) in {bytes, sqlite3.Binary}:
+            return memoryview(value)
+        return self.fetch(mode, filename, value, False)
+
+    def _map(self, filename) -> memoryview:
+        "Read-only memoryview of value file `filename`."
+        with open(op.join(self._directory, filename), 'rb') as reader:
+            if not os.fstat(reader.fileno()).st_size:
+                return memoryview(b'')
+            return memoryview(mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _dump(self, value, key=UNKNOWN):
+        """Pickle `value`.
+        With pickle protocol 5 and up, contiguous buffers of values like numpy
+        arrays and bytearrays are kept out-of-band. When they add up to at
+        least `min_file_size` they are written to a value file next to the
+        pickle stream, aligned to `_OOB_ALIGN` bytes, without being copied
+        into the pickle first.
+        :return: pickled bytes or (size, mode, filename, value) tuple for
+            Cache table when written with out-of-band buffers
+        """
+        if self.pickle_protocol < 5:
+            return pkl.dumps(value, protocol=self.pickle_protocol)
+
+        buffers = []
+
+        def buffer_callback(buffer):
+            try:
+                buffers.append(buffer.raw())
+            except BufferError:
+                # Non-contiguous buffers stay in-band.
+                return True
+
+        data = pkl.dumps(value, protocol=self.pickle_protocol, buffer_callback=buffer_callback)
+        if not buffers:
+            return data
+        if sum(buffer.nbytes for buffer in buffers) < self.min_file_size:
+            return pkl.dumps(value, protocol=self.pickle_protocol)
+
+        sizes = [len(data)] + [buffer.nbytes for buffer in buffers]
+        header = struct.pack(f'<{len(sizes) + 1}Q', len(buffers), *sizes)
+        filename, full_path = self.filename(key, value)
+        size = len(header) + len(data)
+
+        with open(full_path, 'xb') as writer:
+            writer.write(header)
+            writer.write(data)
+            for buffer in buffers:
+                padding = -size % _OOB_ALIGN
+                writer.write(b'\0' * padding)
+                writer.write(buffer)
+                size += padding + buffer.nbytes
+
+        return size, MODE_PICKLE_OOB, filename, None
+
+    def _load(self, filename, view=False):
+        """Unpickle a value file written by `_dump` with out-of-band buffers.
+        The file is read once into a writable buffer, or mapped read-only
+        when `view` is True, and the buffers are handed to pickle as slices
+        of it.
+        """
+        with open(op.join(self._directory, filename), 'rb') as reader:
+            if view:
+                data = memoryview(mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                data = bytearray(os.fstat(reader.fileno()).st_size)
+                reader.readinto(data)
+                data = memoryview(data)
+
+        (count,) = struct.unpack_from('<Q', data)
+        sizes = struct.unpack_from(f'<{count + 1}Q', data, 8)
+        offset = 8 * (count + 2)
+        payload = data[offset:offset + sizes[0]]
+        offset += sizes[0]
+        buffers = []
+        for size in sizes[1:]:
+            offset += -offset % _OOB_ALIGN
+            buffers.append(data[offset:offset + size])
+            offset += size
+        return pkl.loads(payload, buffers=buffers)
 
     def filename(self, key=UNKNOWN, value=UNKNOWN):
         """Return filename and full-path tuple for file storage.
@@ -322,7 +438,7 @@ class CDisk(Disk):
         """
         # pylint: disable=no-self-use,unidiomatic-typecheck
         if raw: return bytes(key) if type(key) is sqlite3.Binary else key
-        return pkl.load(_zlib.decompress(io.BytesIO(key)))
+        return pkl.loads(_zlib.decompress(key))
 
     def store(self, value, read, key=UNKNOWN):
         """Convert `value` to fields size, mode, filename, and value for Cache
@@ -365,7 +481,9 @@ class CDisk(Disk):
 
             return size, MODE_BINARY, filename, None
     
-        result = _zlib.compress(pkl.dumps(value, protocol=self.pickle_protocol), self.compress_level)
+        result = self._dump(value, key)
+        if type(result) is tuple: return result
+        result = _zlib.compress(result, self.compress_level)
         if len(result) < min_file_size:
             return 0, MODE_PICKLE, None, sqlite3.Binary(result)
 
@@ -400,8 +518,10 @@ class CDisk(Disk):
         if mode == MODE_PICKLE:
             if value is None:
                 with open(op.join(self._directory, filename), 'rb') as reader:
-                    return pkl.load(_zlib.decompress(reader))
-            return pkl.load(_zlib.decompress(io.BytesIO(value)))
+                    return pkl.loads(_zlib.decompress(reader.read()))
+            return pkl.loads(_zlib.decompress(value))
+
+        if mode == MODE_PICKLE_OOB: return self._load(filename)
 
 
 class Timeout(Exception):
@@ -416,6 +536,191 @@ class EmptyDirWarning(UserWarning):
     "Warning used by Cache.check for empty directories."
 
 
+# Maps Cache._txn_key -> single worker executor holding an open async transaction
+# so that every awaited call inside `Cache.atransact` runs on the same thread.
+_async_txn_workers: contextvars.ContextVar = contextvars.ContextVar('cachez_async_txn_workers', default={})
+
+# Alignment in bytes of out-of-band pickle buffers in value files, enough for
+# aligned SIMD loads of numpy arrays mapped from them.
+_OOB_ALIGN = 64
+
+# Max number of keys bound in a single `IN (...)` clause. Older SQLite builds
+# limit a statement to 999 host parameters.
+_SQL_CHUNK_SIZE = 500
+
+# Pickle protocol of items in tuple key prefixes, fixed so prefixes written
+# with any `disk_pickle_protocol` match.
+_PREFIX_PROTOCOL = 4
+
+# Cache table columns copied by incremental snapshots.
+_ROW_COLUMNS = 'key, raw, store_time, expire_time, access_time, access_count, tag, size, mode, filename, value'
+
+
+def _chunked(items, size=_SQL_CHUNK_SIZE):
+    "Yield successive lists of at most `size` items."
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _key_class_bounds(db_key):
+    """Lower and exclusive upper bound of the SQLite type class of raw key
+    `db_key`. Numbers sort before text and text before blobs.
+    """
+    if isinstance(db_key, (int, float)):
+        return -math.inf, ''
+    if isinstance(db_key, str):
+        return '', sqlite3.Binary(b'')
+    return sqlite3.Binary(b''), None
+
+
+def _prefix_end(prefix):
+    "Smallest str or bytes after every key starting with `prefix`, None if unbounded."
+    if isinstance(prefix, str):
+        stripped = prefix.rstrip(chr(sys.maxunicode))
+        if not stripped:
+            return None
+        code = ord(stripped[-1]) + 1
+        # Surrogates cannot be encoded to UTF-8.
+        return stripped[:-1] + chr(0xE000 if 0xD800 <= code < 0xE000 else code)
+    stripped = prefix.rstrip(b'\xff')
+    if not stripped:
+        return None
+    return stripped[:-1] + bytes((stripped[-1] + 1,))
+
+
+def _split_tags(tag):
+    "Return the tag column value and all tags of `tag`, one tag or a collection of tags."
+    if type(tag) in (tuple, list, set, frozenset):
+        tags = tuple(tag)
+        return (tags[0] if tags else None), tags
+    return tag, ()
+
+
+def _key_prefix(items):
+    """Encode the items of a tuple key so that the encoding of any prefix of
+    the tuple is a byte prefix of it. Each item is pickled and preceded by
+    its length.
+    """
+    parts = []
+    for item in items:
+        data = pickletools.optimize(pkl.dumps(item, protocol=_PREFIX_PROTOCOL))
+        parts.append(struct.pack('>I', len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def _timed(op, deferred=False):
+    """Record the latency of a Cache method as `op` when metrics are enabled.
+    With `deferred`, calls queued for the write-behind worker are timed when
+    the worker applies them rather than when they are queued.
+    """
+    def decorator(func):
+        @ft.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            metrics = self._metrics
+            if metrics is None or (deferred and self._queues_write()):
+                return func(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                metrics.observe(op, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _result(value):
+    "Result of a Cache write, waiting for it if queued by write-behind."
+    return value.result() if isinstance(value, futures.Future) else value
+
+
+def _value_size(size, db_value):
+    "Bytes of a value given its Cache table `size` and `value` fields."
+    if size:
+        return size
+    if isinstance(db_value, (bytes, str, memoryview)):
+        return len(db_value)
+    return 0 if db_value is None else 8
+
+
+# Strong references to background memoize refreshes so they are not
+# garbage collected before they finish.
+_background_tasks = set()
+
+
+def _lease_token():
+    "Unique token identifying the holder of a memoize computation lease."
+    return f'{os.getpid()}-{threading.get_ident()}-{codecs.encode(os.urandom(8), "hex").decode("utf-8")}'
+
+
+class _QueueSignal:
+    """Wakes pullers blocked on queues of one cache table in this process.
+    Every push bumps `seq`. Waiters remember `seq` before looking at the
+    queue and sleep until it moves, so a push landing in between is not
+    missed. Pushes from other processes are seen by polling the SQLite
+    `data_version` pragma instead.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self._cond = threading.Condition()
+        self._waiters = set()
+
+    def notify(self):
+        "Wake every thread and task waiting on this signal."
+        with self._cond:
+            self.seq += 1
+            self._cond.notify_all()
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_set_signalled, future)
+
+    def wait(self, seq, timeout) -> bool:
+        """Block until `seq` moves or `timeout` seconds elapse.
+        :return: True if a push happened since `seq`
+        """
+        with self._cond:
+            if self.seq == seq:
+                self._cond.wait(timeout)
+            return self.seq != seq
+
+    async def async_wait(self, seq, timeout) -> bool:
+        "Async version of `_QueueSignal.wait`."
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self._cond:
+            if self.seq != seq:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._waiters.discard(waiter)
+        return self.seq != seq
+
+
+def _set_signalled(future):
+    if not future.done():
+        future.set_result(None)
+
+
+# Maps (database path, table name) -> _QueueSignal shared by every Cache
+# instance of this process opened on the same table.
+_queue_signals: Dict[Tuple[str, str], _QueueSignal] = {}
+_queue_signals_lock = threading.Lock()
+
+
+def _queue_signal(filepath: str, table_name: str) -> _QueueSignal:
+    with _queue_signals_lock:
+        signal = _queue_signals.get((filepath, table_name))
+        if signal is None:
+            signal = _queue_signals[(filepath, table_name)] = _QueueSignal()
+        return signal
+
+
 def args_to_key(base, args, kwargs, typed):
     """Create cache key out of function arguments.
     :param tuple base: base of key
@@ -444,13 +749,23 @@ def args_to_key(base, args, kwargs, typed):
 class Cache:
     "Disk and file backed cache."
 
-    def __init__(self, directory: str = None, filename: str = None, table_name: str = CachezConfigz.default_table, timeout: int = 60, disk: Type[Disk] = Disk, sql_config: Dict[str, Any] = {}, **settings):
+    def __init__(self, directory: str = None, filename: str = None, table_name: str = CachezConfigz.default_table, timeout: int = 60, disk: Type[Disk] = Disk, sql_config: Dict[str, Any] = {}, l1_items: int = None, l1_bytes: int = None, maintenance: bool = None, metrics: bool = None, write_behind: bool = None, db: 'CacheDB' = None, **settings):
         """Initialize cache instance.
         :param str directory: cache directory
         :param str filename: name prefix for cache file. will be prefixed to `_cache.db`
         :param str table_name: the inital table to be used
         :param float timeout: SQLite connection timeout
         :param disk: Disk type or subclass for serialization
+        :param int l1_items: max entries in the in-process memory tier (default CachezConfigz.l1_items)
+        :param int l1_bytes: max bytes in the in-process memory tier (default CachezConfigz.l1_bytes)
+        :param bool maintenance: run expiry and culling in a background worker
+            instead of on writes (default CachezConfigz.maintenance)
+        :param bool metrics: collect in-memory metrics, see `Cache.metrics`
+            (default CachezConfigz.metrics)
+        :param bool write_behind: queue writes to a batching writer thread,
+            see `Cache.start_write_behind` (default CachezConfigz.write_behind)
+        :param CacheDB db: container whose connections, async workers and
+            transactions the table shares, see `CacheDB.cache` (default None)
         :param settings: any of DEFAULT_SETTINGS
         """
         #try: assert issubclass(disk, Disk)
@@ -475,8 +790,34 @@ class Cache:
         self._sqlconf: SqlConfig = CachezConfigz.get_sql_settings(table_name = table_name, **sql_config)
 
         self._timeout = 0  # Manually handle retries during initialization.
-        self._local = threading.local()
-        self._txn_id = None
+        # Tables of a CacheDB share the thread-local connection, and with it
+        # the transaction state, of the container.
+        self._db = db
+        self._local = threading.local() if db is None else db._local
+
+        self._async_lock = threading.Lock()
+        self._async_pid = None
+        self._async_pool: futures.ThreadPoolExecutor = None
+        self._async_txn_idle: List[futures.ThreadPoolExecutor] = []
+        self._queue_signal = _queue_signal(self._filepath.string, table_name)
+
+        self._access_lock = threading.Lock()
+        self._access_pending: Dict[int, Dict[str, Any]] = {}
+        self._access_flushed = time.time()
+        self._access_flushing = False
+
+        self._maintenance: MaintenanceWorker = None
+        self._volume_estimate = None
+        self._orphan_scan = None
+
+        metrics = CachezConfigz.metrics if metrics is None else metrics
+        self._metrics: Metrics = Metrics(flush_interval = CachezConfigz.metrics_flush_interval) if metrics else None
+        self._writer: WriteBehind = None
+        self._statements: Dict[str, str] = {}
+
+        l1_items = CachezConfigz.l1_items if l1_items is None else l1_items
+        l1_bytes = CachezConfigz.l1_bytes if l1_bytes is None else l1_bytes
+        self._l1: MemoryCache = MemoryCache(l1_items, l1_bytes) if (l1_items or l1_bytes) else None
 
         if not op.isdir(directory):
             try:
@@ -609,6 +950,90 @@ class Cache:
             ' WHERE key = "size"; END'
         )
 
+        # Bump the generation whenever a stored value changes or is removed
+        # so in-process memory tiers can detect changes by other connections.
+        # Access tracking columns are excluded to keep reads from bumping it.
+
+        sql(
+            f'CREATE TRIGGER IF NOT EXISTS Settings_{self.table_name}_generation_update'
+            f' AFTER UPDATE OF store_time, expire_time, filename, value ON {self._table_name}'
+            f' FOR EACH ROW BEGIN UPDATE Settings_{self.table_name} SET value = value + 1'
+            ' WHERE key = "generation"; END'
+        )
+
+        sql(
+            f'CREATE TRIGGER IF NOT EXISTS Settings_{self.table_name}_generation_delete'
+            f' AFTER DELETE ON {self._table_name} FOR EACH ROW BEGIN'
+            f' UPDATE Settings_{self.table_name} SET value = value + 1'
+            ' WHERE key = "generation"; END'
+        )
+
+        # Side tables indexing every tag of an item and the prefixes of tuple
+        # keys so `evict` and `evict_prefix` delete by index. The tag column
+        # holds the first tag of an item and is mirrored by triggers, rows
+        # with several tags add the others after they are written.
+
+        ((tags_exist,),) = sql(
+            'SELECT COUNT(*) FROM sqlite_master WHERE type = "table" AND name = ?',
+            (f'Tags_{self.table_name}',),
+        ).fetchall()
+
+        sql(
+            f'CREATE TABLE IF NOT EXISTS Tags_{self.table_name} ('
+            ' tag BLOB, item INTEGER, PRIMARY KEY (tag, item)) WITHOUT ROWID'
+        )
+
+        sql(
+            f'CREATE INDEX IF NOT EXISTS Tags_{self.table_name}_item'
+            f' ON Tags_{self.table_name} (item)'
+        )
+
+        if not tags_exist:
+            sql(
+                f'INSERT OR IGNORE INTO Tags_{self.table_name}'
+                f' SELECT tag, rowid FROM {self._table_name} WHERE tag IS NOT NULL'
+            )
+
+        sql(
+            f'CREATE TRIGGER IF NOT EXISTS Tags_{self.table_name}_insert'
+            f' AFTER INSERT ON {self._table_name} FOR EACH ROW'
+            ' WHEN NEW.tag IS NOT NULL BEGIN'
+            f' INSERT OR IGNORE INTO Tags_{self.table_name} VALUES (NEW.tag, NEW.rowid); END'
+        )
+
+        sql(
+            f'CREATE TRIGGER IF NOT EXISTS Tags_{self.table_name}_update'
+            f' AFTER UPDATE OF tag ON {self._table_name} FOR EACH ROW'
+            ' WHEN OLD.tag IS NOT NULL OR NEW.tag IS NOT NULL BEGIN'
+            f' DELETE FROM Tags_{self.table_name} WHERE item = OLD.rowid;'
+            f' INSERT OR IGNORE INTO Tags_{self.table_name}'
+            ' SELECT NEW.tag, NEW.rowid WHERE NEW.tag IS NOT NULL; END'
+        )
+
+        sql(
+            f'CREATE TRIGGER IF NOT EXISTS Tags_{self.table_name}_delete'
+            f' AFTER DELETE ON {self._table_name} FOR EACH ROW'
+            ' WHEN OLD.tag IS NOT NULL BEGIN'
+            f' DELETE FROM Tags_{self.table_name} WHERE item = OLD.rowid; END'
+        )
+
+        sql(
+            f'CREATE TABLE IF NOT EXISTS Prefixes_{self.table_name} ('
+            ' prefix BLOB, item INTEGER, PRIMARY KEY (prefix, item)) WITHOUT ROWID'
+        )
+
+        sql(
+            f'CREATE INDEX IF NOT EXISTS Prefixes_{self.table_name}_item'
+            f' ON Prefixes_{self.table_name} (item)'
+        )
+
+        sql(
+            f'CREATE TRIGGER IF NOT EXISTS Prefixes_{self.table_name}_delete'
+            f' AFTER DELETE ON {self._table_name} FOR EACH ROW'
+            ' WHEN OLD.raw = 0 BEGIN'
+            f' DELETE FROM Prefixes_{self.table_name} WHERE item = OLD.rowid; END'
+        )
+
         # Create tag index if requested.
 
         if self.tag_index:  # pylint: disable=no-member
@@ -616,12 +1041,29 @@ class Cache:
         else:
             self.drop_tag_index()
 
-        # Close and re-open database connection with given timeout.
+        # Create change log used by incremental saves if requested.
 
-        self.close()
+        if self.track_changes:  # pylint: disable=no-member
+            self.create_change_log()
+        else:
+            self.drop_change_log()
+
+        self._compile_statements()
+
+        # Close and re-open database connection with given timeout. Tables of
+        # a CacheDB keep the connection of the container, opened with its
+        # timeout, as other tables may have transactions or cursors on it.
+
+        if self._db is None:
+            self.close()
         self._timeout = timeout
         self._sql  # pylint: disable=pointless-statement
 
+        if CachezConfigz.maintenance if maintenance is None else maintenance:
+            self.start_maintenance()
+        if CachezConfigz.write_behind if write_behind is None else write_behind:
+            self.start_write_behind()
+
     @property
     def table_name(self):
         """ Current Table Name """
@@ -667,6 +1109,78 @@ class Cache:
         """Disk used for serialization."""
         return self._disk
 
+    @property
+    def l1(self) -> MemoryCache:
+        """In-process memory tier or None when disabled."""
+        return self._l1
+
+    @staticmethod
+    def _key_pair(db_key, raw):
+        "Hashable (database key, raw) pair with binary keys as bytes."
+        return (bytes(db_key) if type(db_key) is sqlite3.Binary else db_key, bool(raw))
+
+    def _compile_statements(self):
+        """Build the SQL of hot paths for the table and eviction policy.
+        Runs in `__init__` and when `eviction_policy` is reset so every call
+        passes the same text to sqlite3 and hits its statement cache.
+        Timestamps are bound as parameters instead of formatted in.
+        """
+        table = self.table_name
+        policy = self._sqlconf.policies[self.eviction_policy]
+        access, flush, cull = policy['get'], policy['flush'], policy['cull']
+        live = ' AND (expire_time IS NULL OR expire_time > ?)'
+        expired = (
+            f'SELECT %s FROM {table}'
+            ' WHERE expire_time IS NOT NULL AND expire_time < ?'
+            ' ORDER BY expire_time LIMIT ?'
+        )
+        incr = 'store_time = :now, value = :value'
+        if access is not None:
+            incr += ', ' + access.format(now=':now')
+
+        self._statements = {
+            'get': f'SELECT rowid, expire_time, tag, mode, filename, value, size FROM {table} WHERE key = ? AND raw = ?' + live,
+            'pop': f'SELECT rowid, expire_time, tag, mode, filename, value FROM {table} WHERE key = ? AND raw = ?' + live,
+            'contains': f'SELECT rowid FROM {table} WHERE key = ? AND raw = ?' + live,
+            'select_filename': f'SELECT rowid, filename FROM {table} WHERE key = ? AND raw = ?',
+            'select_live_filename': f'SELECT rowid, filename FROM {table} WHERE key = ? AND raw = ?' + live,
+            'select_add': f'SELECT rowid, filename, expire_time FROM {table} WHERE key = ? AND raw = ?',
+            'select_incr': f'SELECT rowid, expire_time, filename, value FROM {table} WHERE key = ? AND raw = ?',
+            'select_touch': f'SELECT rowid, expire_time FROM {table} WHERE key = ? AND raw = ?',
+            'update_expire': f'UPDATE {table} SET expire_time = ? WHERE rowid = ?',
+            'update_row': (
+                f'UPDATE {table} SET store_time = ?, expire_time = ?, access_time = ?,'
+                ' access_count = ?, tag = ?, size = ?, mode = ?, filename = ?, value = ?'
+                ' WHERE rowid = ?'
+            ),
+            'insert_row': (
+                f'INSERT INTO {table}('
+                ' key, raw, store_time, expire_time, access_time,'
+                ' access_count, tag, size, mode, filename, value'
+                ') VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+            ),
+            'delete_rowid': f'DELETE FROM {table} WHERE rowid = ?',
+            'insert_tag': f'INSERT OR IGNORE INTO Tags_{table} VALUES (?, ?)',
+            'insert_prefix': f'INSERT OR IGNORE INTO Prefixes_{table} VALUES (?, ?)',
+            'update_incr': f'UPDATE {table} SET {incr} WHERE rowid = :rowid',
+            'access': None if access is None else f'UPDATE {table} SET {access.format(now=":now")} WHERE rowid = :rowid',
+            'flush_access': None if flush is None else f'UPDATE {table} SET {flush} WHERE rowid = :rowid',
+            'select_expired': expired % 'filename',
+            'delete_expired': f'DELETE FROM {table} WHERE rowid IN ({expired % "rowid"})',
+            'select_cull': None if cull is None else cull.format(fields='filename'),
+            'delete_cull': None if cull is None else f'DELETE FROM {table} WHERE rowid IN ({cull.format(fields="rowid")})',
+            'hit': f'UPDATE Settings_{table} SET value = value + 1 WHERE key = "hits"',
+            'miss': f'UPDATE Settings_{table} SET value = value + 1 WHERE key = "misses"',
+            'hits': f'UPDATE Settings_{table} SET value = value + ? WHERE key = "hits"',
+            'misses': f'UPDATE Settings_{table} SET value = value + ? WHERE key = "misses"',
+            'generation': f'SELECT value FROM Settings_{table} WHERE key = "generation"',
+        }
+
+    def _generation(self, sql=None):
+        sql = sql or self._sql
+        ((generation,),) = sql(self._statements['generation']).fetchall()
+        return generation
+
     @property
     def _con(self):
         # Check process ID to support process forking. If the process
@@ -676,14 +1190,16 @@ class Cache:
         pid = os.getpid()
 
         if local_pid != pid:
-            self.close()
+            self._close_async()
+            self._close_con()
             self._local.pid = pid
+            self._local.txn = False
 
         con = getattr(self._local, 'con', None)
 
         if con is None:
             #con = self._local.con = sqlite3.connect(op.join(self._directory, DBNAME), timeout=self._timeout, isolation_level=None)
-            con = self._local.con = sqlite3.connect(self._filepath.string, timeout=self._timeout, isolation_level=None)
+            con = self._local.con = self._connect()
             # Some SQLite pragmas work on a per-connection basis so
             # query the Settings table and reset the pragmas. The
             # Settings table may not exist so catch and ignore the
@@ -701,6 +1217,22 @@ class Cache:
 
         return con
 
+    def _connect(self) -> sqlite3.Connection:
+        "Open a database connection, tables of a CacheDB use the one of the container."
+        if self._db is not None:
+            return self._db._connect(self._filepath.string)
+        return sqlite3.connect(
+            self._filepath.string,
+            timeout = self._timeout,
+            isolation_level = None,
+            cached_statements = CachezConfigz.sql_cached_statements,
+        )
+
+    @property
+    def _txn_key(self) -> int:
+        "Key of the async transaction worker in `_async_txn_workers`, shared by tables of a CacheDB."
+        return id(self) if self._db is None else id(self._db)
+
     @property
     def _sql(self):
         return self._con.execute
@@ -756,46 +1288,144 @@ class Cache:
             yield
 
     @cl.contextmanager
-    def _transact(self, retry=False, filename=None):
+    def _transact(self, retry=False, filename=None, keys=None):
         sql = self._sql
         filenames = []
         _disk_remove = self._disk.remove
-        tid = threading.get_ident()
-        txn_id = self._txn_id
+        local = self._local
 
-        if tid == txn_id:
+        if getattr(local, 'txn', False):
             begin = False
         else:
             while True:
                 try:
                     sql('BEGIN IMMEDIATE')
                     begin = True
-                    self._txn_id = tid
+                    local.txn = True
                     break
                 except sqlite3.OperationalError:
                     if retry:
+                        if self._metrics is not None:
+                            self._metrics.incr('txn_retries')
                         continue
+                    if self._metrics is not None:
+                        self._metrics.incr('txn_timeouts')
                     if filename is not None:
                         _disk_remove(filename)
                     raise Timeout from None
 
+        # Key-scoped writes drop their keys from the memory tier and let it
+        # follow the generation bumps they cause instead of flushing it.
+        l1 = self._l1 if keys else None
+        if l1 is not None:
+            before = self._generation(sql)
+
         try:
             yield sql, filenames.append
+            if l1 is not None:
+                l1.advance(keys, before, self._generation(sql))
         except BaseException:
+            if l1 is not None:
+                l1.advance(keys, before, before)
             if begin:
-                assert self._txn_id == tid
-                self._txn_id = None
+                local.txn = False
                 sql('ROLLBACK')
             raise
         else:
             if begin:
-                assert self._txn_id == tid
-                self._txn_id = None
+                local.txn = False
                 sql('COMMIT')
             for name in filenames:
                 if name is not None:
                     _disk_remove(name)
 
+    def _get_async_pool(self) -> futures.ThreadPoolExecutor:
+        # Worker threads each lazily open their own thread-local connection
+        # through `_con`, so the pool is also the async connection pool. A
+        # forked child inherits the executor object but none of its threads.
+        if self._db is not None:
+            return self._db._get_async_pool()
+        pid = os.getpid()
+        with self._async_lock:
+            if self._async_pid != pid:
+                self._async_pool = None
+                self._async_txn_idle = []
+                self._async_pid = pid
+            if self._async_pool is None:
+                self._async_pool = futures.ThreadPoolExecutor(
+                    max_workers = CachezConfigz.async_workers,
+                    thread_name_prefix = f'cachez-{self.table_name}',
+                )
+            return self._async_pool
+
+    async def _arun(self, func, *args, **kwargs):
+        """Run blocking `func` on the async worker pool.
+        Calls made inside `atransact` are pinned to the transaction's worker.
+        """
+        pool = _async_txn_workers.get().get(self._txn_key) or self._get_async_pool()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, ft.partial(func, *args, **kwargs))
+
+    def _acquire_txn_worker(self) -> futures.ThreadPoolExecutor:
+        if self._db is not None:
+            return self._db._acquire_txn_worker()
+        self._get_async_pool()
+        with self._async_lock:
+            if self._async_txn_idle:
+                return self._async_txn_idle.pop()
+        return futures.ThreadPoolExecutor(max_workers = 1, thread_name_prefix = f'cachez-{self.table_name}-txn')
+
+    def _release_txn_worker(self, worker: futures.ThreadPoolExecutor):
+        if self._db is not None:
+            return self._db._release_txn_worker(worker)
+        with self._async_lock:
+            if self._async_pid == os.getpid() and len(self._async_txn_idle) < CachezConfigz.async_workers:
+                self._async_txn_idle.append(worker)
+                return
+        worker.shutdown(wait = False)
+
+    @cl.asynccontextmanager
+    async def atransact(self, retry=False):
+        """Async context manager to perform a transaction by locking the cache.
+        Behaves like `Cache.transact`. The transaction is held by a dedicated
+        worker thread and every async cache call awaited inside the block is
+        routed to that worker, so the event loop is never blocked.
+        Transactions may be nested within the same task.
+        >>> async with cache.atransact():  # Atomically increment two keys.
+        ...     _ = await cache.aincr('total', 123.4)
+        ...     _ = await cache.aincr('count', 1)
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: async context manager for use in `async with` statement
+        :raises Timeout: if database timeout occurs
+        """
+        workers = _async_txn_workers.get()
+        if self._txn_key in workers:
+            yield
+            return
+
+        worker = self._acquire_txn_worker()
+        loop = asyncio.get_running_loop()
+        txn = self._transact(retry = retry)
+        try:
+            await loop.run_in_executor(worker, txn.__enter__)
+        except BaseException:
+            self._release_txn_worker(worker)
+            raise
+
+        token = _async_txn_workers.set({**workers, self._txn_key: worker})
+        try:
+            try:
+                yield
+            except BaseException as exc:
+                await loop.run_in_executor(worker, txn.__exit__, type(exc), exc, exc.__traceback__)
+                raise
+            else:
+                await loop.run_in_executor(worker, txn.__exit__, None, None, None)
+        finally:
+            _async_txn_workers.reset(token)
+            self._release_txn_worker(worker)
+
+    @_timed('set', deferred=True)
     def set(self, key, value, expire=None, read=False, tag=None, retry=False):
         """Set `key` and `value` item in cache.
         When `read` is `True`, `value` should be a file-like object opened
@@ -807,16 +1437,23 @@ class Cache:
         :param float expire: seconds until item expires
             (default None, no expiry)
         :param bool read: read value as bytes from file (default False)
-        :param str tag: text to associate with key (default None)
+        :param str tag: text to associate with key, or a tuple of texts
+            (default None)
         :param bool retry: retry if database timeout occurs (default False)
-        :return: True if item was set
+        :return: True if item was set, with write-behind a future of it
         :raises Timeout: if database timeout occurs
         """
+        if self._queues_write():
+            return self._write_behind(self.set, key, value, expire, read, tag, retry)
+
         now = time.time()
         db_key, raw = self._disk.put(key)
         expire_time = None if expire is None else now + expire
         size, mode, filename, db_value = self._disk.store(value, read, key=key)
+        tag, tags = _split_tags(tag)
         columns = (expire_time, tag, size, mode, filename, db_value)
+        if self._metrics is not None:
+            self._record_write(size, filename, db_value)
 
         # The order of SELECT, UPDATE, and INSERT is important below.
         #
@@ -839,20 +1476,17 @@ class Cache:
         # INSERT OR REPLACE aka UPSERT is not used because the old filename may
         # need cleanup.
 
-        with self._transact(retry, filename) as (sql, cleanup):
-            rows = sql(
-                f'SELECT rowid, filename FROM {self.table_name}'
-                ' WHERE key = ? AND raw = ?',
-                (db_key, raw),
-            ).fetchall()
+        with self._transact(retry, filename, keys=(self._key_pair(db_key, raw),)) as (sql, cleanup):
+            rows = sql(self._statements['select_filename'], (db_key, raw)).fetchall()
 
             if rows:
                 ((rowid, old_filename),) = rows
                 cleanup(old_filename)
                 self._row_update(rowid, now, columns)
             else:
-                self._row_insert(db_key, raw, now, columns)
+                rowid = self._row_insert(db_key, raw, now, columns)
 
+            self._index_row(rowid, key, tags)
             self._cull(now, sql, cleanup)
 
             return True
@@ -870,17 +1504,7 @@ class Cache:
         sql = self._sql
         expire_time, tag, size, mode, filename, value = columns
         sql(
-            f'UPDATE {self.table_name} SET'
-            ' store_time = ?,'
-            ' expire_time = ?,'
-            ' access_time = ?,'
-            ' access_count = ?,'
-            ' tag = ?,'
-            ' size = ?,'
-            ' mode = ?,'
-            ' filename = ?,'
-            ' value = ?'
-            ' WHERE rowid = ?',
+            self._statements['update_row'],
             (
                 now,  # store_time
                 expire_time,
@@ -898,11 +1522,8 @@ class Cache:
     def _row_insert(self, key, raw, now, columns):
         sql = self._sql
         expire_time, tag, size, mode, filename, value = columns
-        sql(
-            f'INSERT INTO {self.table_name}('
-            ' key, raw, store_time, expire_time, access_time,'
-            ' access_count, tag, size, mode, filename, value'
-            ') VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        return sql(
+            self._statements['insert_row'],
             (
                 key,
                 raw,
@@ -916,34 +1537,172 @@ class Cache:
                 filename,
                 value,
             ),
-        )
+        ).lastrowid
+
+    def _index_row(self, rowid, key, tags):
+        # The first tag is mirrored from the tag column by triggers.
+        if len(tags) > 1:
+            self._con.executemany(self._statements['insert_tag'], [(tag, rowid) for tag in tags[1:]])
+        if type(key) is tuple:
+            self._sql(self._statements['insert_prefix'], (sqlite3.Binary(_key_prefix(key)), rowid))
+
+    @property
+    def _access_buffered(self):
+        "True when LRU/LFU access updates of reads are buffered in memory."
+        return CachezConfigz.access_buffer_size > 0 and self._statements['flush_access'] is not None
+
+    def _record_access(self, rowids):
+        """Buffer access updates for `rowids` read on the fast path.
+        The buffer is written by a worker of the async pool once it holds
+        `CachezConfigz.access_buffer_size` rows or after
+        `CachezConfigz.access_flush_interval` seconds, so reads never wait on
+        the write lock. Eviction order is approximate between flushes.
+        """
+        now = time.time()
+        with self._access_lock:
+            pending = self._access_pending
+            for rowid in rowids:
+                entry = pending.get(rowid)
+                if entry is None:
+                    pending[rowid] = {'rowid': rowid, 'now': now, 'count': 1}
+                else:
+                    entry['now'] = now
+                    entry['count'] += 1
+            due = not self._access_flushing and (
+                len(pending) >= CachezConfigz.access_buffer_size
+                or now - self._access_flushed >= CachezConfigz.access_flush_interval
+            )
+            if due:
+                self._access_flushing = True
+        if due:
+            self._get_async_pool().submit(self._flush_access_background)
+
+    def _flush_access_background(self):
+        try:
+            self.flush_access(retry=True)
+        except Exception as error:
+            logger.error(f'Failed to flush access updates of {self.table_name}: {error}')
+        finally:
+            self._access_flushing = False
+
+    def _take_access(self):
+        with self._access_lock:
+            pending, self._access_pending = self._access_pending, {}
+            self._access_flushed = time.time()
+        return pending
+
+    def _restore_access(self, pending):
+        "Merge access updates of a failed flush back into the buffer."
+        with self._access_lock:
+            for rowid, entry in pending.items():
+                current = self._access_pending.get(rowid)
+                if current is None:
+                    self._access_pending[rowid] = entry
+                else:
+                    current['now'] = max(current['now'], entry['now'])
+                    current['count'] += entry['count']
+
+    def _write_access(self, sql):
+        "Write buffered access updates inside the transaction of `sql`."
+        update = self._statements['flush_access']
+        pending = self._take_access()
+        if update is None or not pending:
+            return 0
+        try:
+            self._con.executemany(update, list(pending.values()))
+        except BaseException:
+            self._restore_access(pending)
+            raise
+        return len(pending)
+
+    def flush_access(self, retry=False):
+        """Write buffered LRU/LFU access updates to the cache table.
+        With the least-recently-used and least-frequently-used eviction
+        policies, reads record accesses in memory and write them in batches
+        so they never wait on the database write lock. Buffers are flushed
+        automatically, before culling and by `Cache.cull`.
+        Raises :exc:`Timeout` error when database timeout occurs and `retry` is
+        `False` (default).
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: number of rows updated
+        :raises Timeout: if database timeout occurs
+        """
+        if not self._access_pending:
+            return 0
+        with self._transact(retry) as (sql, _):
+            return self._write_access(sql)
+
+    def _record_read(self, nbytes):
+        "Count a read hit of `nbytes` bytes in metrics, or a miss when None."
+        metrics = self._metrics
+        if nbytes is None:
+            metrics.incr('misses')
+        else:
+            metrics.incr('hits')
+            if nbytes:
+                metrics.incr('bytes_read', nbytes)
+        if metrics.due():
+            self._get_async_pool().submit(self._flush_metrics_background)
+
+    def _record_write(self, size, filename, db_value):
+        "Count a stored value in metrics."
+        metrics = self._metrics
+        metrics.incr('values_inline' if filename is None else 'values_file')
+        metrics.incr('bytes_written', _value_size(size, db_value))
+
+    def _flush_metrics_background(self):
+        try:
+            self.flush_metrics(retry=True)
+        except Exception as error:
+            logger.error(f'Failed to flush metrics of {self.table_name}: {error}')
+        finally:
+            self._metrics.flushed()
+
+    def flush_metrics(self, retry=False):
+        """Add hits and misses counted by metrics since the last flush to the
+        `hits` and `misses` settings reported by `Cache.stats`.
+        Runs periodically every `CachezConfigz.metrics_flush_interval`
+        seconds. Nothing is written while `statistics` is enabled since reads
+        then update the settings themselves.
+        Raises :exc:`Timeout` error when database timeout occurs and `retry` is
+        `False` (default).
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: (hits, misses) written
+        :raises Timeout: if database timeout occurs
+        """
+        metrics = self._metrics
+        if metrics is None or self.statistics:
+            return 0, 0
+        with metrics.flush_lock:
+            deltas = metrics.pending(('hits', 'misses'))
+            if not any(deltas.values()):
+                return 0, 0
+            with self._transact(retry) as (sql, _):
+                for name, value in deltas.items():
+                    sql(self._statements[name], (value,))
+            metrics.mark_flushed(deltas)
+        return deltas['hits'], deltas['misses']
 
     def _cull(self, now, sql, cleanup, limit=None):
         cull_limit = self.cull_limit if limit is None else limit
 
-        if cull_limit == 0:
+        if cull_limit == 0 or self._maintained:
             return
 
         # Evict expired keys.
 
-        select_expired_template = (
-            f'SELECT %s FROM {self.table_name}'
-            ' WHERE expire_time IS NOT NULL AND expire_time < ?'
-            ' ORDER BY expire_time LIMIT ?'
-        )
-
-        select_expired = select_expired_template % 'filename'
-        rows = sql(select_expired, (now, cull_limit)).fetchall()
+        statements = self._statements
+        rows = sql(statements['select_expired'], (now, cull_limit)).fetchall()
 
         if rows:
-            delete_expired = f'DELETE FROM {self.table_name} WHERE rowid IN (%s)' % (
-                select_expired_template % 'rowid'
-            )
-            sql(delete_expired, (now, cull_limit))
+            sql(statements['delete_expired'], (now, cull_limit))
 
             for (filename,) in rows:
                 cleanup(filename)
 
+            if self._metrics is not None:
+                self._metrics.incr('expired', len(rows))
+
             cull_limit -= len(rows)
 
             if cull_limit == 0:
@@ -951,24 +1710,22 @@ class Cache:
 
         # Evict keys by policy.
 
-        #select_policy = EVICTION_POLICY[self.eviction_policy]['cull']
-        select_policy = self._sqlconf.policies[self.eviction_policy]['cull']
-
-        if select_policy is None or self.volume() < self.size_limit:
+        if statements['select_cull'] is None or self._estimated_volume() < self.size_limit:
             return
 
-        select_filename = select_policy.format(fields='filename', now=now)
-        rows = sql(select_filename, (cull_limit,)).fetchall()
+        self._write_access(sql)
+        rows = sql(statements['select_cull'], (cull_limit,)).fetchall()
 
         if rows:
-            delete = f'DELETE FROM {self.table_name} WHERE rowid IN (%s)' % (
-                select_policy.format(fields='rowid', now=now)
-            )
-            sql(delete, (cull_limit,))
+            sql(statements['delete_cull'], (cull_limit,))
 
             for (filename,) in rows:
                 cleanup(filename)
 
+            if self._metrics is not None:
+                self._metrics.incr('culled', len(rows))
+
+    @_timed('touch')
     def touch(self, key, expire=None, retry=False):
         """Touch `key` in cache and update `expire` time.
         Raises :exc:`Timeout` error when database timeout occurs and `retry` is
@@ -984,25 +1741,19 @@ class Cache:
         db_key, raw = self._disk.put(key)
         expire_time = None if expire is None else now + expire
 
-        with self._transact(retry) as (sql, _):
-            rows = sql(
-                f'SELECT rowid, expire_time FROM {self.table_name}'
-                ' WHERE key = ? AND raw = ?',
-                (db_key, raw),
-            ).fetchall()
+        with self._transact(retry, keys=(self._key_pair(db_key, raw),)) as (sql, _):
+            rows = sql(self._statements['select_touch'], (db_key, raw)).fetchall()
 
             if rows:
                 ((rowid, old_expire_time),) = rows
 
                 if old_expire_time is None or old_expire_time > now:
-                    sql(
-                        f'UPDATE {self.table_name} SET expire_time = ? WHERE rowid = ?',
-                        (expire_time, rowid),
-                    )
+                    sql(self._statements['update_expire'], (expire_time, rowid))
                     return True
 
         return False
 
+    @_timed('add', deferred=True)
     def add(self, key, value, expire=None, read=False, tag=None, retry=False):
         """Add `key` and `value` item to cache.
         Similar to `set`, but only add to cache if key not present.
@@ -1017,23 +1768,24 @@ class Cache:
         :param float expire: seconds until the key expires
             (default None, no expiry)
         :param bool read: read value as bytes from file (default False)
-        :param str tag: text to associate with key (default None)
+        :param str tag: text to associate with key, or a tuple of texts
+            (default None)
         :param bool retry: retry if database timeout occurs (default False)
-        :return: True if item was added
+        :return: True if item was added, with write-behind a future of it
         :raises Timeout: if database timeout occurs
         """
+        if self._queues_write():
+            return self._write_behind(self.add, key, value, expire, read, tag, retry)
+
         now = time.time()
         db_key, raw = self._disk.put(key)
         expire_time = None if expire is None else now + expire
         size, mode, filename, db_value = self._disk.store(value, read, key=key)
+        tag, tags = _split_tags(tag)
         columns = (expire_time, tag, size, mode, filename, db_value)
 
-        with self._transact(retry, filename) as (sql, cleanup):
-            rows = sql(
-                f'SELECT rowid, filename, expire_time FROM {self.table_name} WHERE'
-                ' WHERE key = ? AND raw = ?',
-                (db_key, raw),
-            ).fetchall()
+        with self._transact(retry, filename, keys=(self._key_pair(db_key, raw),)) as (sql, cleanup):
+            rows = sql(self._statements['select_add'], (db_key, raw)).fetchall()
 
             if rows:
                 ((rowid, old_filename, old_expire_time),) = rows
@@ -1045,12 +1797,16 @@ class Cache:
                 cleanup(old_filename)
                 self._row_update(rowid, now, columns)
             else:
-                self._row_insert(db_key, raw, now, columns)
+                rowid = self._row_insert(db_key, raw, now, columns)
 
+            self._index_row(rowid, key, tags)
             self._cull(now, sql, cleanup)
 
-            return True
+        if self._metrics is not None:
+            self._record_write(size, filename, db_value)
+        return True
 
+    @_timed('incr', deferred=True)
     def incr(self, key, delta=1, default=0, retry=False):
         """Increment value by delta for item with key.
         If key is missing and default is None then raise KeyError. Else if key
@@ -1066,19 +1822,18 @@ class Cache:
         :param int delta: amount to increment (default 1)
         :param int default: value if key is missing (default 0)
         :param bool retry: retry if database timeout occurs (default False)
-        :return: new value for item
+        :return: new value for item, with write-behind a future of it
         :raises KeyError: if key is not found and default is None
         :raises Timeout: if database timeout occurs
         """
+        if self._queues_write():
+            return self._write_behind(self.incr, key, delta, default, retry)
+
         now = time.time()
         db_key, raw = self._disk.put(key)
-        select = (
-            f'SELECT rowid, expire_time, filename, value FROM {self.table_name}'
-            ' WHERE key = ? AND raw = ?'
-        )
 
-        with self._transact(retry) as (sql, cleanup):
-            rows = sql(select, (db_key, raw)).fetchall()
+        with self._transact(retry, keys=(self._key_pair(db_key, raw),)) as (sql, cleanup):
+            rows = sql(self._statements['select_incr'], (db_key, raw)).fetchall()
 
             if not rows:
                 if default is None:
@@ -1108,16 +1863,7 @@ class Cache:
                 return value
 
             value += delta
-
-            columns = 'store_time = ?, value = ?'
-            #update_column = EVICTION_POLICY[self.eviction_policy]['get']
-            update_column = self._sqlconf.policies[self.eviction_policy]['get']
-
-            if update_column is not None:
-                columns += ', ' + update_column.format(now=now)
-
-            update = f'UPDATE {self.table_name} ' +  'SET %s WHERE rowid = ?' % columns
-            sql(update, (now, value, rowid))
+            sql(self._statements['update_incr'], {'now': now, 'value': value, 'rowid': rowid})
 
             return value
 
@@ -1144,6 +1890,7 @@ class Cache:
         """
         return self.incr(key, -delta, default, retry)
 
+    @_timed('get')
     def get(
         self,
         key,
@@ -1152,6 +1899,7 @@ class Cache:
         expire_time=False,
         tag=False,
         retry=False,
+        view=False,
     ):
         """Retrieve value from cache. If `key` is missing, return `default`.
         Raises :exc:`Timeout` error when database timeout occurs and `retry` is
@@ -1164,46 +1912,70 @@ class Cache:
             (default False)
         :param bool tag: if True, return tag in tuple (default False)
         :param bool retry: retry if database timeout occurs (default False)
+        :param bool view: if True and `read` is False, return bytes values as
+            a read-only memoryview mapping the value file instead of a copy,
+            see `Disk.view` (default False)
         :return: value for item or default if key not found
         :raises Timeout: if database timeout occurs
         """
+        # Values served from the memory tier are shared objects, mutating a
+        # returned value mutates the cached copy until it is invalidated.
         db_key, raw = self._disk.put(key)
-        #update_column = EVICTION_POLICY[self.eviction_policy]['get']
-        update_column = self._sqlconf.policies[self.eviction_policy]['get']
-        select = (
-            'SELECT rowid, expire_time, tag, mode, filename, value'
-            f' FROM {self.table_name} WHERE key = ? AND raw = ?'
-            ' AND (expire_time IS NULL OR expire_time > ?)'
-        )
+        statements = self._statements
+        update_column = statements['access']
+        select = statements['get']
 
         if expire_time and tag:
             default = (default, None, None)
         elif expire_time or tag:
             default = (default, None)
 
-        if not self.statistics and update_column is None:
+        # Memory tier lookup. File handles, views and statistics bypass the tier.
+        view = view and not read
+        l1 = None if read or view or self.statistics else self._l1
+        entry = ENOVAL
+
+        if l1 is not None:
+            pair = self._key_pair(db_key, raw)
+            generation = self._generation()
+            if l1.sync(generation):
+                entry = l1.get(pair)
+                if entry is not ENOVAL and entry[1] is not None and entry[1] <= time.time():
+                    l1.discard(pair)
+                    entry = ENOVAL
+
+        if entry is not ENOVAL:
+            value, db_expire_time, db_tag = entry
+
+        elif not self.statistics and (update_column is None or self._access_buffered):
             # Fast path, no transaction necessary.
 
             rows = self._sql(select, (db_key, raw, time.time())).fetchall()
 
             if not rows:
+                if self._metrics is not None:
+                    self._record_read(None)
                 return default
 
-            ((rowid, db_expire_time, db_tag, mode, filename, db_value),) = rows
+            ((rowid, db_expire_time, db_tag, mode, filename, db_value, size),) = rows
 
             try:
-                value = self._disk.fetch(mode, filename, db_value, read)
+                if view:
+                    value = self._disk.view(mode, filename, db_value)
+                else:
+                    value = self._disk.fetch(mode, filename, db_value, read)
             except IOError:
                 # Key was deleted before we could retrieve result.
+                if self._metrics is not None:
+                    self._record_read(None)
                 return default
 
+            if update_column is not None:
+                self._record_access((rowid,))
+
         else:  # Slow path, transaction required.
-            cache_hit = (
-                f'UPDATE Settings_{self.table_name} SET value = value + 1 WHERE key = "hits"'
-            )
-            cache_miss = (
-                f'UPDATE Settings_{self.table_name} SET value = value + 1 WHERE key = "misses"'
-            )
+            cache_hit = statements['hit']
+            cache_miss = statements['miss']
 
             with self._transact(retry) as (sql, _):
                 rows = sql(select, (db_key, raw, time.time())).fetchall()
@@ -1211,19 +1983,26 @@ class Cache:
                 if not rows:
                     if self.statistics:
                         sql(cache_miss)
+                    if self._metrics is not None:
+                        self._record_read(None)
                     return default
 
                 (
-                    (rowid, db_expire_time, db_tag, mode, filename, db_value),
+                    (rowid, db_expire_time, db_tag, mode, filename, db_value, size),
                 ) = rows  # noqa: E127
 
                 try:
-                    value = self._disk.fetch(mode, filename, db_value, read)
+                    if view:
+                        value = self._disk.view(mode, filename, db_value)
+                    else:
+                        value = self._disk.fetch(mode, filename, db_value, read)
                 except IOError as error:
                     if error.errno == errno.ENOENT:
                         # Key was deleted before we could retrieve result.
                         if self.statistics:
                             sql(cache_miss)
+                        if self._metrics is not None:
+                            self._record_read(None)
                         return default
                     else:
                         raise
@@ -1231,11 +2010,15 @@ class Cache:
                 if self.statistics:
                     sql(cache_hit)
 
-                now = time.time()
-                update = f'UPDATE {self.table_name} SET %s WHERE rowid = ?'
-
                 if update_column is not None:
-                    sql(update % update_column.format(now=now), (rowid,))
+                    sql(update_column, {'now': time.time(), 'rowid': rowid})
+
+        if self._metrics is not None:
+            self._record_read(0 if entry is not ENOVAL else _value_size(size, db_value))
+
+        if l1 is not None and entry is ENOVAL:
+            weight = size or (len(db_value) if isinstance(db_value, (bytes, str)) else 64)
+            l1.put(pair, (value, db_expire_time, db_tag), weight, generation)
 
         if expire_time and tag:
             return (value, db_expire_time, db_tag)
@@ -1279,16 +2062,11 @@ class Cache:
         """
         sql = self._sql
         db_key, raw = self._disk.put(key)
-        select = (
-            f'SELECT rowid FROM {self.table_name}'
-            ' WHERE key = ? AND raw = ?'
-            ' AND (expire_time IS NULL OR expire_time > ?)'
-        )
-
-        rows = sql(select, (db_key, raw, time.time())).fetchall()
+        rows = sql(self._statements['contains'], (db_key, raw, time.time())).fetchall()
 
         return bool(rows)
 
+    @_timed('pop')
     def pop(
         self, key, default=None, expire_time=False, tag=False, retry=False
     ):  # noqa: E501
@@ -1307,18 +2085,14 @@ class Cache:
         :raises Timeout: if database timeout occurs
         """
         db_key, raw = self._disk.put(key)
-        select = (
-            'SELECT rowid, expire_time, tag, mode, filename, value'
-            f' FROM {self.table_name} WHERE key = ? AND raw = ?'
-            ' AND (expire_time IS NULL OR expire_time > ?)'
-        )
+        select = self._statements['pop']
 
         if expire_time and tag:
             default = default, None, None
         elif expire_time or tag:
             default = default, None
 
-        with self._transact(retry) as (sql, _):
+        with self._transact(retry, keys=(self._key_pair(db_key, raw),)) as (sql, _):
             rows = sql(select, (db_key, raw, time.time())).fetchall()
 
             if not rows:
@@ -1326,7 +2100,7 @@ class Cache:
 
             ((rowid, db_expire_time, db_tag, mode, filename, db_value),) = rows
 
-            sql(f'DELETE FROM {self.table_name} WHERE rowid = ?', (rowid,))
+            sql(self._statements['delete_rowid'], (rowid,))
 
         try:
             value = self._disk.fetch(mode, filename, db_value, False)
@@ -1360,23 +2134,19 @@ class Cache:
         """
         db_key, raw = self._disk.put(key)
 
-        with self._transact(retry) as (sql, cleanup):
-            rows = sql(
-                f'SELECT rowid, filename FROM {self.table_name}'
-                ' WHERE key = ? AND raw = ?'
-                ' AND (expire_time IS NULL OR expire_time > ?)',
-                (db_key, raw, time.time()),
-            ).fetchall()
+        with self._transact(retry, keys=(self._key_pair(db_key, raw),)) as (sql, cleanup):
+            rows = sql(self._statements['select_live_filename'], (db_key, raw, time.time())).fetchall()
 
             if not rows:
                 raise KeyError(key)
 
             ((rowid, filename),) = rows
-            sql(f'DELETE FROM {self.table_name} WHERE rowid = ?', (rowid,))
+            sql(self._statements['delete_rowid'], (rowid,))
             cleanup(filename)
 
             return True
 
+    @_timed('delete')
     def delete(self, key, retry=False):
         """Delete corresponding item for `key` from cache.
         Missing keys are ignored.
@@ -1392,35 +2162,228 @@ class Cache:
         except KeyError:
             return False
 
-    def push(
-        self,
-        value,
-        prefix=None,
-        side='back',
-        expire=None,
-        read=False,
-        tag=None,
-        retry=False,
-    ):
-        """Push `value` onto `side` of queue identified by `prefix` in cache.
-        When prefix is None, integer keys are used. Otherwise, string keys are
-        used in the format "prefix-integer". Integer starts at 500 trillion.
-        Defaults to pushing value on back of queue. Set side to 'front' to push
-        value on front of queue. Side must be one of 'back' or 'front'.
-        Operation is atomic. Concurrent operations will be serialized.
-        When `read` is `True`, `value` should be a file-like object opened
-        for reading in binary mode.
+    def _db_keys(self, keys):
+        """Map (database key, raw) pairs to their Python keys.
+        Binary database keys are normalized to bytes to match selected rows.
+        """
+        return {self._key_pair(*self._disk.put(key)): key for key in keys}
+
+    def _select_many(self, sql, fields, db_keys, where='', params=()):
+        """Select rows matching `db_keys` with batched `IN (...)` queries.
+        :return: dict of (database key, raw) pair to selected fields
+        """
+        found = {}
+        items = list({db_key for db_key, _ in db_keys})
+        for chunk in _chunked(items):
+            select = (
+                f'SELECT key, raw, {fields} FROM {self.table_name}'
+                f' WHERE key IN ({",".join("?" * len(chunk))}){where}'
+            )
+            for db_key, raw, *row in sql(select, (*chunk, *params)).fetchall():
+                pair = (db_key, bool(raw))
+                if pair in db_keys:
+                    found[pair] = row
+        return found
+
+    @_timed('set_many')
+    def set_many(self, mapping, expire=None, read=False, tag=None, retry=False):
+        """Set many `key` and `value` items in cache using one transaction.
+        Existing rows are updated and new rows are inserted with
+        ``executemany`` so loading many keys costs a single ``BEGIN
+        IMMEDIATE``/``COMMIT`` round trip.
         Raises :exc:`Timeout` error when database timeout occurs and `retry` is
         `False` (default).
-        See also `Cache.pull`.
         >>> cache = Cache()
-        >>> print(cache.push('first value'))
-        500000000000000
-        >>> cache.get(500000000000000)
-        'first value'
-        >>> print(cache.push('second value'))
-        500000000000001
-        >>> print(cache.push('third value', side='front'))
+        >>> cache.set_many({'a': 1, 'b': 2})
+        2
+        >>> cache.get_many(['a', 'b', 'c'])
+        {'a': 1, 'b': 2}
+        :param mapping: mapping or iterable of key and value pairs
+        :param float expire: seconds until items expire
+            (default None, no expiry)
+        :param bool read: read values as bytes from file (default False)
+        :param str tag: text to associate with keys, or a tuple of texts
+            (default None)
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: count of items set
+        :raises Timeout: if database timeout occurs
+        """
+        items = mapping.items() if hasattr(mapping, 'items') else mapping
+        now = time.time()
+        expire_time = None if expire is None else now + expire
+        tag, tags = _split_tags(tag)
+        rows, tuple_keys = {}, {}
+        for key, value in items:
+            pair = self._key_pair(*self._disk.put(key))
+            if type(key) is tuple:
+                tuple_keys[pair] = key
+            stored = rows.pop(pair, None)
+            if stored is not None and stored[4] is not None:
+                self._disk.remove(stored[4])
+            rows[pair] = columns = (expire_time, tag) + self._disk.store(value, read, key=key)
+            if self._metrics is not None:
+                # columns: (expire_time, tag, size, mode, filename, value)
+                self._record_write(columns[2], columns[4], columns[5])
+
+        if not rows:
+            return 0
+
+        try:
+            with self._transact(retry, keys=rows) as (sql, cleanup):
+                existing = self._select_many(sql, 'rowid, filename', rows)
+                updates, inserts = [], []
+                for (db_key, raw), columns in rows.items():
+                    # columns: (expire_time, tag, size, mode, filename, value)
+                    if (db_key, raw) in existing:
+                        rowid, old_filename = existing[(db_key, raw)]
+                        cleanup(old_filename)
+                        updates.append((now, columns[0], now, 0) + columns[1:] + (rowid,))
+                    else:
+                        inserts.append((db_key, raw, now, columns[0], now, 0) + columns[1:])
+
+                con = self._con
+                if updates:
+                    con.executemany(
+                        f'UPDATE {self.table_name} SET'
+                        ' store_time = ?, expire_time = ?, access_time = ?,'
+                        ' access_count = ?, tag = ?, size = ?, mode = ?,'
+                        ' filename = ?, value = ? WHERE rowid = ?',
+                        updates,
+                    )
+                if inserts:
+                    con.executemany(
+                        f'INSERT INTO {self.table_name}('
+                        ' key, raw, store_time, expire_time, access_time,'
+                        ' access_count, tag, size, mode, filename, value'
+                        ') VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        inserts,
+                    )
+                if len(tags) > 1 or tuple_keys:
+                    indexed = rows if len(tags) > 1 else tuple_keys
+                    for pair, (rowid,) in self._select_many(sql, 'rowid', indexed).items():
+                        self._index_row(rowid, tuple_keys.get(pair), tags)
+                # Bounded so one large batch can't turn into an unbounded cull,
+                # maintenance and later writes remove the rest.
+                self._cull(now, sql, cleanup, limit=min(self.cull_limit * len(rows), _SQL_CHUNK_SIZE))
+        except BaseException:
+            for columns in rows.values():
+                if columns[4] is not None:
+                    self._disk.remove(columns[4])
+            raise
+        return len(rows)
+
+    @_timed('get_many')
+    def get_many(self, keys, read=False, retry=False):
+        """Retrieve many values from cache using batched ``IN (...)`` lookups.
+        Missing and expired keys are omitted from the result.
+        Raises :exc:`Timeout` error when database timeout occurs and `retry` is
+        `False` (default).
+        :param keys: iterable of keys
+        :param bool read: if True, return file handles to values
+            (default False)
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: dict of key to value for keys found
+        :raises Timeout: if database timeout occurs
+        """
+        db_keys = self._db_keys(keys)
+        if not db_keys:
+            return {}
+
+        update_column = self._statements['access']
+        fields = 'rowid, mode, filename, value, size'
+        where = ' AND (expire_time IS NULL OR expire_time > ?)'
+        params = (time.time(),)
+        metrics = self._metrics
+
+        def _fetch(rows):
+            results = {}
+            nbytes = 0
+            for pair, (rowid, mode, filename, db_value, size) in rows.items():
+                try:
+                    results[db_keys[pair]] = self._disk.fetch(mode, filename, db_value, read)
+                except IOError:
+                    # Key was deleted before we could retrieve result.
+                    continue
+                if metrics is not None:
+                    nbytes += _value_size(size, db_value)
+            if metrics is not None:
+                metrics.incr('hits', len(results))
+                metrics.incr('misses', len(db_keys) - len(results))
+                metrics.incr('bytes_read', nbytes)
+            return results
+
+        if not self.statistics and (update_column is None or self._access_buffered):
+            # Fast path, no transaction necessary.
+            rows = self._select_many(self._sql, fields, db_keys, where, params)
+            if update_column is not None and rows:
+                self._record_access([row[0] for row in rows.values()])
+            return _fetch(rows)
+
+        with self._transact(retry) as (sql, _):
+            rows = self._select_many(sql, fields, db_keys, where, params)
+            results = _fetch(rows)
+            if self.statistics:
+                sql(self._statements['hits'], (len(results),))
+                sql(self._statements['misses'], (len(db_keys) - len(results),))
+            if update_column is not None and rows:
+                now = time.time()
+                self._con.executemany(update_column, [{'now': now, 'rowid': row[0]} for row in rows.values()])
+        return results
+
+    @_timed('delete_many')
+    def delete_many(self, keys, retry=False):
+        """Delete items for many `keys` from cache using one transaction.
+        Missing keys are ignored.
+        Raises :exc:`Timeout` error when database timeout occurs and `retry` is
+        `False` (default).
+        :param keys: iterable of keys
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: count of items deleted
+        :raises Timeout: if database timeout occurs
+        """
+        db_keys = self._db_keys(keys)
+        if not db_keys:
+            return 0
+
+        with self._transact(retry, keys=db_keys) as (sql, cleanup):
+            rows = self._select_many(sql, 'rowid, filename', db_keys)
+            rowids = [rowid for rowid, _ in rows.values()]
+            for chunk in _chunked(rowids):
+                sql(f'DELETE FROM {self.table_name} WHERE rowid IN ({",".join("?" * len(chunk))})', chunk)
+            for _, filename in rows.values():
+                cleanup(filename)
+            return len(rowids)
+
+    @_timed('push')
+    def push(
+        self,
+        value,
+        prefix=None,
+        side='back',
+        expire=None,
+        read=False,
+        tag=None,
+        retry=False,
+    ):
+        """Push `value` onto `side` of queue identified by `prefix` in cache.
+        When prefix is None, integer keys are used. Otherwise, string keys are
+        used in the format "prefix-integer". Integer starts at 500 trillion.
+        Defaults to pushing value on back of queue. Set side to 'front' to push
+        value on front of queue. Side must be one of 'back' or 'front'.
+        Operation is atomic. Concurrent operations will be serialized.
+        When `read` is `True`, `value` should be a file-like object opened
+        for reading in binary mode.
+        Raises :exc:`Timeout` error when database timeout occurs and `retry` is
+        `False` (default).
+        See also `Cache.pull`.
+        >>> cache = Cache()
+        >>> print(cache.push('first value'))
+        500000000000000
+        >>> cache.get(500000000000000)
+        'first value'
+        >>> print(cache.push('second value'))
+        500000000000001
+        >>> print(cache.push('third value', side='front'))
         499999999999999
         >>> cache.push(1234, prefix='userids')
         'userids-500000000000000'
@@ -1447,6 +2410,8 @@ class Cache:
         expire_time = None if expire is None else now + expire
         size, mode, filename, db_value = self._disk.store(value, read)
         columns = (expire_time, tag, size, mode, filename, db_value)
+        if self._metrics is not None:
+            self._record_write(size, filename, db_value)
         order = {'back': 'DESC', 'front': 'ASC'}
         select = (
             f'SELECT key FROM {self.table_name}'
@@ -1481,8 +2446,134 @@ class Cache:
             self._row_insert(db_key, raw, now, columns)
             self._cull(now, sql, cleanup)
 
-            return db_key
+        self._queue_signal.notify()
+        return db_key
+
+    @_timed('push_many')
+    def push_many(
+        self,
+        values,
+        prefix=None,
+        side='back',
+        expire=None,
+        tag=None,
+        retry=False,
+    ):
+        """Push each of `values` onto `side` of queue identified by `prefix`.
+        Behaves like calling `Cache.push` for every value in order but all
+        items are added in a single transaction, so they become visible to
+        pullers together.
+        >>> cache = Cache()
+        >>> cache.push_many('abc')
+        [500000000000000, 500000000000001, 500000000000002]
+        >>> cache.push_many('xy', side='front')
+        [499999999999999, 499999999999998]
+        :param values: iterable of values
+        :param str prefix: key prefix (default None, key is integer)
+        :param str side: either 'back' or 'front' (default 'back')
+        :param float expire: seconds until the keys expire
+            (default None, no expiry)
+        :param str tag: text to associate with keys (default None)
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: list of keys for items in cache
+        :raises Timeout: if database timeout occurs
+        """
+        if prefix is None:
+            min_key = 0
+            max_key = 999999999999999
+        else:
+            min_key = prefix + '-000000000000000'
+            max_key = prefix + '-999999999999999'
+
+        now = time.time()
+        raw = True
+        expire_time = None if expire is None else now + expire
+        stored = [self._disk.store(value, False) for value in values]
+        if not stored:
+            return []
+        if self._metrics is not None:
+            for size, _, filename, db_value in stored:
+                self._record_write(size, filename, db_value)
+        order = {'back': 'DESC', 'front': 'ASC'}
+        step = {'back': 1, 'front': -1}[side]
+        select = (
+            f'SELECT key FROM {self.table_name}'
+            ' WHERE ? < key AND key < ? AND raw = ?'
+            ' ORDER BY key %s LIMIT 1'
+        ) % order[side]
+
+        try:
+            with self._transact(retry) as (sql, cleanup):
+                rows = sql(select, (min_key, max_key, raw)).fetchall()
 
+                if rows:
+                    ((key,),) = rows
+
+                    if prefix is not None:
+                        num = int(key[(key.rfind('-') + 1) :])
+                    else:
+                        num = key
+
+                    num += step
+                else:
+                    num = CachezConfigz.start_index_n
+
+                nums = range(num, num + step * len(stored), step)
+                if prefix is not None:
+                    db_keys = ['{0}-{1:015d}'.format(prefix, num) for num in nums]
+                else:
+                    db_keys = list(nums)
+
+                self._con.executemany(
+                    f'INSERT INTO {self.table_name}('
+                    ' key, raw, store_time, expire_time, access_time,'
+                    ' access_count, tag, size, mode, filename, value'
+                    ') VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (db_key, raw, now, expire_time, now, 0, tag) + columns
+                        for db_key, columns in zip(db_keys, stored)
+                    ],
+                )
+                self._cull(now, sql, cleanup, limit=self.cull_limit * len(stored))
+        except BaseException:
+            for _, _, filename, _ in stored:
+                if filename is not None:
+                    self._disk.remove(filename)
+            raise
+
+        self._queue_signal.notify()
+        return db_keys
+
+    def _data_version(self):
+        """Return the SQLite data version of this thread's connection.
+        The value changes whenever another connection commits to the
+        database, including connections in other processes.
+        """
+        ((version,),) = self._sql('PRAGMA data_version').fetchall()
+        return version
+
+    def _wait_queue(self, seq, version, deadline) -> bool:
+        """Block until an item may have been pushed.
+        Wakes on pushes made in this process and polls `data_version` every
+        `CachezConfigz.queue_poll_interval` seconds for other processes.
+        :param int seq: queue signal sequence read before the last pull
+        :param int version: data version read before the last pull
+        :param float deadline: time to give up at or None to wait forever
+        :return: False if `deadline` passed first
+        """
+        while True:
+            wait = CachezConfigz.queue_poll_interval
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            if self._queue_signal.wait(seq, wait):
+                return True
+            if self._data_version() != version:
+                return True
+
+    @_timed('pull')
     def pull(
         self,
         prefix=None,
@@ -1491,6 +2582,8 @@ class Cache:
         expire_time=False,
         tag=False,
         retry=False,
+        block=False,
+        timeout=None,
     ):
         """Pull key and value item pair from `side` of queue in cache.
         When prefix is None, integer keys are used. Otherwise, string keys are
@@ -1500,6 +2593,9 @@ class Cache:
         side to 'back' to pull from back of queue. Side must be one of 'front'
         or 'back'.
         Operation is atomic. Concurrent operations will be serialized.
+        When `block` is True and the queue is empty, wait up to `timeout`
+        seconds (forever when None) for an item to be pushed, by this or any
+        other process, before returning default.
         Raises :exc:`Timeout` error when database timeout occurs and `retry` is
         `False` (default).
         See also `Cache.push` and `Cache.get`.
@@ -1532,9 +2628,23 @@ class Cache:
             (default False)
         :param bool tag: if True, return tag in tuple (default False)
         :param bool retry: retry if database timeout occurs (default False)
+        :param bool block: wait for an item when queue is empty
+            (default False)
+        :param float timeout: seconds to wait when blocking
+            (default None, no limit)
         :return: key and value item pair or default if queue is empty
         :raises Timeout: if database timeout occurs
         """
+        if block:
+            deadline = None if timeout is None else time.time() + timeout
+            while True:
+                seq, version = self._queue_signal.seq, self._data_version()
+                result = self.pull(prefix, ENOVAL, side, expire_time, tag, retry)
+                if (result[0] if expire_time or tag else result) is not ENOVAL:
+                    return result
+                if not self._wait_queue(seq, version, deadline):
+                    return self.pull(prefix, default, side, expire_time, tag, retry)
+
         # Caution: Nearly identical code exists in Cache.peek
         if prefix is None:
             min_key = 0
@@ -1595,6 +2705,113 @@ class Cache:
         else:
             return key, value
 
+    @_timed('pull_many')
+    def pull_many(
+        self,
+        count,
+        prefix=None,
+        side='front',
+        expire_time=False,
+        tag=False,
+        retry=False,
+        block=False,
+        timeout=None,
+    ):
+        """Pull up to `count` key and value item pairs from `side` of queue.
+        Behaves like calling `Cache.pull` repeatedly but removes all items in
+        a single transaction. Returns fewer items when the queue holds fewer,
+        and an empty list when it is empty.
+        When `block` is True and the queue is empty, wait up to `timeout`
+        seconds (forever when None) for at least one item to be pushed.
+        >>> cache = Cache()
+        >>> _ = cache.push_many('abcd')
+        >>> [value for _, value in cache.pull_many(3)]
+        ['a', 'b', 'c']
+        >>> [value for _, value in cache.pull_many(3)]
+        ['d']
+        :param int count: maximum number of items to pull
+        :param str prefix: key prefix (default None, key is integer)
+        :param str side: either 'front' or 'back' (default 'front')
+        :param bool expire_time: if True, return expire_time in tuples
+            (default False)
+        :param bool tag: if True, return tag in tuples (default False)
+        :param bool retry: retry if database timeout occurs (default False)
+        :param bool block: wait for an item when queue is empty
+            (default False)
+        :param float timeout: seconds to wait when blocking
+            (default None, no limit)
+        :return: list of items in the format returned by `Cache.pull`
+        :raises Timeout: if database timeout occurs
+        """
+        if block:
+            deadline = None if timeout is None else time.time() + timeout
+            while True:
+                seq, version = self._queue_signal.seq, self._data_version()
+                items = self.pull_many(count, prefix, side, expire_time, tag, retry)
+                if items or not self._wait_queue(seq, version, deadline):
+                    return items or self.pull_many(count, prefix, side, expire_time, tag, retry)
+
+        if count < 1:
+            return []
+
+        if prefix is None:
+            min_key = 0
+            max_key = 999999999999999
+        else:
+            min_key = prefix + '-000000000000000'
+            max_key = prefix + '-999999999999999'
+
+        order = {'front': 'ASC', 'back': 'DESC'}
+        select = (
+            'SELECT rowid, key, expire_time, tag, mode, filename, value'
+            f' FROM {self.table_name} WHERE ? < key AND key < ? AND raw = 1'
+            ' ORDER BY key %s LIMIT ?'
+        ) % order[side]
+
+        rows = []
+        with self._transact(retry) as (sql, cleanup):
+            now = time.time()
+            while len(rows) < count:
+                limit = count - len(rows)
+                selected = sql(select, (min_key, max_key, limit)).fetchall()
+                for rowids in _chunked([row[0] for row in selected]):
+                    sql(
+                        f'DELETE FROM {self.table_name} WHERE rowid IN'
+                        f' ({", ".join("?" * len(rowids))})',
+                        rowids,
+                    )
+                for row in selected:
+                    db_expire = row[2]
+                    if db_expire is not None and db_expire < now:
+                        cleanup(row[5])
+                    else:
+                        rows.append(row)
+                if len(selected) < limit:
+                    break
+
+        items = []
+        for _, key, db_expire, db_tag, mode, name, db_value in rows:
+            try:
+                value = self._disk.fetch(mode, name, db_value, False)
+            except IOError as error:
+                if error.errno == errno.ENOENT:
+                    # Key was deleted before we could retrieve result.
+                    continue
+                raise
+            finally:
+                if name is not None:
+                    self._disk.remove(name)
+
+            if expire_time and tag:
+                items.append(((key, value), db_expire, db_tag))
+            elif expire_time:
+                items.append(((key, value), db_expire))
+            elif tag:
+                items.append(((key, value), db_tag))
+            else:
+                items.append((key, value))
+        return items
+
     def peek(
         self,
         prefix=None,
@@ -1778,7 +2995,259 @@ class Cache:
         else:
             return key, value
 
-    def memoize(self, name=None, typed=False, expire=None, tag=None):
+    async def aset(self, key, value, expire=None, read=False, tag=None, retry=False):
+        """Async version of `Cache.set` run on the async worker pool.
+        :return: True if item was set
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._awrite(self.set, key, value, expire = expire, read = read, tag = tag, retry = retry)
+
+    async def aadd(self, key, value, expire=None, read=False, tag=None, retry=False):
+        """Async version of `Cache.add` run on the async worker pool.
+        :return: True if item was added
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._awrite(self.add, key, value, expire = expire, read = read, tag = tag, retry = retry)
+
+    async def atouch(self, key, expire=None, retry=False):
+        """Async version of `Cache.touch` run on the async worker pool.
+        :return: True if key was touched
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.touch, key, expire = expire, retry = retry)
+
+    async def aincr(self, key, delta=1, default=0, retry=False):
+        """Async version of `Cache.incr` run on the async worker pool.
+        :return: new value for item
+        :raises KeyError: if key is not found and default is None
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._awrite(self.incr, key, delta = delta, default = default, retry = retry)
+
+    async def adecr(self, key, delta=1, default=0, retry=False):
+        """Async version of `Cache.decr` run on the async worker pool.
+        :return: new value for item
+        :raises KeyError: if key is not found and default is None
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._awrite(self.incr, key, delta = -delta, default = default, retry = retry)
+
+    async def aget(self, key, default=None, read=False, expire_time=False, tag=False, retry=False, view=False):
+        """Async version of `Cache.get` run on the async worker pool.
+        :return: value for item or default if key not found
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.get, key, default = default, read = read, expire_time = expire_time, tag = tag, retry = retry, view = view)
+
+    async def aread(self, key, retry=False):
+        """Async version of `Cache.read` run on the async worker pool.
+        :return: file open for reading in binary mode
+        :raises KeyError: if key is not found
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.read, key, retry = retry)
+
+    async def acontains(self, key):
+        """Async version of `key in cache` run on the async worker pool.
+        :return: True if key matching item
+        """
+        return await self._arun(self.__contains__, key)
+
+    async def apop(self, key, default=None, expire_time=False, tag=False, retry=False):
+        """Async version of `Cache.pop` run on the async worker pool.
+        :return: value for item or default if key not found
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.pop, key, default = default, expire_time = expire_time, tag = tag, retry = retry)
+
+    async def adelete(self, key, retry=False):
+        """Async version of `Cache.delete` run on the async worker pool.
+        :return: True if item was deleted
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.delete, key, retry = retry)
+
+    async def aset_many(self, mapping, expire=None, read=False, tag=None, retry=False):
+        """Async version of `Cache.set_many` run on the async worker pool.
+        :return: count of items set
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.set_many, mapping, expire = expire, read = read, tag = tag, retry = retry)
+
+    async def aget_many(self, keys, read=False, retry=False):
+        """Async version of `Cache.get_many` run on the async worker pool.
+        :return: dict of key to value for keys found
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.get_many, keys, read = read, retry = retry)
+
+    async def adelete_many(self, keys, retry=False):
+        """Async version of `Cache.delete_many` run on the async worker pool.
+        :return: count of items deleted
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.delete_many, keys, retry = retry)
+
+    async def apush(self, value, prefix=None, side='back', expire=None, read=False, tag=None, retry=False):
+        """Async version of `Cache.push` run on the async worker pool.
+        :return: key for item in cache
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.push, value, prefix = prefix, side = side, expire = expire, read = read, tag = tag, retry = retry)
+
+    async def apush_many(self, values, prefix=None, side='back', expire=None, tag=None, retry=False):
+        """Async version of `Cache.push_many` run on the async worker pool.
+        :return: list of keys for items in cache
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.push_many, values, prefix = prefix, side = side, expire = expire, tag = tag, retry = retry)
+
+    async def _await_queue(self, run, seq, version, deadline) -> bool:
+        """Async version of `Cache._wait_queue`.
+        `run` executes a blocking call on the worker that read `version`,
+        since data versions are only comparable on the same connection.
+        """
+        while True:
+            wait = CachezConfigz.queue_poll_interval
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            if await self._queue_signal.async_wait(seq, wait):
+                return True
+            if await run(self._data_version) != version:
+                return True
+
+    async def _ablock(self, pull, found, *args):
+        """Call `pull` with `args` until `found` accepts its result.
+        Waiting happens on the event loop; only the pull attempts and data
+        version checks run on a dedicated worker thread.
+        :return: result accepted by `found` or None if the deadline passed
+        """
+        *args, timeout = args
+        deadline = None if timeout is None else time.time() + timeout
+        loop = asyncio.get_running_loop()
+        pinned = _async_txn_workers.get().get(self._txn_key)
+        worker = pinned or self._acquire_txn_worker()
+        run = lambda func, *a: loop.run_in_executor(worker, ft.partial(func, *a))
+        try:
+            while True:
+                seq, version = self._queue_signal.seq, await run(self._data_version)
+                result = await run(pull, *args)
+                if found(result):
+                    return result
+                if not await self._await_queue(run, seq, version, deadline):
+                    return None
+        finally:
+            if pinned is None:
+                self._release_txn_worker(worker)
+
+    async def apull(self, prefix=None, default=(None, None), side='front', expire_time=False, tag=False, retry=False, block=False, timeout=None):
+        """Async version of `Cache.pull`.
+        When blocking, the wait happens on the event loop rather than holding
+        a worker thread.
+        :return: key and value item pair or default if queue is empty
+        :raises Timeout: if database timeout occurs
+        """
+        if block:
+            found = lambda result: (result[0] if expire_time or tag else result) is not ENOVAL
+            result = await self._ablock(self.pull, found, prefix, ENOVAL, side, expire_time, tag, retry, timeout)
+            if result is not None:
+                return result
+        return await self._arun(self.pull, prefix = prefix, default = default, side = side, expire_time = expire_time, tag = tag, retry = retry)
+
+    async def apull_many(self, count, prefix=None, side='front', expire_time=False, tag=False, retry=False, block=False, timeout=None):
+        """Async version of `Cache.pull_many`.
+        When blocking, the wait happens on the event loop rather than holding
+        a worker thread.
+        :return: list of items in the format returned by `Cache.pull`
+        :raises Timeout: if database timeout occurs
+        """
+        if block:
+            items = await self._ablock(self.pull_many, bool, count, prefix, side, expire_time, tag, retry, timeout)
+            if items:
+                return items
+        return await self._arun(self.pull_many, count, prefix = prefix, side = side, expire_time = expire_time, tag = tag, retry = retry)
+
+    async def apeek(self, prefix=None, default=(None, None), side='front', expire_time=False, tag=False, retry=False):
+        """Async version of `Cache.peek` run on the async worker pool.
+        :return: key and value item pair or default if queue is empty
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.peek, prefix = prefix, default = default, side = side, expire_time = expire_time, tag = tag, retry = retry)
+
+    async def apeekitem(self, last=True, expire_time=False, tag=False, retry=False):
+        """Async version of `Cache.peekitem` run on the async worker pool.
+        :return: key and value item pair
+        :raises KeyError: if cache is empty
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.peekitem, last = last, expire_time = expire_time, tag = tag, retry = retry)
+
+    async def aexpire(self, now=None, retry=False):
+        """Async version of `Cache.expire` run on the async worker pool.
+        :return: count of items removed
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.expire, now = now, retry = retry)
+
+    async def aevict(self, tag, retry=False):
+        """Async version of `Cache.evict` run on the async worker pool.
+        :return: count of rows removed
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.evict, tag, retry = retry)
+
+    async def aevict_prefix(self, prefix, retry=False):
+        """Async version of `Cache.evict_prefix` run on the async worker pool.
+        :return: count of rows removed
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.evict_prefix, prefix, retry = retry)
+
+    async def acull(self, retry=False):
+        """Async version of `Cache.cull` run on the async worker pool.
+        :return: count of items removed
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.cull, retry = retry)
+
+    async def amaintain(self, budget=None, retry=False, orphans=True):
+        """Async version of `Cache.maintain` run on the async worker pool.
+        :return: dict with counts of 'expired' and 'culled' items, 'orphans'
+            removed and 'vacuumed' pages
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.maintain, budget = budget, retry = retry, orphans = orphans)
+
+    async def aflush_access(self, retry=False):
+        """Async version of `Cache.flush_access` run on the async worker pool.
+        :return: number of rows updated
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.flush_access, retry = retry)
+
+    async def aclear(self, retry=False):
+        """Async version of `Cache.clear` run on the async worker pool.
+        :return: count of rows removed
+        :raises Timeout: if database timeout occurs
+        """
+        return await self._arun(self.clear, retry = retry)
+
+    async def avolume(self):
+        """Async version of `Cache.volume` run on the async worker pool.
+        :return: size in bytes
+        """
+        return await self._arun(self.volume)
+
+    async def alen(self):
+        """Async version of `len(cache)` run on the async worker pool.
+        :return: count of items in cache including expired items
+        """
+        return await self._arun(self.__len__)
+
+    def memoize(self, name=None, typed=False, expire=None, tag=None, lock=False, stale_ttl=None, beta=None, lock_expire=60):
         """Memoizing cache decorator.
         Decorator to wrap callable with memoizing function using cache.
         Repeated calls with the same arguments will lookup result in cache and
@@ -1826,12 +3295,31 @@ class Cache:
         :param float expire: seconds until arguments expire
             (default None, no expiry)
         :param str tag: text to associate with arguments (default None)
+        :param bool lock: on a miss only the caller holding a lease stored in
+            the cache computes the result, other callers in any thread or
+            process wait for it (default False)
+        :param float stale_ttl: seconds an expired result is still served while
+            a single caller refreshes it in the background (default None)
+        :param float beta: enables probabilistic early expiration, results are
+            refreshed in the background before `expire` with a probability
+            scaled by `beta` and the time the last computation took, 1.0 is a
+            good default (default None)
+        :param float lock_expire: seconds until a computation lease expires
+            so a crashed caller cannot block others forever (default 60)
         :return: callable decorator
         """
         # Caution: Nearly identical code exists in DjangoCache.memoize
         if callable(name):
             raise TypeError('name cannot be callable')
 
+        # With `stale_ttl` or `beta` the cached value is a (result, delta)
+        # pair where delta is the seconds the computation took, and rows are
+        # kept for `stale_ttl` seconds past their logical expiry.
+        wrap = bool(stale_ttl or beta)
+        store_expire = expire + stale_ttl if (expire and stale_ttl) else expire
+        if wrap or lock:
+            return self._memoize_stampede(name, typed, expire, tag, lock, stale_ttl, beta, lock_expire, wrap, store_expire)
+
         def decorator(func):
             "Decorator created by memoize() for callable `func`."
             base = (full_name(func),) if name is None else (name,)
@@ -1848,20 +3336,171 @@ class Cache:
                         if expire is None or expire > 0:
                             self.set(key, result, expire, tag=tag, retry=True)
 
-                    return result
-            else:
+                    return result
+            else:
+                @ft.wraps(func)
+                async def wrapper(*args, **kwargs):
+                    "Wrapper for callable to cache arguments and return values."
+                    key = wrapper.__cache_key__(*args, **kwargs)
+                    result = await self.aget(key, default=ENOVAL, retry=True)
+
+                    if result is ENOVAL:
+                        result = await func(*args, **kwargs)
+                        if expire is None or expire > 0:
+                            await self.aset(key, result, expire, tag=tag, retry=True)
+
+                    return result
+
+            def __cache_key__(*args, **kwargs):
+                "Make key for cache given function arguments."
+                return args_to_key(base, args, kwargs, typed)
+
+            wrapper.__cache_key__ = __cache_key__
+            return wrapper
+
+        return decorator
+
+    def _memoize_stampede(self, name, typed, expire, tag, lock, stale_ttl, beta, lock_expire, wrap, store_expire):
+        """Memoizing decorator with stampede protection. See `Cache.memoize`.
+        Computations are guarded by a lease stored in the cache under
+        ``key + (ENOVAL,)``, which never collides with keys from `args_to_key`.
+        """
+        stale_ttl = stale_ttl or 0
+
+        def lookup(pair, expire_time):
+            "Return (result, refresh) for a cached value."
+            if pair is ENOVAL or not wrap:
+                return pair, False
+            result, delta = pair
+            if expire_time is None:
+                return result, False
+            ttl = expire_time - stale_ttl - time.time()
+            if ttl <= 0:
+                return result, True
+            # XFetch: recompute early with increasing probability as expiry nears.
+            early = bool(beta) and -delta * beta * math.log(1.0 - random.random()) >= ttl
+            return result, early
+
+        def to_store(result, delta):
+            return (result, delta) if wrap else result
+
+        def decorator(func):
+            "Decorator created by memoize() for callable `func`."
+            base = (full_name(func),) if name is None else (name,)
+            can_store = expire is None or expire > 0
+
+            if not inspect.iscoroutinefunction(func):
+                def compute(key, args, kwargs):
+                    start = time.time()
+                    result = func(*args, **kwargs)
+                    if can_store:
+                        _result(self.set(key, to_store(result, time.time() - start), store_expire, tag=tag, retry=True))
+                    return result
+
+                def release(lease, token):
+                    if self.get(lease, retry=True) == token:
+                        self.delete(lease, retry=True)
+
+                def refresh(key, lease, token, args, kwargs):
+                    try:
+                        compute(key, args, kwargs)
+                    except Exception as exc:
+                        logger.error(f'Background refresh of {base[0]} failed: {exc}')
+                    finally:
+                        release(lease, token)
+                        self._close_con()
+
+                @ft.wraps(func)
+                def wrapper(*args, **kwargs):
+                    "Wrapper for callable to cache arguments and return values."
+                    key = wrapper.__cache_key__(*args, **kwargs)
+                    lease = key + (ENOVAL,)
+                    pair, expire_time = self.get(key, default=ENOVAL, expire_time=True, retry=True)
+                    result, stale = lookup(pair, expire_time)
+
+                    if result is not ENOVAL:
+                        if stale:
+                            token = _lease_token()
+                            if _result(self.add(lease, token, expire=lock_expire, retry=True)):
+                                thread = threading.Thread(target=refresh, args=(key, lease, token, args, kwargs), daemon=True)
+                                thread.start()
+                        return result
+
+                    if not lock:
+                        return compute(key, args, kwargs)
+
+                    pause = 0.001
+                    while True:
+                        token = _lease_token()
+                        if _result(self.add(lease, token, expire=lock_expire, retry=True)):
+                            try:
+                                pair = self.get(key, default=ENOVAL, retry=True)
+                                if pair is not ENOVAL:
+                                    return pair[0] if wrap else pair
+                                return compute(key, args, kwargs)
+                            finally:
+                                release(lease, token)
+                        time.sleep(pause)
+                        pause = min(pause * 2, 0.1)
+                        pair = self.get(key, default=ENOVAL, retry=True)
+                        if pair is not ENOVAL:
+                            return pair[0] if wrap else pair
+            else:
+                async def compute(key, args, kwargs):
+                    start = time.time()
+                    result = await func(*args, **kwargs)
+                    if can_store:
+                        await self.aset(key, to_store(result, time.time() - start), store_expire, tag=tag, retry=True)
+                    return result
+
+                async def release(lease, token):
+                    if await self.aget(lease, retry=True) == token:
+                        await self.adelete(lease, retry=True)
+
+                async def refresh(key, lease, token, args, kwargs):
+                    try:
+                        await compute(key, args, kwargs)
+                    except Exception as exc:
+                        logger.error(f'Background refresh of {base[0]} failed: {exc}')
+                    finally:
+                        await release(lease, token)
+
                 @ft.wraps(func)
                 async def wrapper(*args, **kwargs):
                     "Wrapper for callable to cache arguments and return values."
                     key = wrapper.__cache_key__(*args, **kwargs)
-                    result = self.get(key, default=ENOVAL, retry=True)
-
-                    if result is ENOVAL:
-                        result = await func(*args, **kwargs)
-                        if expire is None or expire > 0:
-                            self.set(key, result, expire, tag=tag, retry=True)
-
-                    return result
+                    lease = key + (ENOVAL,)
+                    pair, expire_time = await self.aget(key, default=ENOVAL, expire_time=True, retry=True)
+                    result, stale = lookup(pair, expire_time)
+
+                    if result is not ENOVAL:
+                        if stale:
+                            token = _lease_token()
+                            if await self.aadd(lease, token, expire=lock_expire, retry=True):
+                                task = asyncio.ensure_future(refresh(key, lease, token, args, kwargs))
+                                _background_tasks.add(task)
+                                task.add_done_callback(_background_tasks.discard)
+                        return result
+
+                    if not lock:
+                        return await compute(key, args, kwargs)
+
+                    pause = 0.001
+                    while True:
+                        token = _lease_token()
+                        if await self.aadd(lease, token, expire=lock_expire, retry=True):
+                            try:
+                                pair = await self.aget(key, default=ENOVAL, retry=True)
+                                if pair is not ENOVAL:
+                                    return pair[0] if wrap else pair
+                                return await compute(key, args, kwargs)
+                            finally:
+                                await release(lease, token)
+                        await asyncio.sleep(pause)
+                        pause = min(pause * 2, 0.1)
+                        pair = await self.aget(key, default=ENOVAL, retry=True)
+                        if pair is not ENOVAL:
+                            return pair[0] if wrap else pair
 
             def __cache_key__(*args, **kwargs):
                 "Make key for cache given function arguments."
@@ -2016,27 +3655,136 @@ class Cache:
         sql(f'DROP INDEX IF EXISTS {self.table_name}_tag_rowid')
         self.reset('tag_index', 0)
 
+    def create_change_log(self):
+        """Create change log on cache database.
+        Removed keys and keys whose expire time changed without a new store
+        time are recorded so incremental saves can ship them. Other changes
+        are found through `store_time`.
+        It is better to initialize cache with `track_changes=True` than use this.
+        :raises Timeout: if database timeout occurs
+        """
+        sql = self._sql
+        sql(
+            f'CREATE TABLE IF NOT EXISTS Changes_{self.table_name} ('
+            ' key BLOB,'
+            ' raw INTEGER,'
+            ' change_time REAL)'
+        )
+        sql(
+            f'CREATE INDEX IF NOT EXISTS Changes_{self.table_name}_change_time'
+            f' ON Changes_{self.table_name} (change_time)'
+        )
+        # Seconds since epoch, matching the time.time() based store_time.
+        now = "(julianday('now') - 2440587.5) * 86400.0"
+        sql(
+            f'CREATE TRIGGER IF NOT EXISTS Changes_{self.table_name}_delete'
+            f' AFTER DELETE ON {self._table_name} FOR EACH ROW BEGIN'
+            f' INSERT INTO Changes_{self.table_name}'
+            f' VALUES (OLD.key, OLD.raw, {now}); END'
+        )
+        sql(
+            f'CREATE TRIGGER IF NOT EXISTS Changes_{self.table_name}_touch'
+            f' AFTER UPDATE OF expire_time ON {self._table_name} FOR EACH ROW'
+            ' WHEN NEW.store_time = OLD.store_time BEGIN'
+            f' INSERT INTO Changes_{self.table_name}'
+            f' VALUES (NEW.key, NEW.raw, {now}); END'
+        )
+        self.reset('track_changes', 1)
+
+    def drop_change_log(self):
+        """Drop change log on cache database.
+        :raises Timeout: if database timeout occurs
+        """
+        sql = self._sql
+        sql(f'DROP TRIGGER IF EXISTS Changes_{self.table_name}_delete')
+        sql(f'DROP TRIGGER IF EXISTS Changes_{self.table_name}_touch')
+        sql(f'DROP TABLE IF EXISTS Changes_{self.table_name}')
+        self.reset('track_changes', 0)
+
     def evict(self, tag, retry=False):
         """Remove items with matching `tag` from cache.
-        Removing items is an iterative process. In each iteration, a subset of
-        items is removed. Concurrent writes may occur between iterations.
+        Items tagged with several tags are removed by any of them. Items are
+        found through the Tags side table, `tag_index` is not required.
+        Removing items is an iterative process. In each iteration, a batch of
+        `CachezConfigz.evict_batch_size` items is removed with one statement.
+        Concurrent writes may occur between iterations.
         If a :exc:`Timeout` occurs, the first element of the exception's
         `args` attribute will be the number of items removed before the
         exception occurred.
         Raises :exc:`Timeout` error when database timeout occurs and `retry` is
         `False` (default).
+        >>> cache = Cache()
+        >>> _ = cache.set('a', 1, tag=('tenant-1', 'users'))
+        >>> _ = cache.set('b', 2, tag='users')
+        >>> cache.evict('users')
+        2
         :param str tag: tag identifying items
         :param bool retry: retry if database timeout occurs (default False)
         :return: count of rows removed
         :raises Timeout: if database timeout occurs
         """
+        items = f'SELECT item FROM Tags_{self.table_name} WHERE tag = ? LIMIT ?'
+        return self._evict_items(items, (tag,), retry=retry)
+
+    def evict_prefix(self, prefix, retry=False):
+        """Remove items whose tuple key starts with the items of `prefix`.
+        Keys of memoized callables are tuples of the callable name followed by
+        its arguments, see `args_to_key`, so all results for a first argument
+        are removed at once.
+        Only tuple keys written by `set`, `add`, `set_many` and `memoize` are
+        indexed by prefix. See `Cache.evict` for batching and timeouts.
+        >>> cache = Cache()
+        >>> @cache.memoize(name='report')
+        ... def report(tenant, day):
+        ...     return tenant, day
+        >>> _ = report('acme', 1), report('acme', 2), report('other', 1)
+        >>> cache.evict_prefix(('report', 'acme'))
+        2
+        :param tuple prefix: leading items of keys
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: count of rows removed
+        :raises ValueError: if prefix is not a non-empty tuple
+        :raises Timeout: if database timeout occurs
+        """
+        if type(prefix) is not tuple or not prefix:
+            raise ValueError('prefix must be a non-empty tuple')
+        start = _key_prefix(prefix)
+        items = (
+            f'SELECT item FROM Prefixes_{self.table_name}'
+            ' WHERE prefix >= ? AND prefix < ? LIMIT ?'
+        )
+        args = (sqlite3.Binary(start), sqlite3.Binary(_prefix_end(start)))
+        return self._evict_items(items, args, retry=retry)
+
+    def _evict_items(self, items, args, retry=False):
+        # Set based batches: `items` selects up to LIMIT rowids which are
+        # deleted by one statement, their value files removed after commit.
+        count = 0
+        limit = CachezConfigz.evict_batch_size
+        args = (*args, limit)
         select = (
-            f'SELECT rowid, filename FROM {self.table_name}'
-            ' WHERE tag = ? AND rowid > ?'
-            ' ORDER BY rowid LIMIT ?'
+            f'SELECT filename FROM {self.table_name}'
+            f' WHERE rowid IN ({items}) AND filename IS NOT NULL'
         )
-        args = [tag, 0, 100]
-        return self._select_delete(select, args, arg_index=1, retry=retry)
+        delete = f'DELETE FROM {self.table_name} WHERE rowid IN ({items})'
+
+        try:
+            while True:
+                with self._transact(retry) as (sql, cleanup):
+                    rows = sql(select, args).fetchall()
+                    deleted = sql(delete, args).rowcount
+                    count += deleted
+
+                    for (filename,) in rows:
+                        cleanup(filename)
+
+                if deleted < limit:
+                    break
+
+        except Timeout:
+            raise Timeout(count) from None
+
+        return count
 
     def expire(self, now=None, retry=False):
         """Remove expired items from cache.
@@ -2058,7 +3806,10 @@ class Cache:
             ' ORDER BY expire_time LIMIT ?'
         )
         args = [0, now or time.time(), 100]
-        return self._select_delete(select, args, row_index=1, retry=retry)
+        count = self._select_delete(select, args, row_index=1, retry=retry)
+        if self._metrics is not None:
+            self._metrics.incr('expired', count)
+        return count
 
     def cull(self, retry=False):
         """Cull items from cache until volume is less than size limit.
@@ -2081,13 +3832,12 @@ class Cache:
 
         # Remove items by policy.
 
-        #select_policy = EVICTION_POLICY[self.eviction_policy]['cull']
-        select_policy = self._sqlconf.policies[self.eviction_policy]['cull']
+        select_filename = self._statements['select_cull']
 
-        if select_policy is None:
+        if select_filename is None:
             return 0
 
-        select_filename = select_policy.format(fields='filename', now=now)
+        self.flush_access(retry)
 
         try:
             while self.volume() > self.size_limit:
@@ -2098,17 +3848,13 @@ class Cache:
                         break
 
                     count += len(rows)
-                    delete = (
-                        f'DELETE FROM {self.table_name} WHERE rowid IN ({select_policy.format(fields="rowid", now=now)})'
-                    )
-                    #delete = (
-                    #    'DELETE FROM Cache WHERE rowid IN (%s)'
-                    #    % select_policy.format(fields='rowid', now=now)
-                    #)
-                    sql(delete, (10,))
+                    sql(self._statements['delete_cull'], (10,))
 
                     for (filename,) in rows:
                         cleanup(filename)
+
+                    if self._metrics is not None:
+                        self._metrics.incr('culled', len(rows))
         except Timeout:
             raise Timeout(count) from None
 
@@ -2216,6 +3962,212 @@ class Cache:
             for key, raw in rows:
                 yield _disk_get(key, raw)
 
+    def _range_key(self, key):
+        # Database key of a range bound. Only raw keys keep their order in
+        # the Cache_key_raw index.
+        if not self._disk.sorted_keys:
+            raise TypeError(f'{type(self._disk).__name__} does not store keys in sort order')
+        db_key, raw = self._disk.put(key)
+        if not raw:
+            raise TypeError(f'range keys must be str, bytes, int or float, not {type(key).__name__}')
+        return db_key
+
+    def _range_where(self, minimum, maximum, inclusive=(True, True)):
+        """Return WHERE clauses and arguments selecting raw keys between
+        `minimum` and `maximum`. An open bound stops at the type class of the
+        other bound.
+        """
+        lower = None if minimum is None else self._range_key(minimum)
+        upper = None if maximum is None else self._range_key(maximum)
+        clauses, args = ['raw = 1'], []
+
+        if lower is not None:
+            clauses.append('key >= ?' if inclusive[0] else 'key > ?')
+            args.append(lower)
+        elif upper is not None:
+            clauses.append('key >= ?')
+            args.append(_key_class_bounds(upper)[0])
+
+        if upper is not None:
+            clauses.append('key <= ?' if inclusive[1] else 'key < ?')
+            args.append(upper)
+        elif lower is not None and _key_class_bounds(lower)[1] is not None:
+            clauses.append('key < ?')
+            args.append(_key_class_bounds(lower)[1])
+
+        return clauses, args
+
+    def _range_page(self, where, cursor=None, limit=100, reverse=False, values=False):
+        # Keyset pagination on the Cache_key_raw index: each page continues
+        # after the last key of the previous one.
+        clauses, args = where
+        clauses, args = list(clauses), list(args)
+        if cursor is not None:
+            clauses.append('key < ?' if reverse else 'key > ?')
+            args.append(self._range_key(cursor))
+        clauses.append('(expire_time IS NULL OR expire_time > ?)')
+        args.extend((time.time(), limit))
+
+        columns = 'key, raw, mode, filename, value' if values else 'key, raw'
+        select = (
+            f'SELECT {columns} FROM {self.table_name}'
+            f' WHERE {" AND ".join(clauses)}'
+            f' ORDER BY key {"DESC" if reverse else "ASC"} LIMIT ?'
+        )
+        rows = self._sql(select, args).fetchall()
+        _disk_get = self._disk.get
+
+        if not values:
+            result = [_disk_get(key, raw) for key, raw in rows]
+        else:
+            result = []
+            for key, raw, mode, filename, value in rows:
+                try:
+                    value = self._disk.fetch(mode, filename, value, False)
+                except IOError as error:
+                    if error.errno == errno.ENOENT:
+                        # Key was deleted before we could retrieve result.
+                        continue
+                    raise
+                result.append((_disk_get(key, raw), value))
+
+        cursor = _disk_get(*rows[-1][:2]) if len(rows) == limit else None
+        return result, cursor
+
+    def _irange(self, where, reverse, values):
+        cursor = None
+        while True:
+            rows, cursor = self._range_page(where, cursor, 100, reverse, values)
+            yield from rows
+            if cursor is None:
+                break
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False, values=False):
+        """Iterate keys between `minimum` and `maximum` in sort order.
+        Range queries use the index on the key column and page through it, so
+        only matching rows are read. Keys stored raw (str, bytes, int and
+        float) are ordered as in Python, numbers before str before bytes.
+        Other keys are pickled and never part of a range. When one bound is
+        None the range stops at the end of the other bound's type. Expired
+        items are skipped.
+        >>> cache = Cache()
+        >>> for key in ['b', 'a', 'd', 'c', 1, 2]:
+        ...     cache[key] = key
+        >>> list(cache.irange('b', 'c'))
+        ['b', 'c']
+        >>> list(cache.irange('b', reverse=True))
+        ['d', 'c', 'b']
+        >>> list(cache.irange(maximum=1, values=True))
+        [(1, 1)]
+        :param minimum: lower bound key (default None, unbounded)
+        :param maximum: upper bound key (default None, unbounded)
+        :param tuple inclusive: whether minimum and maximum are included
+            (default (True, True))
+        :param bool reverse: iterate in descending order (default False)
+        :param bool values: yield (key, value) pairs (default False)
+        :return: iterator of keys or key and value pairs
+        :raises TypeError: if a bound is not a raw key or the disk does not
+            store keys in sort order
+        """
+        where = self._range_where(minimum, maximum, inclusive)
+        return self._irange(where, reverse, values)
+
+    def prefix_scan(self, prefix, reverse=False, values=False):
+        """Iterate str or bytes keys starting with `prefix` in sort order.
+        >>> cache = Cache()
+        >>> for key in ['user:1', 'user:2', 'users', 'group:1']:
+        ...     cache[key] = key
+        >>> list(cache.prefix_scan('user:'))
+        ['user:1', 'user:2']
+        :param prefix: str or bytes key prefix
+        :param bool reverse: iterate in descending order (default False)
+        :param bool values: yield (key, value) pairs (default False)
+        :return: iterator of keys or key and value pairs
+        :raises TypeError: if prefix is not str or bytes
+        """
+        if type(prefix) not in (str, bytes):
+            raise TypeError(f'prefix must be str or bytes, not {type(prefix).__name__}')
+        return self.irange(prefix, _prefix_end(prefix), (True, False), reverse, values)
+
+    def bisect_left(self, key):
+        """Return the number of keys of the same type sorting before `key`.
+        >>> cache = Cache()
+        >>> for key in ['a', 'c', 'e', 0]:
+        ...     cache[key] = key
+        >>> cache.bisect_left('c'), cache.bisect_right('c')
+        (1, 2)
+        :param key: str, bytes, int or float key
+        :return: insertion position of `key` among keys of its type
+        :raises TypeError: if key is not a raw key
+        """
+        return self._bisect(key, inclusive=False)
+
+    def bisect_right(self, key):
+        """Return the number of keys of the same type sorting before or equal
+        to `key`. See `Cache.bisect_left`.
+        :param key: str, bytes, int or float key
+        :return: insertion position after `key` among keys of its type
+        :raises TypeError: if key is not a raw key
+        """
+        return self._bisect(key, inclusive=True)
+
+    def _bisect(self, key, inclusive):
+        clauses, args = self._range_where(None, key, (True, inclusive))
+        clauses.append('(expire_time IS NULL OR expire_time > ?)')
+        args.append(time.time())
+        select = f'SELECT COUNT(*) FROM {self.table_name} WHERE {" AND ".join(clauses)}'
+        ((count,),) = self._sql(select, args).fetchall()
+        return count
+
+    def page(self, cursor=None, limit=100, minimum=None, maximum=None, inclusive=(True, True), reverse=False, values=False):
+        """Return one page of keys between `minimum` and `maximum` in sort
+        order and the cursor of the next page. See `Cache.irange`.
+        >>> cache = Cache()
+        >>> for key in 'abcde':
+        ...     cache[key] = key
+        >>> keys, cursor = cache.page(limit=3)
+        >>> keys
+        ['a', 'b', 'c']
+        >>> cache.page(cursor, limit=3)
+        (['d', 'e'], None)
+        :param cursor: cursor returned with the previous page
+            (default None, first page)
+        :param int limit: max number of keys per page (default 100)
+        :param minimum: lower bound key (default None, unbounded)
+        :param maximum: upper bound key (default None, unbounded)
+        :param tuple inclusive: whether minimum and maximum are included
+            (default (True, True))
+        :param bool reverse: page in descending order (default False)
+        :param bool values: return (key, value) pairs (default False)
+        :return: (list of keys or items, cursor) with cursor None after the
+            last page
+        :raises TypeError: if a bound is not a raw key
+        """
+        where = self._range_where(minimum, maximum, inclusive)
+        return self._range_page(where, cursor, limit, reverse, values)
+
+    async def apage(self, cursor=None, limit=100, minimum=None, maximum=None, inclusive=(True, True), reverse=False, values=False):
+        """Async version of `Cache.page` run on the async worker pool.
+        :return: (list of keys or items, cursor) with cursor None after the
+            last page
+        """
+        return await self._arun(self.page, cursor, limit, minimum, maximum, inclusive, reverse, values)
+
+    async def airange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False, values=False):
+        """Async version of `Cache.irange`, each page read on the async
+        worker pool.
+        >>> async for key in cache.airange('a', 'b'):
+        ...     value = await cache.aget(key)
+        """
+        where = self._range_where(minimum, maximum, inclusive)
+        cursor = None
+        while True:
+            rows, cursor = await self._arun(self._range_page, where, cursor, 100, reverse, values)
+            for row in rows:
+                yield row
+            if cursor is None:
+                break
+
     def _iter(self, ascending=True):
         sql = self._sql
         rows = sql(f'SELECT MAX(rowid) FROM {self.table_name}').fetchall()
@@ -2249,6 +4201,47 @@ class Cache:
             for rowid, key, raw in rows:
                 yield _disk_get(key, raw)
 
+    def _max_rowid(self):
+        ((max_rowid,),) = self._sql(f'SELECT MAX(rowid) FROM {self.table_name}').fetchall()
+        return max_rowid
+
+    def _iter_batch(self, rowid, bound, ascending=True, limit=100):
+        # Same paging as `_iter` but returns one decoded batch so each page
+        # can run on whichever async worker thread is free.
+        select = (
+            f'SELECT rowid, key, raw FROM {self.table_name}'
+            ' WHERE ? < rowid AND rowid < ?'
+            ' ORDER BY rowid %s LIMIT ?'
+        ) % ('ASC' if ascending else 'DESC')
+        args = (rowid, bound, limit) if ascending else (0, rowid, limit)
+        _disk_get = self._disk.get
+        return [(rowid, _disk_get(key, raw)) for rowid, key, raw in self._sql(select, args).fetchall()]
+
+    async def _aiter(self, ascending=True):
+        max_rowid = await self._arun(self._max_rowid)
+        if max_rowid is None:
+            return
+
+        bound = max_rowid + 1
+        rowid = 0 if ascending else bound
+        while True:
+            rows = await self._arun(self._iter_batch, rowid, bound, ascending)
+            if not rows:
+                break
+            for rowid, key in rows:
+                yield key
+
+    def __aiter__(self):
+        """Async iterate keys in cache including expired items.
+        >>> async for key in cache:
+        ...     value = await cache.aget(key)
+        """
+        return self._aiter()
+
+    def areversed(self):
+        "Async reverse iterate keys in cache including expired items."
+        return self._aiter(ascending=False)
+
     def __iter__(self):
         "Iterate keys in cache including expired items."
         iterator = self._iter()
@@ -2268,6 +4261,8 @@ class Cache:
         :return: (hits, misses)
         """
         # pylint: disable=E0203,W0201
+        if self._metrics is not None:
+            self.flush_metrics(retry=True)
         result = (self.reset('hits'), self.reset('misses'))
 
         if reset:
@@ -2278,109 +4273,670 @@ class Cache:
 
         return result
 
+    def metrics(self, enable=True, reset=False):
+        """Return in-memory metrics of this cache.
+        Unlike `Cache.stats`, metrics are recorded in per-thread buffers and
+        reads stay on the fast path. Hits and misses are flushed to the
+        settings reported by `Cache.stats` every
+        `CachezConfigz.metrics_flush_interval` seconds.
+        Counters are hits, misses, bytes_read, bytes_written, values_file,
+        values_inline, txn_retries, txn_timeouts, expired and culled.
+        Latency histograms are kept per operation with cumulative buckets
+        keyed by upper bound in seconds.
+        :param bool enable: enable collecting metrics (default True)
+        :param bool reset: reset metrics to zero (default False)
+        :return: dict with 'counters', 'latency' and 'file_value_ratio'
+        """
+        metrics = self._metrics
+        result = (metrics or Metrics()).snapshot()
+
+        if metrics is not None and (reset or not enable):
+            self.flush_metrics(retry=True)
+            if reset:
+                metrics.reset()
+
+        if not enable:
+            self._metrics = None
+        elif metrics is None:
+            self._metrics = Metrics(flush_interval = CachezConfigz.metrics_flush_interval)
+
+        return result
+
+    def metrics_prometheus(self, prefix='cachez', labels=None):
+        """Return metrics in the Prometheus text exposition format.
+        Samples are labeled with the cache `filename` and `table`.
+        :param str prefix: metric name prefix (default 'cachez')
+        :param dict labels: extra labels added to every sample (default None)
+        :return: exposition text
+        """
+        labels = dict({'cache': self.filename, 'table': self.table_name}, **(labels or {}))
+        return to_prometheus((self._metrics or Metrics()).snapshot(), prefix = prefix, labels = labels)
+
     def volume(self):
         """Return estimated total size of cache on disk.
         :return: size in bytes
         """
         ((page_count,),) = self._sql('PRAGMA page_count').fetchall()
         total_size = self._page_size * page_count + self.reset('size')
+        self._volume_estimate = (time.time(), total_size)
         return total_size
 
-    def save(self, path: str = None, compressed: bool = False):
+    def _estimated_volume(self):
+        """Return the last `volume` if younger than
+        `CachezConfigz.volume_cache_ttl` seconds, else query it again.
+        Keeps `PRAGMA page_count` off most writes that reach culling.
         """
-        Closes the Database and saves the file to target path
+        estimate = self._volume_estimate
+        if estimate is not None and time.time() - estimate[0] < CachezConfigz.volume_cache_ttl:
+            return estimate[1]
+        return self.volume()
+
+    @property
+    def _maintained(self):
+        "True when a background worker does expiry and culling for this cache."
+        return self._maintenance is not None and self._maintenance.alive
+
+    def start_maintenance(self, interval=None, budget=None):
+        """Start a background worker that maintains the cache.
+        While the worker runs, writes no longer expire or cull items inline.
+        Every `interval` seconds the worker instead runs `Cache.maintain`
+        for at most `budget` seconds. The worker is a daemon thread and
+        stops with `Cache.stop_maintenance` or when the cache is garbage
+        collected.
+        :param float interval: seconds between rounds (default CachezConfigz.maintenance_interval)
+        :param float budget: max seconds of work per round (default CachezConfigz.maintenance_budget)
+        :return: the maintenance worker
         """
-        self.close()
+        if self._maintained:
+            return self._maintenance
+        self._maintenance = MaintenanceWorker(self, interval, budget)
+        self._maintenance.start()
+        return self._maintenance
+
+    def stop_maintenance(self, timeout=None):
+        """Stop the background maintenance worker if running.
+        Writes expire and cull items inline again afterwards.
+        :param float timeout: seconds to wait for a running round (default None, no limit)
+        """
+        worker, self._maintenance = self._maintenance, None
+        if worker is not None:
+            worker.stop(timeout)
+
+    def start_write_behind(self, batch_size=None, batch_interval=None):
+        """Start a writer thread that applies `set`, `add` and `incr` in
+        batches.
+        Instead of a transaction per call, the calls queue their write and
+        return a :class:`concurrent.futures.Future` resolved with their usual
+        result, or exception, once the batch holding the write committed.
+        The async versions await it. Batches commit every `batch_interval`
+        seconds or `batch_size` writes in one transaction, each write in a
+        savepoint so a failing write does not affect the rest.
+        Queued writes are not visible to reads until committed, and other
+        operations like `delete` are not queued and may apply first. Use
+        `Cache.flush_writes` to wait for queued writes. File-like values for
+        `read` must stay open until their future resolves. Writes made inside
+        a transaction of the calling thread are applied directly.
+        :param int batch_size: max writes per transaction (default CachezConfigz.write_batch_size)
+        :param float batch_interval: max seconds a write waits for its batch to fill (default CachezConfigz.write_batch_interval)
+        :return: the write-behind worker
+        """
+        if self._writer is not None and self._writer.alive:
+            return self._writer
+        self._writer = WriteBehind(self, batch_size, batch_interval)
+        self._writer.start()
+        return self._writer
+
+    def stop_write_behind(self, timeout=None):
+        """Commit queued writes and stop the write-behind worker if running.
+        Writes are applied directly again afterwards.
+        :param float timeout: seconds to wait for queued writes (default None, no limit)
+        """
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.stop(timeout)
+
+    def flush_writes(self, timeout=None):
+        """Wait until writes queued for the write-behind worker committed.
+        :param float timeout: max seconds to wait (default None, no limit)
+        :return: True if all queued writes committed within `timeout`
+        """
+        writer = self._writer
+        if writer is None or writer.owner:
+            return True
+        return writer.flush(timeout)
+
+    async def aflush_writes(self, timeout=None):
+        """Async version of `Cache.flush_writes`.
+        :return: True if all queued writes committed within `timeout`
+        """
+        return await self._arun(self.flush_writes, timeout)
+
+    def _queues_write(self) -> bool:
+        "True when `set`, `add` and `incr` of the calling thread go to the write-behind worker."
+        writer = self._writer
+        return writer is not None and not writer.owner and not getattr(self._local, 'write_direct', False)
+
+    def _write_behind(self, func, *args):
+        """Queue `func(*args)` for the write-behind worker.
+        Inside a transaction of the calling thread, or in a forked child
+        without the worker, the write is applied directly.
+        :return: future of the result
+        """
+        writer = self._writer
+        if writer.alive and not getattr(self._local, 'txn', False):
+            return writer.submit(func, *args)
+        future = futures.Future()
+        self._local.write_direct = True
+        try:
+            future.set_result(func(*args))
+        except Exception as error:
+            future.set_exception(error)
+        finally:
+            self._local.write_direct = False
+        return future
+
+    async def _awrite(self, func, *args, **kwargs):
+        """Run write `func` and await its commit when it is queued for the
+        write-behind worker.
+        """
+        if self._writer is None:
+            return await self._arun(func, *args, **kwargs)
+        if self._txn_key in _async_txn_workers.get():
+            # Inside `atransact` the write runs on the transaction's worker.
+            future = await self._arun(func, *args, **kwargs)
+        else:
+            future = func(*args, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def maintain(self, budget=None, retry=False, orphans=True):
+        """Run one round of maintenance for at most `budget` seconds.
+        In order: remove expired items, evict items by policy until volume is
+        under the size limit, remove orphaned value files and reclaim free
+        pages with incremental vacuum. Work left when the budget runs out is
+        picked up by the next round.
+        Orphaned files are value files that no cache database in the
+        directory references and that are older than
+        `CachezConfigz.maintenance_orphan_age` seconds. Incremental vacuum
+        only applies when `sqlite_auto_vacuum` is 2 (INCREMENTAL).
+        Raises :exc:`Timeout` error when database timeout occurs and `retry` is
+        `False` (default).
+        :param float budget: max seconds of work (default CachezConfigz.maintenance_budget)
+        :param bool retry: retry if database timeout occurs (default False)
+        :param bool orphans: also scan for orphaned files (default True)
+        :return: dict with counts of 'expired' and 'culled' items, 'orphans'
+            removed and 'vacuumed' pages
+        :raises Timeout: if database timeout occurs
+        """
+        budget = CachezConfigz.maintenance_budget if budget is None else budget
+        deadline = time.time() + budget
+        stats = {'expired': 0, 'culled': 0, 'orphans': 0, 'vacuumed': 0}
+
+        # Remove expired items.
+
+        select = (
+            f'SELECT rowid, filename FROM {self.table_name}'
+            ' WHERE expire_time IS NOT NULL AND expire_time < ?'
+            ' ORDER BY expire_time LIMIT 100'
+        )
+        while time.time() < deadline:
+            with self._transact(retry) as (sql, cleanup):
+                rows = sql(select, (time.time(),)).fetchall()
+                for chunk in _chunked([rowid for rowid, _ in rows]):
+                    sql(f'DELETE FROM {self.table_name} WHERE rowid IN ({",".join("?" * len(chunk))})', chunk)
+                for _, filename in rows:
+                    cleanup(filename)
+            stats['expired'] += len(rows)
+            if len(rows) < 100:
+                break
+
+        # Remove items by policy. Pages freed but not yet vacuumed do not
+        # count towards the size limit.
+
+        def used_volume():
+            ((free_pages,),) = self._sql('PRAGMA freelist_count').fetchall()
+            return self.volume() - self._page_size * free_pages
+
+        select_policy = self._sqlconf.policies[self.eviction_policy]['cull']
+        if select_policy is not None:
+            self.flush_access(retry)
+            select = select_policy.format(fields='rowid, filename', now=time.time())
+            while time.time() < deadline and used_volume() > self.size_limit:
+                with self._transact(retry) as (sql, cleanup):
+                    rows = sql(select, (10,)).fetchall()
+                    for chunk in _chunked([rowid for rowid, _ in rows]):
+                        sql(f'DELETE FROM {self.table_name} WHERE rowid IN ({",".join("?" * len(chunk))})', chunk)
+                    for _, filename in rows:
+                        cleanup(filename)
+                stats['culled'] += len(rows)
+                if not rows:
+                    break
+
+        # Remove orphaned files. The scan resumes across rounds.
+
+        if orphans:
+            if self._orphan_scan is None:
+                self._orphan_scan = self._scan_orphans()
+            while time.time() < deadline:
+                filename = next(self._orphan_scan, None)
+                if filename is None:
+                    self._orphan_scan = None
+                    break
+                self._disk.remove(filename)
+                stats['orphans'] += 1
+
+        # Reclaim free pages.
+
+        ((auto_vacuum,),) = self._sql('PRAGMA auto_vacuum').fetchall()
+        while auto_vacuum == 2 and time.time() < deadline:
+            ((free_pages,),) = self._sql('PRAGMA freelist_count').fetchall()
+            if not free_pages:
+                break
+            pages = min(free_pages, 256)
+            with self._transact(retry) as (sql, _):
+                sql(f'PRAGMA incremental_vacuum({pages})').fetchall()
+            stats['vacuumed'] += pages
+
+        if self._metrics is not None:
+            self._metrics.incr('expired', stats['expired'])
+            self._metrics.incr('culled', stats['culled'])
+            self.flush_metrics(retry)
+
+        self.volume()
+        return stats
+
+    def _scan_orphans(self):
+        "Yield relative paths of orphaned value files in the cache directory."
+        referenced = referenced_files(self._directory, self._filepath.string)
+        if referenced is None:
+            return
+        cutoff = time.time() - CachezConfigz.maintenance_orphan_age
+        for dirpath, _, files in os.walk(self._directory):
+            for name in files:
+                if not name.endswith('.val'):
+                    continue
+                full_path = op.join(dirpath, name)
+                filename = op.relpath(full_path, self._directory)
+                if filename in referenced:
+                    continue
+                try:
+                    if op.getmtime(full_path) > cutoff:
+                        continue
+                except OSError:
+                    continue
+                yield filename
+
+    def snapshot(self, path: str = None) -> str:
+        """Write a consistent copy of the database using the SQLite online
+        backup API.
+        The copy is taken within a single read transaction so concurrent
+        readers and writers on the cache are not blocked and the database
+        remains open. Defaults to a temporary file in the cache directory.
+        :param str path: local file path for the copy (default None)
+        :return: path of the copy
+        """
+        path = path or self._snapshot_path()
+        dst = sqlite3.connect(path)
+        try:
+            with dst:
+                self._con.backup(dst)
+        finally:
+            dst.close()
+        return path
+
+    def _snapshot_path(self, kind: str = 'snapshot') -> str:
+        # Contains the database filename so `check` skips it.
+        return op.join(self._directory, f'{self._filename}.{kind}-{os.getpid()}-{threading.get_ident()}')
+
+    def write_delta(self, path: str, since: float, until: float = None) -> str:
+        """Write rows changed since `since` to a delta database at `path`.
+        The delta holds every row stored after `since`, the current row of
+        every key in the change log after `since` and the keys removed since.
+        Rows are read in a single transaction on a separate connection.
+        Requires change tracking, see `create_change_log`.
+        :param str path: local file path for the delta
+        :param float since: store time of the previous snapshot
+        :param float until: store time of this snapshot (default now)
+        :return: path of the delta
+        """
+        until = time.time() if until is None else until
+        table = self.table_name
+        # Writers compute store_time before waiting on the database lock, so
+        # rows committed just after the previous snapshot may carry an older
+        # time. Shipping the overlap again is harmless.
+        after = since - max(self._timeout, 1)
+        con = sqlite3.connect(path, isolation_level=None)
+        try:
+            con.execute('ATTACH DATABASE ? AS src', (self.filepath.string,))
+            con.execute('CREATE TABLE Delta (key TEXT NOT NULL UNIQUE, value)')
+            con.execute(
+                'CREATE TABLE Rows ('
+                ' key BLOB,'
+                ' raw INTEGER,'
+                ' store_time REAL,'
+                ' expire_time REAL,'
+                ' access_time REAL,'
+                ' access_count INTEGER DEFAULT 0,'
+                ' tag BLOB,'
+                ' size INTEGER DEFAULT 0,'
+                ' mode INTEGER DEFAULT 0,'
+                ' filename TEXT,'
+                ' value BLOB)'
+            )
+            con.execute('CREATE TABLE Deleted (key BLOB, raw INTEGER)')
+            con.execute('BEGIN')
+            con.execute(
+                f'INSERT INTO Rows SELECT {_ROW_COLUMNS} FROM src.{table}'
+                ' WHERE store_time > ? OR rowid IN ('
+                f' SELECT t.rowid FROM src.{table} t'
+                f' JOIN src.Changes_{table} c ON t.key = c.key AND t.raw = c.raw'
+                ' WHERE c.change_time > ?)',
+                (after, after),
+            )
+            con.execute(
+                f'INSERT INTO Deleted SELECT DISTINCT key, raw FROM src.Changes_{table} c'
+                ' WHERE change_time > ? AND NOT EXISTS ('
+                f' SELECT 1 FROM src.{table} t WHERE t.key = c.key AND t.raw = c.raw)',
+                (after,),
+            )
+            con.executemany(
+                'INSERT INTO Delta VALUES (?, ?)',
+                (('table_name', table), ('since', since), ('until', until)),
+            )
+            con.execute('COMMIT')
+            con.execute('DETACH DATABASE src')
+        finally:
+            con.close()
+        return path
+
+    def apply_delta(self, path: str) -> bool:
+        """Apply a delta database written by `write_delta`.
+        The delta is applied only if it continues from the current
+        `snapshot_time`, which then advances to the delta's end.
+        :param str path: local file path of the delta
+        :return: True if the delta was applied
+        :raises Timeout: if database timeout occurs
+        """
+        table = self.table_name
+        sql = self._sql
+        sql('ATTACH DATABASE ? AS delta', (path,))
+        try:
+            meta = dict(sql('SELECT key, value FROM delta.Delta').fetchall())
+            snapshot_time = self.reset('snapshot_time')
+            if meta['until'] <= snapshot_time: return False
+            if meta['since'] > snapshot_time:
+                logger.warning(f'Delta {path} starts at {meta["since"]} after snapshot {snapshot_time} of {self.filename}. Skipping')
+                return False
+            replaced = (
+                f'SELECT t.rowid FROM {table} t JOIN ('
+                ' SELECT key, raw FROM delta.Rows'
+                ' UNION ALL SELECT key, raw FROM delta.Deleted) d'
+                ' ON t.key = d.key AND t.raw = d.raw'
+            )
+            with self._transact(retry=True) as (sql, cleanup):
+                filenames = sql(
+                    f'SELECT filename FROM {table} WHERE rowid IN ({replaced})'
+                    ' AND filename IS NOT NULL AND filename NOT IN ('
+                    ' SELECT filename FROM delta.Rows WHERE filename IS NOT NULL)'
+                ).fetchall()
+                # Delete then insert rather than INSERT OR REPLACE so the
+                # count and size triggers fire.
+                sql(f'DELETE FROM {table} WHERE rowid IN ({replaced})')
+                sql(f'INSERT INTO {table} ({_ROW_COLUMNS}) SELECT {_ROW_COLUMNS} FROM delta.Rows')
+                sql(
+                    f'UPDATE Settings_{table} SET value = ? WHERE key = ?',
+                    (meta['until'], 'snapshot_time'),
+                )
+                for (filename,) in filenames:
+                    cleanup(filename)
+            self.snapshot_time = meta['until']
+            return True
+        finally:
+            sql('DETACH DATABASE delta')
+
+    def _save_path(self, path: str = None, compressed: bool = False):
         from lazy.io.pathz_v2 import get_path
         path = path or self.filename
-        if not path.endswith('.gz') or not path.endswith('.db'):
-            p = get_path(path)
-            p = p.joinpath(self.filename)
-            path = p.string
+        if not path.endswith(('.gz', '.db')):
+            path = get_path(path).joinpath(self.filename).string
         if compressed and '.gz' not in path: path += '.gz'
-        if path == self.filename: return self.filepath  
-        p = get_path(path)
-        with p.open('wb') as f, self.filepath.open('rb') as r:
-            data = r.read()
-            if compressed: data = _gzip.compress(data)
-            f.write(data)
+        if path == self.filename: return None
+        return get_path(path)
+
+    @staticmethod
+    def _list_deltas(p) -> List[Any]:
+        """Return delta files saved next to snapshot `p`, oldest first."""
+        from lazy.io.pathz_v2 import get_path
+        prefix = (p.name[:-3] if p.name.endswith('.gz') else p.name) + '.delta-'
+        if p.is_cloud: paths = p.parent.glob(f'{prefix}*')
+        else: paths = [get_path(op.join(p.parent.string, name)) for name in os.listdir(p.parent.string) if name.startswith(prefix)]
+        return sorted(paths, key = lambda delta: int(delta.name[len(prefix):].split('.')[0]))
+
+    def _take_snapshot(self, p, compressed: bool, incremental: bool):
+        """Write the local file to upload for target `p`.
+        :return: (local path, target path, snapshot_time to record or None)
+        """
+        from lazy.io.pathz_v2 import get_path
+        since = self.reset('snapshot_time') if incremental else 0
+        if since and not self.track_changes:
+            logger.warning(f'Change tracking is disabled for {self.filename}. Saving a full snapshot')
+            since = 0
+        until = time.time()
+        if not since:
+            # Recorded before the backup so the base carries it.
+            self.reset('snapshot_time', until)
+            if self.track_changes: self._prune_changes(until)
+            return self.snapshot(), p, None
+        local = self.write_delta(self._snapshot_path('delta'), since, until)
+        # The next delta starts at `until` once this one is saved, or again at
+        # `since` if saving fails, so older changes are never read again.
+        self._prune_changes(since)
+        base = p.string[:-3] if p.string.endswith('.gz') else p.string
+        target = get_path(f'{base}.delta-{int(until * 1000000)}' + ('.gz' if compressed else ''))
+        return local, target, until
+
+    def _prune_changes(self, before: float):
+        "Remove change log rows no delta starting at `before` or later reads."
+        self._sql_retry(f'DELETE FROM Changes_{self.table_name} WHERE change_time < ?', (before - max(self._timeout, 1),))
+
+    def _upload(self, local: str, p, compressed: bool, chunk_size: int):
+        with open(local, 'rb') as r, p.open('wb', block_size = chunk_size) as f:
+            if compressed:
+                with _gzip.open(f, 'wb') as gz:
+                    shutil.copyfileobj(r, gz, chunk_size)
+            else: shutil.copyfileobj(r, f, chunk_size)
+
+    async def _async_upload(self, local: str, p, compressed: bool, chunk_size: int):
+        compressor = _zlib.compressobj(wbits = 31) if compressed else None
+        with open(local, 'rb') as r:
+            async with p.async_open('wb', block_size = chunk_size, compression = None) as f:
+                while True:
+                    chunk = await self._arun(r.read, chunk_size)
+                    if not chunk: break
+                    if compressor: chunk = await self._arun(compressor.compress, chunk)
+                    if chunk: await f.write(chunk)
+                if compressor: await f.write(compressor.flush())
+
+    def save(self, path: str = None, compressed: bool = False, chunk_size: int = None, incremental: bool = False):
+        """
+        Saves a consistent snapshot of the Database to target path.
+        The snapshot is streamed in chunks of `chunk_size` bytes, through a
+        streaming gzip compressor if compressed, so memory use stays bounded
+        and the cache remains open.
+        If `incremental`, only rows changed since the previous save are
+        written to a `.delta-<time>` file next to the target path, which
+        `load` applies on top of the base. Requires `track_changes`, the
+        first save is always a full snapshot and removes older deltas.
+        """
+        p = self._save_path(path, compressed)
+        if p is None: return self.filepath
+        chunk_size = chunk_size or CachezConfigz.save_chunk_size
+        local, p, until = self._take_snapshot(p, compressed, incremental)
+        try:
+            self._upload(local, p, compressed, chunk_size)
+        finally:
+            os.remove(local)
+        if until: self.reset('snapshot_time', until)
+        else:
+            for delta in self._list_deltas(p): delta.unlink(missing_ok = True)
         logger.info(f'Saved DB {self.filename}\nFrom {self.filepath.string}\nTo {p.string}')
         return p
 
-    async def async_save(self, path: str = None, compressed: bool = False):
+    async def async_save(self, path: str = None, compressed: bool = False, chunk_size: int = None, incremental: bool = False):
         """
-        Closes the Database and async saves the file to target path
+        Async saves a consistent snapshot of the Database to target path.
+        Taking the snapshot, reading and compressing chunks run on the async
+        worker pool. See `save` for `incremental`.
         """
-        self.close()
-        from lazy.io.pathz_v2 import get_path
-        path = path or self.filename
-        if not path.endswith('.gz') or not path.endswith('.db'):
-            p = get_path(path)
-            p = p.joinpath(self.filename)
-            path = p.string
-        if compressed and '.gz' not in path: path += '.gz'
-        if path == self.filename: return self.filepath
-        p = get_path(path)
-        async with p.async_open('wb', compression = None) as f:
-            async with self.filepath.async_open('rb') as r:
-                data = await r.read()
-                if compressed: data = _gzip.compress(data)
-                await f.write(data)
+        p = self._save_path(path, compressed)
+        if p is None: return self.filepath
+        chunk_size = chunk_size or CachezConfigz.save_chunk_size
+        local, p, until = await self._arun(self._take_snapshot, p, compressed, incremental)
+        try:
+            await self._async_upload(local, p, compressed, chunk_size)
+        finally:
+            os.remove(local)
+        if until: await self._arun(self.reset, 'snapshot_time', until)
+        else:
+            for delta in await self._arun(self._list_deltas, p): await delta.async_unlink(missing_ok = True)
         logger.info(f'[Async] Saved DB {self.filename}\nFrom {self.filepath.string}\nTo {p.string}')
         return p
 
+    @staticmethod
+    def _load_target(src, directory: str, compressed: bool):
+        from lazy.io.pathz_v2 import get_path
+        dir_path = get_path(directory)
+        if not dir_path.exists():
+            try: dir_path.mkdir(exist_ok=True, parents=True)
+            except: pass
+        return dir_path.joinpath(src.name[:-3] if compressed else src.name)
+
+    @staticmethod
+    def _replace_db(partial: str, target: str):
+        # Stale journal files would be replayed against the new database.
+        for suffix in ('-wal', '-shm', '-journal'):
+            with cl.suppress(FileNotFoundError):
+                os.remove(target + suffix)
+        os.replace(partial, target)
+
+    @staticmethod
+    def _download(src, dst: str, compressed: bool, chunk_size: int):
+        with src.open('rb', block_size = chunk_size) as r, open(dst, 'wb') as f:
+            if compressed:
+                with _gzip.open(r, 'rb') as gz:
+                    shutil.copyfileobj(gz, f, chunk_size)
+            else: shutil.copyfileobj(r, f, chunk_size)
+
+    @staticmethod
+    async def _async_download(src, dst: str, compressed: bool, chunk_size: int):
+        run = ft.partial(asyncio.get_running_loop().run_in_executor, None)
+        decompressor = _zlib.decompressobj(wbits = 31) if compressed else None
+        with open(dst, 'wb') as f:
+            async with src.async_open('rb', block_size = chunk_size) as r:
+                while True:
+                    chunk = await r.read(chunk_size)
+                    if not chunk: break
+                    if decompressor:
+                        # Bound the output per step, highly compressed
+                        # input can expand far beyond `chunk_size`.
+                        while chunk:
+                            data = await run(decompressor.decompress, chunk, chunk_size)
+                            await run(f.write, data)
+                            chunk = decompressor.unconsumed_tail
+                    else: await run(f.write, chunk)
+                if decompressor: await run(f.write, decompressor.flush())
+
     @classmethod
-    def load(cls, src_path: str, directory: str, table_name: str = CachezConfigz.default_table, timeout: int = 60, disk: Type[Disk] = Disk, sql_config: Dict[str, Any] = {}, **settings) -> 'Cache':
+    def load(cls, src_path: str, directory: str, table_name: str = CachezConfigz.default_table, timeout: int = 60, disk: Type[Disk] = Disk, sql_config: Dict[str, Any] = {}, chunk_size: int = None, deltas: bool = True, **settings) -> 'Cache':
+        """
+        Loads the Database snapshot at `src_path` into `directory`, then
+        applies the chain of incremental deltas saved next to it unless
+        `deltas` is False.
+        """
         from lazy.io.pathz_v2 import get_path
         # should infer?
         compressed = bool(src_path.endswith('.gz'))
         src = get_path(src_path)
-        filename = src.string.rsplit('/')[-1].strip().split('_cache')[0].strip()
+        # The Cache opens the decompressed database, named without `.gz`.
+        target_path = cls._load_target(src, directory, compressed)
+        filename = target_path.name
         if not src.exists():
             logger.error(f'Load Failed as {src.string} does not exist. Initializing from new: {filename}')
             return cls(directory = directory, filename = filename, table_name = table_name, timeout = timeout, disk = disk, sql_config = sql_config, **settings)
 
-        dir_path = get_path(directory)
-        if not dir_path.exists():
-            try: dir_path.mkdir(exist_ok=True, parents=True)
-            except: pass
-        
-        target_path = dir_path.joinpath(src.filename_) if not compressed else dir_path.joinpath(src.filename_.replace('.gz', ''))
-        with src.open('rb') as r, target_path.open('wb') as f:
-            data = r.read()
-            if compressed: data = _gzip.decompress(data)
-            f.write(data)
+        chunk_size = chunk_size or CachezConfigz.save_chunk_size
+        partial = target_path.string + '.partial'
+        try:
+            cls._download(src, partial, compressed, chunk_size)
+            cls._replace_db(partial, target_path.string)
+        finally:
+            with cl.suppress(FileNotFoundError):
+                os.remove(partial)
 
         logger.info(f'Loaded DB {filename}\nFrom {src.string}\nTo {target_path.string}')
-        return cls(directory = directory, filename = filename, table_name = table_name, timeout = timeout, disk = disk, sql_config = sql_config, **settings)
+        cache = cls(directory = directory, filename = filename, table_name = table_name, timeout = timeout, disk = disk, sql_config = sql_config, **settings)
+        if not deltas: return cache
+        for delta in cls._list_deltas(src):
+            local = cache._snapshot_path('delta')
+            try:
+                cls._download(delta, local, delta.name.endswith('.gz'), chunk_size)
+                if cache.apply_delta(local): logger.info(f'Applied Delta {delta.string}')
+            finally:
+                with cl.suppress(FileNotFoundError):
+                    os.remove(local)
+        return cache
 
     @classmethod
-    async def async_load(cls, src_path: str, directory: str, table_name: str = CachezConfigz.default_table, timeout: int = 60, disk: Type[Disk] = Disk, sql_config: Dict[str, Any] = {}, **settings) -> 'Cache':
+    async def async_load(cls, src_path: str, directory: str, table_name: str = CachezConfigz.default_table, timeout: int = 60, disk: Type[Disk] = Disk, sql_config: Dict[str, Any] = {}, chunk_size: int = None, deltas: bool = True, **settings) -> 'Cache':
+        """
+        Async loads the Database snapshot at `src_path` into `directory`.
+        See `load` for `deltas`.
+        """
         from lazy.io.pathz_v2 import get_path
         compressed = bool(src_path.endswith('.gz'))
         src = get_path(src_path)
-        filename = src.string.rsplit('/')[-1].strip().split('_cache')[0].strip()
+        # The Cache opens the decompressed database, named without `.gz`.
+        target_path = cls._load_target(src, directory, compressed)
+        filename = target_path.name
         if not src.exists():
             logger.error(f'[Async] Load Failed as {src.string} does not exist. Initializing from new: {filename}')
             return cls(directory = directory, filename = filename, table_name = table_name, timeout = timeout, disk = disk, sql_config = sql_config, **settings)
-        
-        dir_path = get_path(directory)
-        if not await dir_path.async_exists():
-            try: dir_path.mkdir(exist_ok=True, parents=True)
-            except: pass
-        
-        target_path = dir_path.joinpath(src.filename_) if not compressed else dir_path.joinpath(src.filename_.replace('.gz', ''))
-        async with src.async_open('rb') as r:
-            async with target_path.async_open('wb') as f:
-                data = await r.read()
-                if compressed: data = _gzip.decompress(data)
-                await f.write(data)
+
+        chunk_size = chunk_size or CachezConfigz.save_chunk_size
+        partial = target_path.string + '.partial'
+        try:
+            await cls._async_download(src, partial, compressed, chunk_size)
+            cls._replace_db(partial, target_path.string)
+        finally:
+            with cl.suppress(FileNotFoundError):
+                os.remove(partial)
 
         logger.info(f'[Async] Loaded DB {filename}\nFrom {src.string}\nTo {target_path.string}')
-        return cls(directory = directory, filename = filename, table_name = table_name, timeout = timeout, disk = disk, sql_config = sql_config, **settings)
+        cache = cls(directory = directory, filename = filename, table_name = table_name, timeout = timeout, disk = disk, sql_config = sql_config, **settings)
+        if not deltas: return cache
+        for delta in await cache._arun(cls._list_deltas, src):
+            local = cache._snapshot_path('delta')
+            try:
+                await cls._async_download(delta, local, delta.name.endswith('.gz'), chunk_size)
+                if await cache._arun(cache.apply_delta, local): logger.info(f'[Async] Applied Delta {delta.string}')
+            finally:
+                with cl.suppress(FileNotFoundError):
+                    os.remove(local)
+        return cache
 
     def close(self):
-        """Close database connection."""
+        """Close database connection.
+        Writes queued for the write-behind worker are committed first.
+        """
+        writer = self._writer
+        if writer is not None and not writer.owner:
+            writer.flush()
+        self._close_async()
+        # Tables of a CacheDB leave the shared connection to `CacheDB.close`.
+        if self._db is None:
+            self._close_con()
+
+    def _close_con(self):
+        "Close the database connection of the calling thread."
         con = getattr(self._local, 'con', None)
 
         if con is None:
@@ -2393,6 +4949,23 @@ class Cache:
         except AttributeError:
             pass
 
+    def _close_async(self):
+        # Worker connections are thread-local and are released with their
+        # threads. Never wait here as `close` may run on a worker thread.
+        # Tables of a CacheDB leave the shared workers to the container.
+        if self._db is not None:
+            return
+        with self._async_lock:
+            if self._async_pid != os.getpid():
+                return
+            pools = self._async_txn_idle
+            if self._async_pool is not None:
+                pools.append(self._async_pool)
+            self._async_pool = None
+            self._async_txn_idle = []
+        for pool in pools:
+            pool.shutdown(wait = False)
+
     def __enter__(self):
         # Create connection in thread.
         # pylint: disable=unused-variable
@@ -2440,6 +5013,8 @@ class Cache:
             select = f'SELECT value FROM Settings_{self.table_name} WHERE key = ?'
             ((value,),) = sql_retry(select, (key,)).fetchall()
             setattr(self, key, value)
+            if key == 'eviction_policy':
+                self._compile_statements()
             return value
 
         if update:
@@ -2487,4 +5062,6 @@ class Cache:
             setattr(self._disk, attr, value)
 
         setattr(self, key, value)
+        if key == 'eviction_policy':
+            self._compile_statements()
         return value
\ No newline at end of file
@@ -0,0 +1,369 @@
+"""
+Benchmark suite for Cachez.
+
+Times Cache, ShardCache, Index and Deque operations for every combination
+of sqlmode profile, Disk, value size and concurrency mode, and reports the
+results as JSON so runs of different versions can be compared.
+
+Value sizes default to a small value plus values just under and well above
+the `disk_min_file_size` of each profile, covering both inline and file
+backed storage. Concurrency modes are a single thread, a thread pool,
+separate processes sharing the cache directory, and the async api.
+
+    python -m lazy.io.cachez.benchmark --ops 2000 --output bench.json
+    python -m lazy.io.cachez.benchmark --modes perf --disks Disk CDisk --concurrency threads
+    python -m lazy.io.cachez.benchmark --compare baseline.json bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import asyncio
+import argparse
+import platform
+import tempfile
+import itertools
+import multiprocessing as mp
+from concurrent import futures
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from .config import CachezConfigz
+from .base import Cache, Disk, CDisk
+from ._json import JSONDisk, OrJSONDisk
+from ._codec import CodecDisk
+from .persistent import Deque, Index
+from .extensions import ShardCache
+
+__all__ = ('run', 'compare', 'main')
+
+TARGETS = ('cache', 'shard', 'index', 'deque')
+MODES = ('default', 'standard', 'optim', 'perf')
+CONCURRENCY = ('serial', 'threads', 'processes', 'async')
+DISKS = {
+    'Disk': Disk,
+    'CDisk': CDisk,
+    'JSONDisk': JSONDisk,
+    'OrJSONDisk': OrJSONDisk,
+    'CodecDisk': CodecDisk,
+}
+
+# Fields identifying a benchmark case across runs.
+CASE_FIELDS = ('target', 'mode', 'disk', 'value_size', 'concurrency', 'workers', 'op')
+
+
+def sql_settings(mode: str) -> Dict[str, Any]:
+    "Return the sql settings of sqlmode profile `mode` without changing `CachezConfigz.sqlmode`."
+    return getattr(CachezConfigz, f'get_{mode}_sql_settings')()
+
+
+def value_sizes(mode: str) -> List[int]:
+    "Return value sizes around the `disk_min_file_size` of `mode`."
+    min_file_size = int(sql_settings(mode)['disk_min_file_size'])
+    return [128, min_file_size // 2, min_file_size * 2]
+
+
+def make_value(size: int, seed: int = 0) -> str:
+    "Return a JSON safe, moderately compressible str value of `size` characters."
+    rand = random.Random(seed)
+    return rand.getrandbits(max(size, 1) * 4).to_bytes(max(size, 1) // 2 + 1, 'little').hex()[:size]
+
+
+def open_target(target: str, directory: str, mode: str, disk: str):
+    "Open benchmark `target` in `directory` with the settings of `mode` and `disk`."
+    settings = {'sql_config': sql_settings(mode), 'disk': DISKS[disk]}
+    if target == 'cache':
+        return Cache(directory, **settings)
+    if target == 'shard':
+        return ShardCache(directory, **settings)
+    if target == 'index':
+        return Index.fromcache(Cache(directory, eviction_policy = 'none', **settings))
+    if target == 'deque':
+        return Deque(directory = directory, **settings)
+    raise ValueError(f'unknown benchmark target: {target}')
+
+
+def operations(target: str, obj, value) -> Dict[str, Callable[[str], Any]]:
+    "Return benchmarked operations of `obj` in run order, each taking a key."
+    if target == 'deque':
+        return {'append': lambda key: obj.append(value), 'popleft': lambda key: obj.popleft()}
+    if target == 'index':
+        return {'set': lambda key: obj.__setitem__(key, value), 'get': obj.__getitem__, 'delete': obj.__delitem__}
+    return {'set': lambda key: obj.set(key, value), 'get': obj.get, 'delete': obj.delete}
+
+
+def async_operations(target: str, obj, value) -> Dict[str, Callable[[str], Any]]:
+    "Return async versions of `operations`, None when `target` has no async api."
+    if target not in {'cache', 'shard'}:
+        return None
+    return {'set': lambda key: obj.aset(key, value), 'get': obj.aget, 'delete': obj.adelete}
+
+
+def _timed_loop(func: Callable, keys: Sequence[str]) -> List[float]:
+    latencies = []
+    perf_counter = time.perf_counter
+    for key in keys:
+        start = perf_counter()
+        func(key)
+        latencies.append(perf_counter() - start)
+    return latencies
+
+
+async def _async_timed_loop(func: Callable, keys: Sequence[str]) -> List[float]:
+    latencies = []
+    perf_counter = time.perf_counter
+    for key in keys:
+        start = perf_counter()
+        await func(key)
+        latencies.append(perf_counter() - start)
+    return latencies
+
+
+def _process_worker(spec: Dict[str, Any], op: str, keys: Sequence[str], barrier, results):
+    "Open the target in a child process and time `op` over `keys`."
+    obj = open_target(spec['target'], spec['directory'], spec['mode'], spec['disk'])
+    func = operations(spec['target'], obj, make_value(spec['value_size']))[op]
+    barrier.wait()
+    start = time.time()
+    latencies = _timed_loop(func, keys)
+    results.put((start, time.time(), latencies))
+
+
+def _split(keys: Sequence[str], workers: int) -> List[Sequence[str]]:
+    return [keys[i::workers] for i in range(workers)]
+
+
+def _summary(latencies: List[float], seconds: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    count = len(latencies)
+
+    def percentile(p):
+        return round(latencies[min(count - 1, int(p * count))] * 1000, 4) if count else None
+
+    return {
+        'ops': count,
+        'seconds': round(seconds, 6),
+        'ops_per_sec': round(count / seconds, 2) if seconds else None,
+        'latency_ms': {
+            'p50': percentile(0.50),
+            'p90': percentile(0.90),
+            'p99': percentile(0.99),
+            'max': percentile(1.0),
+        },
+    }
+
+
+def run_case(target: str, mode: str, disk: str, value_size: int, concurrency: str, ops: int = 1000, workers: int = 4) -> List[Dict[str, Any]]:
+    """Run every operation of one benchmark case in a fresh directory.
+    :return: one result dict per operation
+    """
+    directory = tempfile.mkdtemp(prefix = 'cachez-bench-')
+    workers = 1 if concurrency == 'serial' else workers
+    keys = [f'key-{num}' for num in range(ops)]
+    value = make_value(value_size)
+    base = {
+        'target': target,
+        'mode': mode,
+        'disk': disk,
+        'value_size': value_size,
+        'min_file_size': int(sql_settings(mode)['disk_min_file_size']),
+        'concurrency': concurrency,
+        'workers': workers,
+    }
+    results = []
+    obj = None
+    try:
+        obj = open_target(target, directory, mode, disk)
+        funcs = operations(target, obj, value)
+
+        if concurrency == 'async':
+            sync_ops = funcs
+            funcs = async_operations(target, obj, value)
+            if funcs is None:
+                reason = f'{target} has no async api'
+                results.extend(dict(base, op = op, skipped = reason) for op in sync_ops)
+                return results
+
+        for op, func in funcs.items():
+            start = time.perf_counter()
+
+            if concurrency == 'serial':
+                latencies = _timed_loop(func, keys)
+
+            elif concurrency == 'threads':
+                with futures.ThreadPoolExecutor(max_workers = workers) as pool:
+                    start = time.perf_counter()
+                    chunks = pool.map(lambda chunk: _timed_loop(func, chunk), _split(keys, workers))
+                    latencies = list(itertools.chain.from_iterable(chunks))
+
+            elif concurrency == 'async':
+                async def _gather():
+                    chunks = await asyncio.gather(*[_async_timed_loop(func, chunk) for chunk in _split(keys, workers)])
+                    return list(itertools.chain.from_iterable(chunks))
+                latencies = asyncio.run(_gather())
+
+            elif concurrency == 'processes':
+                # Children report wall clock bounds, process startup is excluded.
+                ctx = mp.get_context('spawn')
+                barrier, queue = ctx.Barrier(workers), ctx.Queue()
+                spec = dict(base, directory = directory)
+                procs = [
+                    ctx.Process(target = _process_worker, args = (spec, op, chunk, barrier, queue))
+                    for chunk in _split(keys, workers)
+                ]
+                for proc in procs:
+                    proc.start()
+                reports = [queue.get() for _ in procs]
+                for proc in procs:
+                    proc.join()
+                latencies = list(itertools.chain.from_iterable(report[2] for report in reports))
+                seconds = max(report[1] for report in reports) - min(report[0] for report in reports)
+                results.append(dict(base, op = op, **_summary(latencies, seconds)))
+                continue
+
+            else:
+                raise ValueError(f'unknown concurrency: {concurrency}')
+
+            results.append(dict(base, op = op, **_summary(latencies, time.perf_counter() - start)))
+
+    except Exception as error:
+        results.append(dict(base, error = repr(error)))
+
+    finally:
+        if obj is not None:
+            obj.close() if hasattr(obj, 'close') else obj.cache.close()
+        shutil.rmtree(directory, ignore_errors = True)
+
+    return results
+
+
+def run(
+    targets: Iterable[str] = TARGETS,
+    modes: Iterable[str] = MODES,
+    disks: Iterable[str] = tuple(DISKS),
+    concurrency: Iterable[str] = CONCURRENCY,
+    sizes: Iterable[int] = None,
+    ops: int = 1000,
+    workers: int = 4,
+    label: str = None,
+    progress: Callable[[Dict[str, Any]], None] = None,
+) -> Dict[str, Any]:
+    """Run the benchmark matrix.
+    Cases that fail, e.g. when a Disk cannot store the benchmark value, are
+    reported with an `error` field instead of timings, and cases that do not
+    apply, e.g. the async api of Index, with a `skipped` reason.
+    :param targets: any of 'cache', 'shard', 'index', 'deque'
+    :param modes: sqlmode profiles, any of 'default', 'standard', 'optim', 'perf'
+    :param disks: names of Disk classes in `DISKS`
+    :param concurrency: any of 'serial', 'threads', 'processes', 'async'
+    :param sizes: value sizes in characters (default `value_sizes` of each mode)
+    :param int ops: operations per case (default 1000)
+    :param int workers: threads, processes or tasks for concurrent modes (default 4)
+    :param str label: free form label stored with the results, e.g. a version
+    :param progress: called with each result as it completes
+    :return: dict with 'meta' describing the environment and 'results'
+    """
+    results = []
+    for mode in modes:
+        for target, disk, size, conc in itertools.product(targets, disks, sizes or value_sizes(mode), concurrency):
+            for result in run_case(target, mode, disk, size, conc, ops = ops, workers = workers):
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return {
+        'meta': {
+            'label': label,
+            'time': time.time(),
+            'python': sys.version.split()[0],
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'ops': ops,
+            'workers': workers,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """Compare two `run` reports case by case.
+    :param dict baseline: earlier report
+    :param dict current: later report
+    :param float threshold: relative throughput drop reported as a regression (default 0.1)
+    :return: list of cases present in both reports whose `ops_per_sec`
+        dropped by more than `threshold`, worst first
+    """
+    def index(report):
+        return {
+            tuple(result[field] for field in CASE_FIELDS): result
+            for result in report['results']
+            if result.get('ops_per_sec')
+        }
+
+    before, after = index(baseline), index(current)
+    regressions = []
+    for case, old in before.items():
+        new = after.get(case)
+        if new is None:
+            continue
+        change = new['ops_per_sec'] / old['ops_per_sec'] - 1
+        if change < -threshold:
+            regressions.append(dict(zip(CASE_FIELDS, case), baseline = old['ops_per_sec'], current = new['ops_per_sec'], change = round(change, 4)))
+    return sorted(regressions, key = lambda item: item['change'])
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(prog = 'python -m lazy.io.cachez.benchmark', description = 'Benchmark lazy.io.cachez')
+    parser.add_argument('--targets', nargs = '+', choices = TARGETS, default = list(TARGETS))
+    parser.add_argument('--modes', nargs = '+', choices = MODES, default = list(MODES))
+    parser.add_argument('--disks', nargs = '+', choices = list(DISKS), default = list(DISKS))
+    parser.add_argument('--concurrency', nargs = '+', choices = CONCURRENCY, default = list(CONCURRENCY))
+    parser.add_argument('--sizes', nargs = '+', type = int, default = None, help = 'value sizes (default: around disk_min_file_size of each mode)')
+    parser.add_argument('--ops', type = int, default = 1000)
+    parser.add_argument('--workers', type = int, default = 4)
+    parser.add_argument('--label', default = None, help = 'label stored with the results, e.g. a version')
+    parser.add_argument('--output', default = None, help = 'write JSON report to this path (default: stdout)')
+    parser.add_argument('--compare', nargs = 2, metavar = ('BASELINE', 'CURRENT'), help = 'compare two JSON reports instead of running')
+    parser.add_argument('--threshold', type = float, default = 0.1, help = 'relative slowdown reported by --compare')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path) as reader:
+                reports.append(json.load(reader))
+        regressions = compare(*reports, threshold = args.threshold)
+        json.dump(regressions, sys.stdout, indent = 2)
+        sys.stdout.write('\n')
+        return 1 if regressions else 0
+
+    def progress(result):
+        speed = result.get('ops_per_sec', result.get('error', result.get('skipped')))
+        case = ' '.join(str(result.get(field, '-')) for field in CASE_FIELDS)
+        sys.stderr.write(f'{case}: {speed}\n')
+
+    report = run(
+        targets = args.targets,
+        modes = args.modes,
+        disks = args.disks,
+        concurrency = args.concurrency,
+        sizes = args.sizes,
+        ops = args.ops,
+        workers = args.workers,
+        label = args.label,
+        progress = progress,
+    )
+    if args.output:
+        with open(args.output, 'w') as writer:
+            json.dump(report, writer, indent = 2)
+    else:
+        json.dump(report, sys.stdout, indent = 2)
+        sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -34,6 +34,29 @@ class CachezConfigz(ConfigCls):
     default_table: str = 'Cache'
     serializer: str = 'dill' # dill / pickle
     dataset_mode: bool = False # if enabled, will start Index at 0 rather than 500 trill
+    async_workers: int = 4 # threads (each with its own connection) used by the async api
+    l1_items: int = 0 # max entries held in the in-process memory tier. 0 = disabled
+    l1_bytes: int = 0 # max estimated bytes held in the in-process memory tier. 0 = disabled
+    save_chunk_size: int = 8388608 # bytes streamed per chunk by save/load. also the multipart part size for cloud targets
+    codec_serializer: str = 'pickle' # CodecDisk serializer: pickle / msgpack
+    codec_compressor: str = 'zstd' # CodecDisk compressor: zstd / lz4 / zlib / none
+    codec_threshold: int = 1024 # CodecDisk only compresses serialized values of at least this many bytes
+    queue_poll_interval: float = 0.05 # seconds between checks for pushes from other processes while a pull blocks
+    access_buffer_size: int = 1024 # rows whose LRU/LFU access updates are buffered before one batched write. 0 = write on every read
+    access_flush_interval: float = 1.0 # max seconds LRU/LFU access updates stay buffered
+    maintenance: bool = False # run expiry, culling, orphan cleanup and incremental vacuum in a background thread instead of on writes
+    maintenance_interval: float = 30.0 # seconds between background maintenance rounds
+    maintenance_budget: float = 0.5 # max seconds of work per maintenance round
+    maintenance_orphan_age: float = 3600.0 # unreferenced value files older than this many seconds are removed by maintenance
+    volume_cache_ttl: float = 1.0 # seconds inline culling reuses the volume estimate instead of querying page_count
+    metrics: bool = False # collect in-memory hit / miss, latency, byte and eviction metrics (see Cache.metrics)
+    metrics_flush_interval: float = 10.0 # seconds between flushes of metric hits / misses to the Settings table
+    write_behind: bool = False # queue set / add / incr to a writer thread that commits them in batches (see Cache.start_write_behind)
+    write_batch_size: int = 256 # max writes committed in one write-behind transaction
+    write_batch_interval: float = 0.002 # max seconds a queued write waits for its write-behind batch to fill
+    sql_cached_statements: int = 128 # sqlite3 prepared statement cache entries per table sharing a connection
+    db_expected_tables: int = 16 # tables a CacheDB sizes the statement cache of its shared connections for
+    evict_batch_size: int = 1000 # items removed per transaction by evict / evict_prefix
 
     default_compression_level: int = 3
     standard_compression_level: int = 5
@@ -73,12 +96,13 @@ class CachezConfigz(ConfigCls):
 
     @property
     def default_keys(self):
-        return [u'statistics', u'tag_index', u'eviction_policy', u'cull_limit', u'sqlite_auto_vacuum', u'sqlite_cache_size', u'sqlite_journal_mode', u'sqlite_mmap_size', u'sqlite_synchronous', u'disk_min_file_size', u'disk_pickle_protocol']
+        return [u'statistics', u'tag_index', u'track_changes', u'eviction_policy', u'cull_limit', u'sqlite_auto_vacuum', u'sqlite_cache_size', u'sqlite_journal_mode', u'sqlite_mmap_size', u'sqlite_synchronous', u'disk_min_file_size', u'disk_pickle_protocol']
 
     def get_default_sql_settings(self):
         return {
             u'statistics': 0,  # False
             u'tag_index': 0,  # False
+            u'track_changes': 0,  # False
             u'eviction_policy': u'least-recently-stored',
             u'size_limit': self.default_size_limit,
             u'cull_limit': 10,
@@ -95,6 +119,7 @@ class CachezConfigz(ConfigCls):
         return {
             u'statistics': 0,  # False
             u'tag_index': 0,  # False
+            u'track_changes': 0,  # False
             u'eviction_policy': u'least-recently-stored',
             u'size_limit': self.standard_size_limit,
             u'cull_limit': 10,
@@ -111,6 +136,7 @@ class CachezConfigz(ConfigCls):
         return {
             u'statistics': 0,  # False
             u'tag_index': 0,  # False
+            u'track_changes': 0,  # False
             u'eviction_policy': u'least-recently-stored',
             u'size_limit': self.optim_size_limit,
             u'cull_limit': 10,
@@ -127,6 +153,7 @@ class CachezConfigz(ConfigCls):
         return {
             u'statistics': 0,  # False
             u'tag_index': 0,  # False
+            u'track_changes': 0,  # False
             u'eviction_policy': u'least-frequently-used',
             u'size_limit': self.perf_size_limit,
             u'cull_limit': 10,
@@ -167,6 +194,7 @@ class CachezConfigz(ConfigCls):
             'none': {
                 'init': None,
                 'get': None,
+                'flush': None,
                 'cull': None,
             },
             'least-recently-stored': {
@@ -175,6 +203,7 @@ class CachezConfigz(ConfigCls):
                     f' {table_name} (store_time)'
                 ),
                 'get': None,
+                'flush': None,
                 'cull': 'SELECT {fields} FROM ' + table_name + ' ORDER BY store_time LIMIT ?',
             },
             'least-recently-used': {
@@ -183,6 +212,7 @@ class CachezConfigz(ConfigCls):
                     f' {table_name} (access_time)'
                 ),
                 'get': 'access_time = {now}',
+                'flush': 'access_time = MAX(access_time, :now)',
                 'cull': 'SELECT {fields} FROM ' + table_name + ' ORDER BY access_time LIMIT ?',
             },
             'least-frequently-used': {
@@ -191,6 +221,7 @@ class CachezConfigz(ConfigCls):
                     f' {table_name} (access_count)'
                 ),
                 'get': 'access_count = access_count + 1',
+                'flush': 'access_count = access_count + :count',
                 'cull': 'SELECT {fields} FROM ' + table_name + ' ORDER BY access_count LIMIT ?',
             },
         }
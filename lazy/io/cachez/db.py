@@ -0,0 +1,237 @@
+"""
+Many named cache tables in one SQLite database.
+
+Tables of a `CacheDB` are regular `Cache` objects that share one database
+file, one connection per thread, the async worker pool and the WAL of the
+container instead of each opening their own. Writes to several tables can
+be combined in a single transaction.
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import contextlib as cl
+import os.path as op
+from concurrent import futures
+from typing import Any, Dict, List, Type
+
+from .config import CachezConfigz
+from .base import Cache, Disk
+from .persistent import Deque, Index
+
+__all__ = ('CacheDB',)
+
+_TABLE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class CacheDB:
+    "Named Cache, Index and Deque tables sharing one SQLite database."
+
+    def __init__(self, directory: str = None, filename: str = None, timeout: int = 60, disk: Type[Disk] = Disk, sql_config: Dict[str, Any] = {}, expected_tables: int = None, **settings):
+        """Initialize cache database.
+        :param str directory: cache directory
+        :param str filename: name prefix for the database file. will be prefixed to `_cache.db`
+        :param float timeout: SQLite connection timeout
+        :param int expected_tables: tables the prepared statement cache of
+            each shared connection is sized for (default CachezConfigz.db_expected_tables)
+        :param disk: Disk type or subclass for serialization
+        :param dict sql_config: sql settings passed to every table
+        :param settings: default Cache settings of tables, see `Cache`
+        """
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='cachez-')
+        directory = op.expanduser(directory)
+        directory = op.expandvars(directory)
+
+        self._directory = directory
+        self._filename = filename
+        self._timeout = timeout
+        self._disk = disk
+        self._sql_config = sql_config
+        self._settings = settings
+        self._expected_tables = CachezConfigz.db_expected_tables if expected_tables is None else expected_tables
+
+        self._local = threading.local()
+        self._tables: Dict[str, Cache] = {}
+        self._deques: Dict[str, Deque] = {}
+        self._indexes: Dict[str, Index] = {}
+        self._lock = threading.RLock()
+
+        self._async_lock = threading.Lock()
+        self._async_pid = None
+        self._async_pool: futures.ThreadPoolExecutor = None
+        self._async_txn_idle: List[futures.ThreadPoolExecutor] = []
+
+    @property
+    def directory(self) -> str:
+        "Cache directory."
+        return self._directory
+
+    @property
+    def tables(self) -> List[str]:
+        "Names of the tables opened so far."
+        return list(self._tables)
+
+    def cache(self, name: str = None, **settings) -> Cache:
+        """Return the Cache of table `name`, creating it if needed.
+        >>> db = CacheDB()
+        >>> users, sessions = db.cache('users'), db.cache('sessions')
+        >>> with db.transact():
+        ...     _ = users.set('alice', 1)
+        ...     _ = sessions.set('alice', 'token')
+        :param str name: table name (default CachezConfigz.default_table)
+        :param settings: Cache settings overriding the defaults of the
+            database, used when the table is first opened
+        :return: Cache with given name
+        :raises ValueError: if `name` is not a valid table name
+        """
+        name = CachezConfigz.default_table if name is None else name
+        if not _TABLE_NAME.match(name):
+            raise ValueError(f'invalid table name: {name!r}')
+        try:
+            return self._tables[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._tables:
+                self._tables[name] = Cache(
+                    directory = self._directory,
+                    filename = self._filename,
+                    table_name = name,
+                    timeout = self._timeout,
+                    disk = self._disk,
+                    sql_config = self._sql_config,
+                    db = self,
+                    **{**self._settings, **settings},
+                )
+            return self._tables[name]
+
+    def deque(self, name: str, **settings) -> Deque:
+        """Return the Deque stored in table `Deque_{name}`.
+        :param str name: deque name
+        :param settings: Cache settings used when the table is first opened
+        :return: Deque with given name
+        """
+        with self._lock:
+            if name not in self._deques:
+                settings['eviction_policy'] = 'none'
+                self._deques[name] = Deque.fromcache(self.cache(f'Deque_{name}', **settings))
+            return self._deques[name]
+
+    def index(self, name: str, **settings) -> Index:
+        """Return the Index stored in table `Index_{name}`.
+        :param str name: index name
+        :param settings: Cache settings used when the table is first opened
+        :return: Index with given name
+        """
+        with self._lock:
+            if name not in self._indexes:
+                settings['eviction_policy'] = 'none'
+                self._indexes[name] = Index.fromcache(self.cache(f'Index_{name}', **settings))
+            return self._indexes[name]
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        """Open the connection of the calling thread shared by every table.
+        Connections are never reopened while tables are in use, so the
+        statement cache is sized for the expected tables up front.
+        """
+        tables = max(self._expected_tables, len(self._tables), 1)
+        return sqlite3.connect(
+            path,
+            timeout = self._timeout,
+            isolation_level = None,
+            cached_statements = CachezConfigz.sql_cached_statements * tables,
+        )
+
+    def _table(self) -> Cache:
+        "Any open table, used to run statements on the shared connection."
+        for cache in list(self._tables.values()):
+            return cache
+        return self.cache()
+
+    @cl.contextmanager
+    def transact(self, retry=False):
+        """Context manager to perform a transaction spanning every table.
+        Writes to any table of the database inside the block commit or roll
+        back together. See `Cache.transact`.
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: context manager for use in `with` statement
+        :raises Timeout: if database timeout occurs
+        """
+        with self._table().transact(retry = retry):
+            yield
+
+    @cl.asynccontextmanager
+    async def atransact(self, retry=False):
+        """Async version of `CacheDB.transact`.
+        Async calls to any table awaited inside the block run on the worker
+        holding the transaction, see `Cache.atransact`.
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: async context manager for use in `async with` statement
+        :raises Timeout: if database timeout occurs
+        """
+        async with self._table().atransact(retry = retry):
+            yield
+
+    def _get_async_pool(self) -> futures.ThreadPoolExecutor:
+        # Shared by every table, see `Cache._get_async_pool`.
+        pid = os.getpid()
+        with self._async_lock:
+            if self._async_pid != pid:
+                self._async_pool = None
+                self._async_txn_idle = []
+                self._async_pid = pid
+            if self._async_pool is None:
+                self._async_pool = futures.ThreadPoolExecutor(
+                    max_workers = CachezConfigz.async_workers,
+                    thread_name_prefix = 'cachez-db',
+                )
+            return self._async_pool
+
+    def _acquire_txn_worker(self) -> futures.ThreadPoolExecutor:
+        self._get_async_pool()
+        with self._async_lock:
+            if self._async_txn_idle:
+                return self._async_txn_idle.pop()
+        return futures.ThreadPoolExecutor(max_workers = 1, thread_name_prefix = 'cachez-db-txn')
+
+    def _release_txn_worker(self, worker: futures.ThreadPoolExecutor):
+        with self._async_lock:
+            if self._async_pid == os.getpid() and len(self._async_txn_idle) < CachezConfigz.async_workers:
+                self._async_txn_idle.append(worker)
+                return
+        worker.shutdown(wait = False)
+
+    def close(self):
+        """Close every table and the shared connection of the calling thread."""
+        for cache in list(self._tables.values()):
+            cache.close()
+        con = getattr(self._local, 'con', None)
+        if con is not None:
+            con.close()
+            del self._local.con
+        with self._async_lock:
+            if self._async_pid != os.getpid():
+                return
+            pools = self._async_txn_idle
+            if self._async_pool is not None:
+                pools.append(self._async_pool)
+            self._async_pool = None
+            self._async_txn_idle = []
+        for pool in pools:
+            pool.shutdown(wait = False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        "True if table `name` was opened."
+        return name in self._tables
+
+    def __repr__(self):
+        return f'CacheDB(directory={self._directory!r}, tables={self.tables})'
@@ -7,18 +7,23 @@ ShardCache -> ShardCache
 """
 
 
+import asyncio
 import contextlib as cl
 import functools
 import itertools as it
 import operator
+import os
 import os.path as op
 import sqlite3
 import tempfile
 import time
-from typing import Type, Union, List, Dict, Any
+from concurrent import futures
+from typing import Type, Union, List, Dict, Any, Callable
 from .config import CachezConfigz
-from .base import ENOVAL, Cache, Disk, Timeout, logger, _gzip
+from .base import ENOVAL, Cache, Disk, Timeout, logger, _gzip, _async_txn_workers
 from .persistent import Deque, Index
+from .maintenance import MaintenanceWorker
+from .metrics import merge_metrics, to_prometheus
 
 
 class ShardCache:
@@ -33,7 +38,8 @@ class ShardCache:
         :param int shards: number of shards to distribute writes
         :param float timeout: SQLite connection timeout
         :param disk: `Disk` instance for serialization
-        :param settings: any of `DEFAULT_SETTINGS`
+        :param settings: any of `DEFAULT_SETTINGS`, `l1_items` and `l1_bytes` are split across shards.
+            `maintenance` starts one background worker for all shards
         """
         if directory is None:
             directory = tempfile.mkdtemp(prefix='cachez-')
@@ -48,6 +54,10 @@ class ShardCache:
 
         default_size_limit = CachezConfigz.get('size_limit') #DEFAULT_SETTINGS['size_limit']
         size_limit = settings.pop('size_limit', default_size_limit) / shards
+        # memory tier bounds are split across shards like size_limit
+        l1_items = settings.pop('l1_items', CachezConfigz.l1_items)
+        l1_bytes = settings.pop('l1_bytes', CachezConfigz.l1_bytes)
+        maintenance = settings.pop('maintenance', None)
 
         self._count = shards
         self._directory = directory
@@ -64,6 +74,9 @@ class ShardCache:
                 timeout = timeout,
                 disk = disk,
                 size_limit = size_limit,
+                l1_items = -(-l1_items // shards),
+                l1_bytes = -(-l1_bytes // shards),
+                maintenance = False,
                 **settings
             )
             for num in range(shards)
@@ -72,12 +85,70 @@ class ShardCache:
         self._caches: Dict[Any, Cache] = {}
         self._deques: Dict[Any, Deque] = {}
         self._indexes: Dict[Any, Index] = {}
+        self._pool: futures.ThreadPoolExecutor = None
+        self._pool_pid = None
+        self._maintenance: MaintenanceWorker = None
+
+        if CachezConfigz.maintenance if maintenance is None else maintenance:
+            self.start_maintenance()
 
     @property
     def directory(self):
         """Cache directory."""
         return self._directory
 
+    def _get_pool(self) -> futures.ThreadPoolExecutor:
+        # SQLite releases the GIL so shard operations overlap on threads.
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            self._pool = futures.ThreadPoolExecutor(max_workers = self._count, thread_name_prefix = 'cachez-shard')
+            self._pool_pid = pid
+        return self._pool
+
+    def _in_transaction(self) -> bool:
+        "True if the calling thread holds a transaction on any shard."
+        return any(getattr(shard._local, 'txn', False) for shard in self._shards)
+
+    def _map_shards(self, func: Callable, groups: Dict[int, Any]) -> List[Any]:
+        """Run `func(shard, group)` for each shard index in `groups` in parallel.
+        Inside `transact` shards run in order on the calling thread, which
+        holds their write locks and sees its uncommitted writes.
+        :return: list of results in shard order
+        """
+        if len(groups) == 1 or self._in_transaction():
+            return [func(self._shards[index], group) for index, group in sorted(groups.items())]
+        pool = self._get_pool()
+        tasks = [pool.submit(func, self._shards[index], group) for index, group in sorted(groups.items())]
+        return [task.result() for task in tasks]
+
+    def _each_shard(self, func: Callable[[Cache], Any]) -> List[Any]:
+        """Run `func(shard)` on every shard in parallel, or in order on the
+        calling thread inside `transact`, see `_map_shards`.
+        :return: list of results in shard order
+        """
+        return self._map_shards(lambda shard, _: func(shard), dict.fromkeys(range(self._count)))
+
+    async def _aeach_shard(self, func: Callable[[Cache], Any]) -> List[Any]:
+        """Async version of `_each_shard` awaiting the shard pool.
+        Inside `transact` shards run on the calling thread, and inside
+        `atransact` each shard runs on the worker holding its transaction.
+        :return: list of results in shard order
+        """
+        if self._in_transaction():
+            return [func(shard) for shard in self._shards]
+        txn_workers = _async_txn_workers.get()
+        if any(shard._txn_key in txn_workers for shard in self._shards):
+            return await asyncio.gather(*[shard._arun(func, shard) for shard in self._shards])
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        return await asyncio.gather(*[loop.run_in_executor(pool, func, shard) for shard in self._shards])
+
+    def _group_keys(self, keys) -> Dict[int, List[Any]]:
+        groups: Dict[int, List[Any]] = {}
+        for key in keys:
+            groups.setdefault(self._hash(key) % self._count, []).append(key)
+        return groups
+
     def __getattr__(self, name):
         safe_names = {'timeout', 'disk'}
         valid_name = name in CachezConfigz.default_keys or name in safe_names
@@ -111,6 +182,19 @@ class ShardCache:
                 stack.enter_context(shard_transaction)
             yield
 
+    @cl.asynccontextmanager
+    async def atransact(self, retry=True):
+        """Async context manager to perform a transaction by locking the cache.
+        Behaves like `ShardCache.transact` using `Cache.atransact` on every
+        shard so the event loop is never blocked.
+        :return: async context manager for use in `async with` statement
+        """
+        assert retry, 'retry must be True in ShardCache'
+        async with cl.AsyncExitStack() as stack:
+            for shard in self._shards:
+                await stack.enter_async_context(shard.atransact(retry=True))
+            yield
+
     def set(self, key, value, expire=None, read=False, tag=None, retry=False):
         """Set `key` and `value` item in cache.
         When `read` is `True`, `value` should be a file-like object opened
@@ -245,6 +329,7 @@ class ShardCache:
         expire_time=False,
         tag=False,
         retry=False,
+        view=False,
     ):
         """Retrieve value from cache. If `key` is missing, return `default`.
         If database timeout occurs then returns `default` unless `retry` is set
@@ -257,12 +342,14 @@ class ShardCache:
             (default False)
         :param tag: if True, return tag in tuple (default False)
         :param bool retry: retry if database timeout occurs (default False)
+        :param bool view: if True, return bytes values as a read-only
+            memoryview of the value file (default False)
         :return: value for item if key is found else default
         """
         index = self._hash(key) % self._count
         shard = self._shards[index]
         try:
-            return shard.get(key, default, read, expire_time, tag, retry)
+            return shard.get(key, default, read, expire_time, tag, retry, view)
         except (Timeout, sqlite3.OperationalError):
             return default
 
@@ -346,6 +433,235 @@ class ShardCache:
         shard = self._shards[index]
         del shard[key]
 
+    async def aset(self, key, value, expire=None, read=False, tag=None, retry=False):
+        """Async version of `ShardCache.set`.
+        :return: True if item was set
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        try:
+            return await shard.aset(key, value, expire, read, tag, retry)
+        except Timeout:
+            return False
+
+    async def aadd(self, key, value, expire=None, read=False, tag=None, retry=False):
+        """Async version of `ShardCache.add`.
+        :return: True if item was added
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        try:
+            return await shard.aadd(key, value, expire, read, tag, retry)
+        except Timeout:
+            return False
+
+    async def atouch(self, key, expire=None, retry=False):
+        """Async version of `ShardCache.touch`.
+        :return: True if key was touched
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        try:
+            return await shard.atouch(key, expire, retry)
+        except Timeout:
+            return False
+
+    async def aincr(self, key, delta=1, default=0, retry=False):
+        """Async version of `ShardCache.incr`.
+        :return: new value for item on success else None
+        :raises KeyError: if key is not found and default is None
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        try:
+            return await shard.aincr(key, delta, default, retry)
+        except Timeout:
+            return None
+
+    async def adecr(self, key, delta=1, default=0, retry=False):
+        """Async version of `ShardCache.decr`.
+        :return: new value for item on success else None
+        :raises KeyError: if key is not found and default is None
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        try:
+            return await shard.adecr(key, delta, default, retry)
+        except Timeout:
+            return None
+
+    async def aget(self, key, default=None, read=False, expire_time=False, tag=False, retry=False, view=False):
+        """Async version of `ShardCache.get`.
+        :return: value for item if key is found else default
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        try:
+            return await shard.aget(key, default, read, expire_time, tag, retry, view)
+        except (Timeout, sqlite3.OperationalError):
+            return default
+
+    async def acontains(self, key):
+        """Async version of `key in cache`.
+        :return: True if key is found
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        return await shard.acontains(key)
+
+    async def apop(self, key, default=None, expire_time=False, tag=False, retry=False):
+        """Async version of `ShardCache.pop`.
+        :return: value for item if key is found else default
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        try:
+            return await shard.apop(key, default, expire_time, tag, retry)
+        except Timeout:
+            return default
+
+    async def adelete(self, key, retry=False):
+        """Async version of `ShardCache.delete`.
+        :return: True if item was deleted
+        """
+        shard = self._shards[self._hash(key) % self._count]
+        try:
+            return await shard.adelete(key, retry)
+        except Timeout:
+            return False
+
+    async def _aiter(self, ascending=True):
+        shards = self._shards if ascending else reversed(self._shards)
+        for shard in shards:
+            iterator = shard.__aiter__() if ascending else shard.areversed()
+            async for key in iterator:
+                yield key
+
+    def __aiter__(self):
+        """Async iterate keys in cache including expired items."""
+        return self._aiter()
+
+    def areversed(self):
+        """Async reverse iterate keys in cache including expired items."""
+        return self._aiter(ascending=False)
+
+    def set_many(self, mapping, expire=None, read=False, tag=None, retry=False):
+        """Set many `key` and `value` items in cache.
+        Keys are grouped by shard and each group is written with
+        `Cache.set_many` in its own transaction, with shards written in
+        parallel.
+        If database timeout occurs then the items of that shard are not set
+        unless `retry` is set to `True` (default `False`).
+        :param mapping: mapping or iterable of key and value pairs
+        :param float expire: seconds until items expire
+            (default None, no expiry)
+        :param bool read: read values as bytes from file (default False)
+        :param str tag: text to associate with keys (default None)
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: count of items set
+        """
+        items = mapping.items() if hasattr(mapping, 'items') else mapping
+        groups: Dict[int, List[Any]] = {}
+        for key, value in items:
+            groups.setdefault(self._hash(key) % self._count, []).append((key, value))
+        if not groups:
+            return 0
+
+        def _set_many(shard: Cache, group):
+            try:
+                return shard.set_many(group, expire, read, tag, retry)
+            except Timeout:
+                return 0
+
+        return sum(self._map_shards(_set_many, groups))
+
+    def get_many(self, keys, read=False, retry=False):
+        """Retrieve many values from cache.
+        Keys are grouped by shard and looked up with `Cache.get_many`, with
+        shards read in parallel. Missing keys are omitted from the result.
+        If database timeout occurs then the keys of that shard are omitted
+        unless `retry` is set to `True` (default `False`).
+        :param keys: iterable of keys
+        :param bool read: if True, return file handles to values
+            (default False)
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: dict of key to value for keys found
+        """
+        groups = self._group_keys(keys)
+        if not groups:
+            return {}
+
+        def _get_many(shard: Cache, group):
+            try:
+                return shard.get_many(group, read, retry)
+            except (Timeout, sqlite3.OperationalError):
+                return {}
+
+        results = {}
+        for result in self._map_shards(_get_many, groups):
+            results.update(result)
+        return results
+
+    def delete_many(self, keys, retry=False):
+        """Delete items for many `keys` from cache.
+        Keys are grouped by shard and deleted with `Cache.delete_many`, with
+        shards written in parallel. Missing keys are ignored.
+        If database timeout occurs then the keys of that shard are not deleted
+        unless `retry` is set to `True` (default `False`).
+        :param keys: iterable of keys
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: count of items deleted
+        """
+        groups = self._group_keys(keys)
+        if not groups:
+            return 0
+
+        def _delete_many(shard: Cache, group):
+            try:
+                return shard.delete_many(group, retry)
+            except Timeout:
+                return 0
+
+        return sum(self._map_shards(_delete_many, groups))
+
+    async def aset_many(self, mapping, expire=None, read=False, tag=None, retry=False):
+        """Async version of `ShardCache.set_many`.
+        :return: count of items set
+        """
+        items = mapping.items() if hasattr(mapping, 'items') else mapping
+        groups: Dict[int, List[Any]] = {}
+        for key, value in items:
+            groups.setdefault(self._hash(key) % self._count, []).append((key, value))
+
+        async def _aset_many(shard: Cache, group):
+            try:
+                return await shard.aset_many(group, expire, read, tag, retry)
+            except Timeout:
+                return 0
+
+        results = await asyncio.gather(*[_aset_many(self._shards[index], group) for index, group in groups.items()])
+        return sum(results)
+
+    async def aget_many(self, keys, read=False, retry=False):
+        """Async version of `ShardCache.get_many`.
+        :return: dict of key to value for keys found
+        """
+        async def _aget_many(shard: Cache, group):
+            try:
+                return await shard.aget_many(group, read, retry)
+            except (Timeout, sqlite3.OperationalError):
+                return {}
+
+        results = {}
+        for result in await asyncio.gather(*[_aget_many(self._shards[index], group) for index, group in self._group_keys(keys).items()]):
+            results.update(result)
+        return results
+
+    async def adelete_many(self, keys, retry=False):
+        """Async version of `ShardCache.delete_many`.
+        :return: count of items deleted
+        """
+        async def _adelete_many(shard: Cache, group):
+            try:
+                return await shard.adelete_many(group, retry)
+            except Timeout:
+                return 0
+
+        results = await asyncio.gather(*[_adelete_many(self._shards[index], group) for index, group in self._group_keys(keys).items()])
+        return sum(results)
+
     def check(self, fix=False, retry=False):
         """Check database and file system consistency.
         Intended for use in testing and post-mortem error analysis.
@@ -361,7 +677,15 @@ class ShardCache:
         :return: list of warnings
         :raises Timeout: if database timeout occurs
         """
-        warnings = (shard.check(fix, retry) for shard in self._shards)
+        warnings = self._each_shard(lambda shard: shard.check(fix, retry))
+        return functools.reduce(operator.iadd, warnings, [])
+
+    async def acheck(self, fix=False, retry=False):
+        """Async version of `ShardCache.check` checking shards concurrently.
+        :return: list of warnings
+        :raises Timeout: if database timeout occurs
+        """
+        warnings = await self._aeach_shard(lambda shard: shard.check(fix, retry))
         return functools.reduce(operator.iadd, warnings, [])
 
     def expire(self, retry=False):
@@ -373,20 +697,24 @@ class ShardCache:
         """
         return self._remove('expire', args=(time.time(),), retry=retry)
 
+    async def aexpire(self, retry=False):
+        """Async version of `ShardCache.expire` expiring shards concurrently.
+        :return: count of items removed
+        """
+        return await self._aremove('expire', args=(time.time(),), retry=retry)
+
     def create_tag_index(self):
         """Create tag index on cache database.
         Better to initialize cache with `tag_index=True` than use this.
         :raises Timeout: if database timeout occurs
         """
-        for shard in self._shards:
-            shard.create_tag_index()
+        self._each_shard(lambda shard: shard.create_tag_index())
 
     def drop_tag_index(self):
         """Drop tag index on cache database.
         :raises Timeout: if database timeout occurs
         """
-        for shard in self._shards:
-            shard.drop_tag_index()
+        self._each_shard(lambda shard: shard.drop_tag_index())
 
     def evict(self, tag, retry=False):
         """Remove items with matching `tag` from cache.
@@ -398,6 +726,29 @@ class ShardCache:
         """
         return self._remove('evict', args=(tag,), retry=retry)
 
+    async def aevict(self, tag, retry=False):
+        """Async version of `ShardCache.evict` evicting from shards concurrently.
+        :return: count of items removed
+        """
+        return await self._aremove('evict', args=(tag,), retry=retry)
+
+    def evict_prefix(self, prefix, retry=False):
+        """Remove items whose tuple key starts with the items of `prefix` from
+        every shard. See `Cache.evict_prefix`.
+        If database timeout occurs then fails silently unless `retry` is set to
+        `True` (default `False`).
+        :param tuple prefix: leading items of keys
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: count of items removed
+        """
+        return self._remove('evict_prefix', args=(prefix,), retry=retry)
+
+    async def aevict_prefix(self, prefix, retry=False):
+        """Async version of `ShardCache.evict_prefix` evicting from shards concurrently.
+        :return: count of items removed
+        """
+        return await self._aremove('evict_prefix', args=(prefix,), retry=retry)
+
     def cull(self, retry=False):
         """Cull items from cache until volume is less than size limit.
         If database timeout occurs then fails silently unless `retry` is set to
@@ -407,6 +758,12 @@ class ShardCache:
         """
         return self._remove('cull', retry=retry)
 
+    async def acull(self, retry=False):
+        """Async version of `ShardCache.cull` culling shards concurrently.
+        :return: count of items removed
+        """
+        return await self._aremove('cull', retry=retry)
+
     def clear(self, retry=False):
         """Remove all items from cache.
         If database timeout occurs then fails silently unless `retry` is set to
@@ -416,45 +773,175 @@ class ShardCache:
         """
         return self._remove('clear', retry=retry)
 
-    def _remove(self, name, args=(), retry=False):
+    async def aclear(self, retry=False):
+        """Async version of `ShardCache.clear` clearing shards concurrently.
+        :return: count of items removed
+        """
+        return await self._aremove('clear', retry=retry)
+
+    @staticmethod
+    def _remove_shard(shard: Cache, name, args=(), retry=False):
         total = 0
-        for shard in self._shards:
-            method = getattr(shard, name)
-            while True:
-                try:
-                    count = method(*args, retry=retry)
-                    total += count
-                except Timeout as timeout:
-                    total += timeout.args[0]
-                else:
-                    break
+        method = getattr(shard, name)
+        while True:
+            try:
+                count = method(*args, retry=retry)
+                total += count
+            except Timeout as timeout:
+                total += timeout.args[0]
+            else:
+                break
         return total
 
+    def _remove(self, name, args=(), retry=False):
+        func = functools.partial(self._remove_shard, name=name, args=args, retry=retry)
+        return sum(self._each_shard(func))
+
+    async def _aremove(self, name, args=(), retry=False):
+        func = functools.partial(self._remove_shard, name=name, args=args, retry=retry)
+        return sum(await self._aeach_shard(func))
+
     def stats(self, enable=True, reset=False):
         """Return cache statistics hits and misses.
         :param bool enable: enable collecting statistics (default True)
         :param bool reset: reset hits and misses to 0 (default False)
         :return: (hits, misses)
         """
-        results = [shard.stats(enable, reset) for shard in self._shards]
+        results = self._each_shard(lambda shard: shard.stats(enable, reset))
+        total_hits = sum(hits for hits, _ in results)
+        total_misses = sum(misses for _, misses in results)
+        return total_hits, total_misses
+
+    async def astats(self, enable=True, reset=False):
+        """Async version of `ShardCache.stats` reading shards concurrently.
+        :return: (hits, misses)
+        """
+        results = await self._aeach_shard(lambda shard: shard.stats(enable, reset))
         total_hits = sum(hits for hits, _ in results)
         total_misses = sum(misses for _, misses in results)
         return total_hits, total_misses
 
+    def metrics(self, enable=True, reset=False):
+        """Return in-memory metrics summed over shards.
+        See `Cache.metrics`.
+        :param bool enable: enable collecting metrics (default True)
+        :param bool reset: reset metrics to zero (default False)
+        :return: dict with 'counters', 'latency' and 'file_value_ratio'
+        """
+        return merge_metrics(shard.metrics(enable, reset) for shard in self._shards)
+
+    def metrics_prometheus(self, prefix='cachez', labels=None):
+        """Return metrics summed over shards in the Prometheus text
+        exposition format. Samples are labeled with the cache `filename`.
+        :param str prefix: metric name prefix (default 'cachez')
+        :param dict labels: extra labels added to every sample (default None)
+        :return: exposition text
+        """
+        snapshot = merge_metrics(shard.metrics(enable = shard._metrics is not None) for shard in self._shards)
+        labels = dict({'cache': self._filename, 'table': self._table_name}, **(labels or {}))
+        return to_prometheus(snapshot, prefix = prefix, labels = labels)
+
     def volume(self):
         """Return estimated total size of cache on disk.
         :return: size in bytes
         """
-        return sum(shard.volume() for shard in self._shards)
+        return sum(self._each_shard(lambda shard: shard.volume()))
+
+    async def avolume(self):
+        """Async version of `ShardCache.volume` reading shards concurrently.
+        :return: size in bytes
+        """
+        return sum(await self._aeach_shard(lambda shard: shard.volume()))
+
+    def maintain(self, budget=None, retry=False):
+        """Run one round of maintenance on every shard in parallel.
+        See `Cache.maintain`. Shards share a directory so only the first
+        shard scans it for orphaned files.
+        :param float budget: max seconds of work per shard (default CachezConfigz.maintenance_budget)
+        :param bool retry: retry if database timeout occurs (default False)
+        :return: dict with counts summed over shards
+        """
+        results = self._each_shard(lambda shard: shard.maintain(budget, retry, orphans = shard is self._shards[0]))
+        return {name: sum(result[name] for result in results) for name in results[0]}
+
+    async def amaintain(self, budget=None, retry=False):
+        """Async version of `ShardCache.maintain` maintaining shards concurrently.
+        :return: dict with counts summed over shards
+        """
+        results = await self._aeach_shard(lambda shard: shard.maintain(budget, retry, orphans = shard is self._shards[0]))
+        return {name: sum(result[name] for result in results) for name in results[0]}
+
+    def start_maintenance(self, interval=None, budget=None):
+        """Start one background worker running `ShardCache.maintain`.
+        See `Cache.start_maintenance`. While it runs, writes to the shards no
+        longer expire or cull items inline.
+        :param float interval: seconds between rounds (default CachezConfigz.maintenance_interval)
+        :param float budget: max seconds of work per round (default CachezConfigz.maintenance_budget)
+        :return: the maintenance worker
+        """
+        if self._maintenance is not None and self._maintenance.alive:
+            return self._maintenance
+        self._maintenance = MaintenanceWorker(self, interval, budget)
+        for shard in self._shards:
+            shard._maintenance = self._maintenance
+        self._maintenance.start()
+        return self._maintenance
+
+    def stop_maintenance(self, timeout=None):
+        """Stop the background maintenance worker if running.
+        :param float timeout: seconds to wait for a running round (default None, no limit)
+        """
+        worker, self._maintenance = self._maintenance, None
+        for shard in self._shards:
+            shard._maintenance = None
+        if worker is not None:
+            worker.stop(timeout)
+
+    def start_write_behind(self, batch_size=None, batch_interval=None):
+        """Start a write-behind worker for every shard, see
+        `Cache.start_write_behind`. `set`, `add` and `incr` then return
+        futures.
+        :param int batch_size: max writes per transaction (default CachezConfigz.write_batch_size)
+        :param float batch_interval: max seconds a write waits for its batch to fill (default CachezConfigz.write_batch_interval)
+        """
+        for shard in self._shards:
+            shard.start_write_behind(batch_size, batch_interval)
+
+    def stop_write_behind(self, timeout=None):
+        """Commit queued writes and stop the write-behind workers.
+        :param float timeout: seconds to wait per shard (default None, no limit)
+        """
+        self._each_shard(lambda shard: shard.stop_write_behind(timeout))
+
+    def flush_writes(self, timeout=None):
+        """Wait until writes queued for the write-behind workers committed.
+        :param float timeout: max seconds to wait per shard (default None, no limit)
+        :return: True if all queued writes committed within `timeout`
+        """
+        return all(self._each_shard(lambda shard: shard.flush_writes(timeout)))
+
+    async def aflush_writes(self, timeout=None):
+        """Async version of `ShardCache.flush_writes`.
+        :return: True if all queued writes committed within `timeout`
+        """
+        return all(await self._aeach_shard(lambda shard: shard.flush_writes(timeout)))
 
     def close(self):
         """Close database connection."""
         for shard in self._shards:
             shard.close()
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait = False)
+        self._pool = None
         self._caches.clear()
         self._deques.clear()
         self._indexes.clear()
 
+    def _close_con(self):
+        "Close the database connections of the calling thread."
+        for shard in self._shards:
+            shard._close_con()
+
     def __enter__(self):
         return self
 
@@ -479,7 +966,13 @@ class ShardCache:
 
     def __len__(self):
         """Count of items in cache including expired items."""
-        return sum(len(shard) for shard in self._shards)
+        return sum(self._each_shard(len))
+
+    async def alen(self):
+        """Async version of `len(ShardCache)` counting shards concurrently.
+        :return: count of items in cache including expired items
+        """
+        return sum(await self._aeach_shard(len))
 
     def reset(self, key, value=ENOVAL):
         """Reset `key` and `value` item from Settings table.
@@ -588,93 +1081,67 @@ class ShardCache:
             _indexes[name] = index
             return index
     
-    def save(self, path: str = None, compressed: bool = False, caches: Union[List[str], str] = None, indexes: Union[List[str], str] = None, deques: Union[List[str], str] = None):
+    def _save_targets(self, caches: Union[List[str], str] = None, indexes: Union[List[str], str] = None, deques: Union[List[str], str] = None):
+        """Return (kind, name, object) for every database to save."""
+        targets = [('shard', i, shard) for i, shard in enumerate(self._shards)]
+        for kind, selected, objects in (('cache', caches, self._caches), ('index', indexes, self._indexes), ('deque', deques, self._deques)):
+            if isinstance(selected, str): selected = [selected]
+            targets.extend((kind, i, obj) for i, obj in objects.items() if not selected or i in selected)
+        return targets
+
+    def save(self, path: str = None, compressed: bool = False, caches: Union[List[str], str] = None, indexes: Union[List[str], str] = None, deques: Union[List[str], str] = None, chunk_size: int = None, incremental: bool = False):
         """
-        Closes all the Database shards and saves the file to target path
+        Saves a consistent snapshot of every Database shard to target path
+        Shards, caches, indexes and deques are uploaded in parallel on the shard pool.
         :param path = path to save to
         :param compressed: use gzip compression
+        :param chunk_size: bytes streamed per chunk. default CachezConfigz.save_chunk_size
+        :param incremental: only save rows changed since the previous save as deltas. requires track_changes
         :param index List[str] | str : specific index to save. default all.
         :param deque List[str] | str : specific deque to save. default all.
         """
-        _caches = self._caches
-        _paths = {'cache': {}, 'index': {}, 'deque': {}}
-        if caches:
-            if isinstance(caches, str): caches = [caches]
-            _caches = {i:cache for i,cache in _caches.items() if i in caches}
-        
-        for i, cache in _caches.items():
-            logger.info(f'[Shard] Saving Cache {i}')
-            p = cache.save(path=path, compressed=compressed)
-            _paths['cache'][i] = p
-
-        _indexes = self._indexes
-        if indexes:
-            if isinstance(indexes, str): indexes = [indexes]
-            _indexes = {i:cache for i,cache in _indexes.items() if i in indexes}
-        
-        for i, cache in _indexes.items():
-            logger.info(f'[Shard] Saving Index {i}')
-            p = cache.save(path=path, compressed=compressed)
-            _paths['index'][i] = p
-
-        _deques = self._deques
-        if deques:
-            if isinstance(deques, str): deques = [deques]
-            _deques = {i:cache for i,cache in _deques.items() if i in deques}
-        
-        for i, cache in _deques.items():
-            logger.info(f'[Shard] Saving Deque {i}')
-            p = cache.save(path=path, compressed=compressed)
-            _paths['deque'][i] = p
+        def _save(kind: str, i, obj):
+            logger.info(f'[Shard] Saving {kind.capitalize()} {i}')
+            return obj.save(path=path, compressed=compressed, chunk_size=chunk_size, incremental=incremental)
+
+        _paths = {'shard': {}, 'cache': {}, 'index': {}, 'deque': {}}
+        targets = self._save_targets(caches, indexes, deques)
+        pool = self._get_pool()
+        tasks = [pool.submit(_save, *target) for target in targets]
+        for (kind, i, _), task in zip(targets, tasks):
+            _paths[kind][i] = task.result()
         return _paths
 
 
-    async def async_save(self, path: str = None, compressed: bool = False, caches: Union[List[str], str] = None, indexes: Union[List[str], str] = None, deques: Union[List[str], str] = None):
+    async def async_save(self, path: str = None, compressed: bool = False, caches: Union[List[str], str] = None, indexes: Union[List[str], str] = None, deques: Union[List[str], str] = None, chunk_size: int = None, incremental: bool = False):
         """
-        Closes the Database and async saves the file to target path
+        Async saves a consistent snapshot of every Database shard to target path
+        Shards, caches, indexes and deques are uploaded concurrently.
         :param path = path to save to
         :param compressed: use gzip compression
+        :param chunk_size: bytes streamed per chunk. default CachezConfigz.save_chunk_size
+        :param incremental: only save rows changed since the previous save as deltas. requires track_changes
         :param index List[str] | str : specific index to save. default all.
         :param deque List[str] | str : specific deque to save. default all.
         """
-        _caches = self._caches
-        _paths = {'cache': {}, 'index': {}, 'deque': {}}
-        if caches:
-            if isinstance(caches, str): caches = [caches]
-            _caches = {i:cache for i,cache in _caches.items() if i in caches}
-        
-        for i, cache in _caches.items():
-            logger.info(f'[Shard] Saving Cache {i}')
-            p = await cache.async_save(path=path, compressed=compressed)
-            _paths['cache'][i] = p
-
-        _indexes = self._indexes
-        if indexes:
-            if isinstance(indexes, str): indexes = [indexes]
-            _indexes = {i:cache for i,cache in _indexes.items() if i in indexes}
-        
-        for i, cache in _indexes.items():
-            logger.info(f'[Shard] Saving Index {i}')
-            p = await cache.async_save(path=path, compressed=compressed)
-            _paths['index'][i] = p
-
-        _deques = self._deques
-        if deques:
-            if isinstance(deques, str): deques = [deques]
-            _deques = {i:cache for i,cache in _deques.items() if i in deques}
-        
-        for i, cache in _deques.items():
-            logger.info(f'[Shard] Saving Deque {i}')
-            p = await cache.async_save(path=path, compressed=compressed)
-            _paths['deque'][i] = p
+        async def _save(kind: str, i, obj):
+            logger.info(f'[Shard] Saving {kind.capitalize()} {i}')
+            return await obj.async_save(path=path, compressed=compressed, chunk_size=chunk_size, incremental=incremental)
+
+        _paths = {'shard': {}, 'cache': {}, 'index': {}, 'deque': {}}
+        targets = self._save_targets(caches, indexes, deques)
+        results = await asyncio.gather(*[_save(*target) for target in targets])
+        for (kind, i, _), p in zip(targets, results):
+            _paths[kind][i] = p
         return _paths
         
 
     @classmethod
-    def load(cls, src_path: str, directory: str, filename: str = None, shards: int = 8, **settings) -> 'ShardCache':
+    def load(cls, src_path: str, directory: str, filename: str = None, shards: int = 8, deltas: bool = True, **settings) -> 'ShardCache':
         from lazy.io.pathz_v2 import get_path
         src = get_path(src_path)
         src_paths = list(src.glob('*.db*'))
+        src_paths = [path for path in src_paths if '.delta-' not in path.name]
 
         directory = op.expanduser(directory)
         directory = op.expandvars(directory)
@@ -685,15 +1152,16 @@ class ShardCache:
 
         for path in src_paths:
             # we'll just download them all and then init. would be simplest
-            Cache.load(path, directory = directory, **settings)
+            Cache.load(path, directory = directory, deltas = deltas, **settings)
         return ShardCache(directory = directory, filename = filename, shards = shards, **settings)
         
 
     @classmethod
-    async def async_load(cls, src_path: str, directory: str, filename: str = None, shards: int = 8, **settings) -> 'ShardCache':
+    async def async_load(cls, src_path: str, directory: str, filename: str = None, shards: int = 8, deltas: bool = True, **settings) -> 'ShardCache':
         from lazy.io.pathz_v2 import get_path
         src = get_path(src_path)
         src_paths = list(await src.async_glob('*.db*'))
+        src_paths = [path for path in src_paths if '.delta-' not in path.name]
         
         directory = op.expanduser(directory)
         directory = op.expandvars(directory)
@@ -704,9 +1172,10 @@ class ShardCache:
 
         for path in src_paths:
             # we'll just download them all and then init. would be simplest
-            await Cache.async_load(path, directory = directory, **settings)
+            await Cache.async_load(path, directory = directory, deltas = deltas, **settings)
         return ShardCache(directory = directory, filename = filename, shards = shards, **settings)
 
 
 
-ShardCache.memoize = Cache.memoize  # type: ignore
\ No newline at end of file
+ShardCache.memoize = Cache.memoize  # type: ignore
+ShardCache._memoize_stampede = Cache._memoize_stampede  # type: ignore
\ No newline at end of file
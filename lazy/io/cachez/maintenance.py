@@ -0,0 +1,128 @@
+"""
+Background maintenance for Cachez.
+
+A daemon thread periodically calls `maintain` on a Cache or ShardCache so
+expiry, size based eviction, orphaned file cleanup and incremental vacuum
+happen off the write path. Each round is limited by a time budget and
+picks up the remaining work in the next round.
+"""
+
+import os
+import sqlite3
+import threading
+import weakref
+import os.path as op
+from typing import Optional, Set
+
+from .config import CachezConfigz, logger
+
+__all__ = ('MaintenanceWorker',)
+
+
+# Files beside a database that are not databases of their own, or are
+# transient copies of one (see `Cache._snapshot_path`, `Cache.load`).
+_NON_DB_SUFFIXES = ('-wal', '-shm', '-journal', '.partial')
+_TRANSIENT_MARKERS = ('.snapshot-', '.delta-')
+_SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+def _is_database(path: str) -> bool:
+    name = op.basename(path)
+    if '.db' not in name or name.endswith(_NON_DB_SUFFIXES):
+        return False
+    if any(marker in name for marker in _TRANSIENT_MARKERS):
+        return False
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def referenced_files(directory: str, filepath: str = None) -> Optional[Set[str]]:
+    """Return value filenames referenced by any cache table of any database
+    in `directory`.
+    Caches of a ShardCache, and caches opened with different filenames in the
+    same directory, share the value file tree so all of them are consulted.
+    Databases are found by the same `'.db' in filename` rule as `Cache`
+    and by their SQLite header.
+    :param str filepath: database of the calling cache, always consulted
+    :return: set of relative filenames or None if a database could not be read
+    """
+    referenced = set()
+    paths = [op.join(directory, name) for name in os.listdir(directory)]
+    paths = [path for path in paths if _is_database(path)]
+    if filepath is not None and op.abspath(filepath) not in {op.abspath(path) for path in paths}:
+        paths.append(filepath)
+    for path in paths:
+        try:
+            con = sqlite3.connect(f'file:{path}?mode=ro', uri=True, timeout=1)
+        except sqlite3.Error:
+            return None
+        try:
+            tables = [
+                table[len('Settings_'):]
+                for (table,) in con.execute(
+                    'SELECT name FROM sqlite_master WHERE type = "table"'
+                    ' AND name LIKE "Settings\\_%" ESCAPE "\\"'
+                )
+            ]
+            for table in tables:
+                referenced.update(
+                    filename for (filename,) in con.execute(
+                        f'SELECT filename FROM "{table}" WHERE filename IS NOT NULL'
+                    )
+                )
+        except sqlite3.Error:
+            return None
+        finally:
+            con.close()
+    return referenced
+
+
+class MaintenanceWorker:
+    "Daemon thread running `maintain` rounds of a cache on a schedule."
+
+    def __init__(self, cache, interval: float = None, budget: float = None):
+        """Initialize maintenance worker.
+        The worker holds a weak reference to `cache` and exits once the cache
+        is garbage collected.
+        :param cache: Cache or ShardCache to maintain
+        :param float interval: seconds between rounds (default CachezConfigz.maintenance_interval)
+        :param float budget: max seconds of work per round (default CachezConfigz.maintenance_budget)
+        """
+        self.interval = CachezConfigz.maintenance_interval if interval is None else interval
+        self.budget = CachezConfigz.maintenance_budget if budget is None else budget
+        self._cache = weakref.ref(cache)
+        self._stop = threading.Event()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target = self._run,
+            name = 'cachez-maintenance',
+            daemon = True,
+        )
+
+    @property
+    def alive(self) -> bool:
+        "True while the worker thread runs in this process."
+        return self._pid == os.getpid() and self._thread.is_alive()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Stop the worker, waiting up to `timeout` seconds for a running round."""
+        self._stop.set()
+        if self.alive and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            cache = self._cache()
+            if cache is None:
+                return
+            try:
+                cache.maintain(budget = self.budget, retry = True)
+            except Exception as error:
+                logger.error(f'Maintenance of {cache.directory} failed: {error}')
+            del cache
@@ -0,0 +1,111 @@
+"""
+In-process L1 tier for Cachez.
+
+Holds deserialized values for hot keys in front of the SQLite cache so repeat
+reads skip the database lookup, the file read and the unpickle.
+
+Entries are tagged with the `generation` counter kept in the Settings table,
+which triggers bump on every update or delete of a row. When another
+connection or process changes the table, the next lookup observes a new
+generation and the whole tier is dropped.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Tuple
+
+from .static import ENOVAL
+
+__all__ = ('MemoryCache',)
+
+
+class MemoryCache:
+    "Bounded LRU of deserialized values keyed by (database key, raw) pairs."
+
+    def __init__(self, max_items: int = 0, max_bytes: int = 0):
+        """Initialize memory tier.
+        At least one of `max_items` or `max_bytes` should be set, a value of
+        zero disables that bound.
+        :param int max_items: maximum number of entries held
+        :param int max_bytes: maximum estimated size of held entries in bytes
+        """
+        self.max_items = int(max_items or 0)
+        self.max_bytes = int(max_bytes or 0)
+        self.generation = None
+        self.nbytes = 0
+        self._data: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def sync(self, generation) -> bool:
+        """Drop all entries if `generation` differs from the held generation.
+        :return: True if entries are valid for `generation`
+        """
+        with self._lock:
+            if generation == self.generation:
+                return True
+            self._data.clear()
+            self.nbytes = 0
+            self.generation = generation
+            return False
+
+    def get(self, key, default=ENOVAL):
+        "Return entry for `key` marking it most recently used."
+        with self._lock:
+            try:
+                entry, _ = self._data[key]
+            except KeyError:
+                return default
+            self._data.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, weight: int, generation) -> bool:
+        """Store `entry` for `key` if `generation` is still current.
+        Entries larger than `max_bytes` are not stored.
+        :return: True if entry was stored
+        """
+        if self.max_bytes and weight > self.max_bytes:
+            return False
+        with self._lock:
+            if generation != self.generation:
+                return False
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._data[key] = (entry, weight)
+            self.nbytes += weight
+            while self._data and (
+                (self.max_items and len(self._data) > self.max_items)
+                or (self.max_bytes and self.nbytes > self.max_bytes)
+            ):
+                _, (_, old_weight) = self._data.popitem(last=False)
+                self.nbytes -= old_weight
+            return True
+
+    def discard(self, key):
+        "Remove `key` if present."
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+
+    def advance(self, keys: Iterable[Hashable], before, after):
+        """Record a write made through this process.
+        Removes `keys` and moves to generation `after` when the tier was in
+        sync with `before`, so own writes do not drop unrelated entries.
+        """
+        with self._lock:
+            for key in keys:
+                old = self._data.pop(key, None)
+                if old is not None:
+                    self.nbytes -= old[1]
+            if self.generation == before:
+                self.generation = after
+
+    def clear(self):
+        "Remove all entries."
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
@@ -0,0 +1,271 @@
+"""
+In-process metrics for Cachez.
+
+Counters and latency histograms are recorded into per-thread buffers, so the
+hot path never takes a lock or writes to the database. Buffers are merged
+when a snapshot is read. Hit and miss counts are periodically added to the
+`hits` / `misses` values of the Settings table so `Cache.stats` keeps
+reporting them across processes.
+"""
+
+import math
+import time
+import weakref
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+__all__ = ('Metrics', 'merge_metrics', 'to_prometheus', 'LATENCY_BUCKETS')
+
+# Upper bounds in seconds of the latency histogram buckets.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Counters with a fixed meaning. Others may be recorded freely.
+COUNTERS = {
+    'hits': 'Reads that found a value',
+    'misses': 'Reads that found no value',
+    'bytes_read': 'Bytes of values read',
+    'bytes_written': 'Bytes of values written',
+    'values_file': 'Values written to files',
+    'values_inline': 'Values written inline in the database',
+    'txn_retries': 'Attempts to begin a transaction that found the database locked',
+    'txn_timeouts': 'Transactions that failed with a database timeout',
+    'expired': 'Items removed because they expired',
+    'culled': 'Items evicted by the eviction policy',
+}
+
+
+class _ThreadMetrics:
+    "Counters and histograms written by a single thread."
+
+    __slots__ = ('counters', 'latency', 'generation')
+
+    def __init__(self, generation: int = 0):
+        self.counters: Dict[str, int] = {}
+        # op -> [bucket counts..., overflow count, sum of seconds]
+        self.latency: Dict[str, List[float]] = {}
+        # `Metrics.reset` count when created, older buffers are discarded
+        self.generation = generation
+
+    def merge(self, data: '_ThreadMetrics'):
+        "Add the counters and histograms of `data`."
+        for name, value in list(data.counters.items()):
+            self.counters[name] = self.counters.get(name, 0) + value
+        for op, hist in list(data.latency.items()):
+            total = self.latency.get(op)
+            if total is None:
+                total = self.latency[op] = [0] * len(hist)
+            for i, value in enumerate(hist):
+                total[i] += value
+
+
+class _ThreadToken:
+    "Only referenced by a thread local, so it is collected when its thread exits."
+
+    __slots__ = ('__weakref__',)
+
+
+def _retire(ref: 'weakref.ref', data: _ThreadMetrics):
+    metrics = ref()
+    if metrics is not None:
+        metrics._retire(data)
+
+
+class Metrics:
+    "Lock-light collector of cache counters and per operation latencies."
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS, flush_interval: float = None):
+        """Initialize metrics collector.
+        :param buckets: latency histogram upper bounds in seconds
+        :param float flush_interval: seconds between flushes of hit and miss
+            counts to the database (default None, never due)
+        """
+        self.buckets = tuple(buckets)
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._generation = 0
+        self._threads: Set[_ThreadMetrics] = set()
+        # buffers of exited threads, merged so they don't accumulate
+        self._retired = _ThreadMetrics()
+        self._lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self._flushed: Dict[str, int] = {}
+        self._flush_time = time.monotonic()
+        self._flushing = False
+
+    def _data(self) -> _ThreadMetrics:
+        data = getattr(self._local, 'data', None)
+        if data is not None and data.generation == self._generation:
+            return data
+        data = _ThreadMetrics(self._generation)
+        # Replacing the token retires the buffer of a previous generation.
+        token = self._local.token = _ThreadToken()
+        self._local.data = data
+        with self._lock:
+            self._threads.add(data)
+        weakref.finalize(token, _retire, weakref.ref(self), data)
+        return data
+
+    def _retire(self, data: _ThreadMetrics):
+        "Merge the buffer of an exited thread into the retired totals."
+        with self._lock:
+            if data not in self._threads:
+                return
+            self._threads.discard(data)
+            self._retired.merge(data)
+
+    def incr(self, name: str, value: int = 1):
+        "Add `value` to counter `name`."
+        counters = self._data().counters
+        counters[name] = counters.get(name, 0) + value
+
+    def observe(self, op: str, seconds: float):
+        "Record a latency of `seconds` for operation `op`."
+        latency = self._data().latency
+        hist = latency.get(op)
+        if hist is None:
+            hist = latency[op] = [0] * (len(self.buckets) + 2)
+        hist[bisect_left(self.buckets, seconds)] += 1
+        hist[-1] += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Merge thread buffers into a snapshot.
+        Latency buckets are cumulative like Prometheus histograms and keyed
+        by upper bound, with `math.inf` holding the total count.
+        :return: dict with 'counters' and 'latency'
+        """
+        total = _ThreadMetrics()
+        with self._lock:
+            threads = list(self._threads)
+            total.merge(self._retired)
+        for data in threads:
+            total.merge(data)
+        counters, merged = total.counters, total.latency
+
+        latency = {}
+        for op, hist in merged.items():
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets + (math.inf,), hist[:-1]):
+                cumulative += count
+                buckets[bound] = cumulative
+            latency[op] = {'count': cumulative, 'sum': hist[-1], 'buckets': buckets}
+
+        written = counters.get('values_file', 0) + counters.get('values_inline', 0)
+        counters.setdefault('hits', 0)
+        counters.setdefault('misses', 0)
+        return {
+            'counters': counters,
+            'latency': latency,
+            'file_value_ratio': counters.get('values_file', 0) / written if written else 0.0,
+        }
+
+    def reset(self):
+        """Zero all counters and histograms.
+        Buffers are replaced rather than cleared, as their threads may be
+        writing to them. Each thread starts a new buffer on its next record.
+        """
+        with self._lock:
+            self._generation += 1
+            self._threads = set()
+            self._retired = _ThreadMetrics(self._generation)
+            self._flushed = {}
+
+    def pending(self, names: Iterable[str]) -> Dict[str, int]:
+        """Return increase of counters `names` since they were last flushed.
+        Hold `flush_lock` until `mark_flushed` so flushes do not overlap.
+        """
+        counters = self.snapshot()['counters']
+        return {name: counters.get(name, 0) - self._flushed.get(name, 0) for name in names}
+
+    def mark_flushed(self, deltas: Dict[str, int]):
+        "Record `deltas` returned by `pending` as flushed."
+        for name, value in deltas.items():
+            self._flushed[name] = self._flushed.get(name, 0) + value
+
+    def due(self) -> bool:
+        """Return True once per `flush_interval` to the caller that should
+        flush. Call `flushed` when done.
+        """
+        if self.flush_interval is None or self._flushing:
+            return False
+        if time.monotonic() - self._flush_time < self.flush_interval:
+            return False
+        with self._lock:
+            if self._flushing:
+                return False
+            self._flushing = True
+            return True
+
+    def flushed(self):
+        self._flush_time = time.monotonic()
+        self._flushing = False
+
+
+def merge_metrics(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum metric snapshots, e.g. of the shards of a ShardCache.
+    :return: snapshot in the format of `Metrics.snapshot`
+    """
+    counters: Dict[str, int] = {}
+    latency: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, value in snapshot['counters'].items():
+            counters[name] = counters.get(name, 0) + value
+        for op, hist in snapshot['latency'].items():
+            total = latency.setdefault(op, {'count': 0, 'sum': 0.0, 'buckets': {}})
+            total['count'] += hist['count']
+            total['sum'] += hist['sum']
+            for bound, count in hist['buckets'].items():
+                total['buckets'][bound] = total['buckets'].get(bound, 0) + count
+    written = counters.get('values_file', 0) + counters.get('values_inline', 0)
+    return {
+        'counters': counters,
+        'latency': latency,
+        'file_value_ratio': counters.get('values_file', 0) / written if written else 0.0,
+    }
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    items = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return '{' + items + '}'
+
+
+def to_prometheus(snapshot: Dict[str, Any], prefix: str = 'cachez', labels: Dict[str, Any] = None) -> str:
+    """Render a metrics snapshot in the Prometheus text exposition format.
+    :param dict snapshot: snapshot from `Metrics.snapshot` or `merge_metrics`
+    :param str prefix: metric name prefix (default 'cachez')
+    :param dict labels: labels added to every sample (default None)
+    :return: exposition text
+    """
+    labels = dict(labels or {})
+    lines = []
+    for name, value in sorted(snapshot['counters'].items()):
+        metric = f'{prefix}_{name}_total'
+        if name in COUNTERS:
+            lines.append(f'# HELP {metric} {COUNTERS[name]}')
+        lines.append(f'# TYPE {metric} counter')
+        lines.append(f'{metric}{_labels(labels)} {value}')
+
+    metric = f'{prefix}_operation_seconds'
+    if snapshot['latency']:
+        lines.append(f'# HELP {metric} Latency of cache operations')
+        lines.append(f'# TYPE {metric} histogram')
+    for op, hist in sorted(snapshot['latency'].items()):
+        op_labels = dict(labels, op = op)
+        for bound, count in hist['buckets'].items():
+            le = '+Inf' if bound == math.inf else repr(bound)
+            lines.append(f'{metric}_bucket{_labels(dict(op_labels, le = le))} {count}')
+        lines.append(f'{metric}_sum{_labels(op_labels)} {hist["sum"]}')
+        lines.append(f'{metric}_count{_labels(op_labels)} {hist["count"]}')
+
+    metric = f'{prefix}_file_value_ratio'
+    lines.append(f'# TYPE {metric} gauge')
+    lines.append(f'{metric}{_labels(labels)} {snapshot["file_value_ratio"]}')
+    return '\n'.join(lines) + '\n'
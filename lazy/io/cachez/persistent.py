@@ -12,10 +12,11 @@ from collections.abc import (
     ValuesView,
 )
 from contextlib import contextmanager
+from itertools import islice
 from shutil import rmtree
 from typing import Union, List, Any, Type, Dict
 from .config import CachezConfigz
-from .base import ENOVAL, Cache, Disk
+from .base import ENOVAL, Cache, Disk, _result, _SQL_CHUNK_SIZE
 
 
 def _make_compare(seq_op, doc):
@@ -118,39 +119,108 @@ class Deque(Sequence):
         "Directory path where deque is stored."
         return self._cache.directory
 
-    def _index(self, index, func):
-        len_self = len(self)
+    def _locate(self, index):
+        """Return the database (key, raw) pair at position `index`.
+        Keys added by `append` and `appendleft` are contiguous integers, so
+        the key is found by arithmetic from the smallest key. When there are
+        holes, from `remove` or deleting by index, the key is found with an
+        OFFSET query over the key index starting from the nearer end.
+        :param int index: position in deque, negative counts from the back
+        :return: (database key, raw) pair
+        :raises IndexError: if index out of range
+        """
+        _cache = self._cache
+        table = _cache.table_name
+        ((low, high, len_self),) = _cache._sql(
+            f'SELECT (SELECT MIN(key) FROM {table}),'
+            f' (SELECT MAX(key) FROM {table}),'
+            f' (SELECT value FROM Settings_{table} WHERE key = "count")'
+        ).fetchall()
+
+        if index < 0:
+            index += len_self
+        if not 0 <= index < len_self:
+            raise IndexError('deque index out of range')
+
+        # pylint: disable=unidiomatic-typecheck
+        if type(low) is int and type(high) is int and high - low + 1 == len_self:
+            return low + index, True
+
+        if index <= len_self // 2:
+            order, offset = 'ASC', index
+        else:
+            order, offset = 'DESC', len_self - 1 - index
 
-        if index >= 0:
-            if index >= len_self:
-                raise IndexError('deque index out of range')
+        rows = _cache._sql(
+            f'SELECT key, raw FROM {table}'
+            f' ORDER BY key {order}, raw {order} LIMIT 1 OFFSET ?',
+            (offset,),
+        ).fetchall()
 
-            for key in self._cache.iterkeys():
-                if index == 0:
-                    try:
-                        return func(key)
-                    except KeyError:
-                        continue
-                index -= 1
-        else:
-            if index < -len_self:
-                raise IndexError('deque index out of range')
+        if not rows:
+            raise IndexError('deque index out of range')
+        ((key, raw),) = rows
+        return key, raw
 
-            index += 1
+    def _index(self, index, func):
+        _disk_get = self._cache.disk.get
 
-            for key in self._cache.iterkeys(reverse=True):
-                if index == 0:
-                    try:
-                        return func(key)
-                    except KeyError:
-                        continue
-                index += 1
+        while True:
+            key, raw = self._locate(index)
+            try:
+                return func(_disk_get(key, raw))
+            except KeyError:
+                # Removed concurrently, positions have shifted.
+                continue
+
+    def _iter_from(self, index, reverse=False):
+        """Iterate values in deque order starting at position `index`.
+        Keys are read from the key index in batches after the starting key.
+        """
+        _cache = self._cache
+        sql = _cache._sql
+        table = _cache.table_name
+        _disk_get = _cache.disk.get
+        limit = 100
+
+        try:
+            key, raw = self._locate(index)
+        except IndexError:
+            return
 
-        raise IndexError('deque index out of range')
+        try:
+            yield _cache[_disk_get(key, raw)]
+        except KeyError:
+            pass
+
+        if reverse:
+            iterate = (
+                f'SELECT key, raw FROM {table}'
+                ' WHERE key = ? AND raw < ? OR key < ?'
+                ' ORDER BY key DESC, raw DESC LIMIT ?'
+            )
+        else:
+            iterate = (
+                f'SELECT key, raw FROM {table}'
+                ' WHERE key = ? AND raw > ? OR key > ?'
+                ' ORDER BY key ASC, raw ASC LIMIT ?'
+            )
+
+        while True:
+            rows = sql(iterate, (key, raw, key, limit)).fetchall()
+            for key, raw in rows:
+                try:
+                    yield _cache[_disk_get(key, raw)]
+                except KeyError:
+                    pass
+            if len(rows) < limit:
+                return
 
     def __getitem__(self, index):
         """deque.__getitem__(index) <==> deque[index]
         Return corresponding item for `index` in deque.
+        Slicing returns a `DequeView` window over the deque which reads items
+        lazily.
         See also `Deque.peekleft` and `Deque.peek` for indexing deque at index
         ``0`` or ``-1``.
         >>> deque = Deque()
@@ -159,10 +229,14 @@ class Deque(Sequence):
         'b'
         >>> deque[-2]
         'd'
-        :param int index: index of item
-        :return: corresponding item
+        >>> list(deque[1:4])
+        ['b', 'c', 'd']
+        :param index: index of item or slice
+        :return: corresponding item or DequeView
         :raises IndexError: if index out of range
         """
+        if isinstance(index, slice):
+            return DequeView(self, range(len(self))[index])
         return self._index(index, self._cache.__getitem__)
 
     def __setitem__(self, index, value):
@@ -318,10 +392,11 @@ class Deque(Sequence):
 
     def extend(self, iterable):
         """Extend back side of deque with values from `iterable`.
+        Values are consumed and added in transactions of `_SQL_CHUNK_SIZE`
+        values, so large iterables are never held in memory at once.
         :param iterable: iterable of values
         """
-        for value in iterable:
-            self.append(value)
+        self._extend(iterable, 'back')
 
     def extendleft(self, iterable):
         """Extend front side of deque with value from `iterable`.
@@ -331,8 +406,15 @@ class Deque(Sequence):
         ['c', 'b', 'a']
         :param iterable: iterable of values
         """
-        for value in iterable:
-            self.appendleft(value)
+        self._extend(iterable, 'front')
+
+    def _extend(self, iterable, side):
+        iterator = iter(iterable)
+        while True:
+            values = list(islice(iterator, _SQL_CHUNK_SIZE))
+            if not values:
+                return
+            self._cache.push_many(values, side=side, retry=True)
 
     def peek(self):
         """Peek at value at back of deque.
@@ -376,9 +458,11 @@ class Deque(Sequence):
             raise IndexError('peek from an empty deque')
         return value
 
-    def pop(self):
+    def pop(self, block=False, timeout=None):
         """Remove and return value at back of deque.
-        If deque is empty then raise IndexError.
+        If deque is empty then raise IndexError. When `block` is True, first
+        wait up to `timeout` seconds (forever when None) for a value to be
+        added, by this or any other process.
         >>> deque = Deque()
         >>> deque += 'ab'
         >>> deque.pop()
@@ -389,17 +473,22 @@ class Deque(Sequence):
         Traceback (most recent call last):
             ...
         IndexError: pop from an empty deque
+        :param bool block: wait for a value when deque is empty (default False)
+        :param float timeout: seconds to wait when blocking (default None, no limit)
         :return: value at back of deque
         :raises IndexError: if deque is empty
         """
         default = None, ENOVAL
-        _, value = self._cache.pull(default=default, side='back', retry=True)
+        _, value = self._cache.pull(default=default, side='back', retry=True, block=block, timeout=timeout)
         if value is ENOVAL:
             raise IndexError('pop from an empty deque')
         return value
 
-    def popleft(self):
+    def popleft(self, block=False, timeout=None):
         """Remove and return value at front of deque.
+        If deque is empty then raise IndexError. When `block` is True, first
+        wait up to `timeout` seconds (forever when None) for a value to be
+        added, by this or any other process.
         >>> deque = Deque()
         >>> deque += 'ab'
         >>> deque.popleft()
@@ -410,15 +499,49 @@ class Deque(Sequence):
         Traceback (most recent call last):
             ...
         IndexError: pop from an empty deque
+        :param bool block: wait for a value when deque is empty (default False)
+        :param float timeout: seconds to wait when blocking (default None, no limit)
         :return: value at front of deque
         :raises IndexError: if deque is empty
         """
         default = None, ENOVAL
-        _, value = self._cache.pull(default=default, retry=True)
+        _, value = self._cache.pull(default=default, retry=True, block=block, timeout=timeout)
         if value is ENOVAL:
             raise IndexError('pop from an empty deque')
         return value
 
+    def popmany(self, count, block=False, timeout=None):
+        """Remove and return up to `count` values from back of deque.
+        Values are removed in a single transaction and returned in pop order.
+        Returns an empty list if deque is empty, unless `block` is True in
+        which case first wait up to `timeout` seconds for a value.
+        >>> deque = Deque('abc')
+        >>> deque.popmany(2)
+        ['c', 'b']
+        :param int count: maximum number of values to remove
+        :param bool block: wait for a value when deque is empty (default False)
+        :param float timeout: seconds to wait when blocking (default None, no limit)
+        :return: list of values
+        """
+        items = self._cache.pull_many(count, side='back', retry=True, block=block, timeout=timeout)
+        return [value for _, value in items]
+
+    def popleftmany(self, count, block=False, timeout=None):
+        """Remove and return up to `count` values from front of deque.
+        Values are removed in a single transaction and returned in pop order.
+        Returns an empty list if deque is empty, unless `block` is True in
+        which case first wait up to `timeout` seconds for a value.
+        >>> deque = Deque('abc')
+        >>> deque.popleftmany(2)
+        ['a', 'b']
+        :param int count: maximum number of values to remove
+        :param bool block: wait for a value when deque is empty (default False)
+        :param float timeout: seconds to wait when blocking (default None, no limit)
+        :return: list of values
+        """
+        items = self._cache.pull_many(count, retry=True, block=block, timeout=timeout)
+        return [value for _, value in items]
+
     def remove(self, value):
         """Remove first occurrence of `value` in deque.
         >>> deque = Deque()
@@ -495,27 +618,29 @@ class Deque(Sequence):
         if not len_self:
             return
 
-        if steps >= 0:
-            steps %= len_self
+        # Move items in a single transaction rather than committing per step.
+        with self._cache.transact(retry=True):
+            if steps >= 0:
+                steps %= len_self
 
-            for _ in range(steps):
-                try:
-                    value = self.pop()
-                except IndexError:
-                    return
-                else:
-                    self.appendleft(value)
-        else:
-            steps *= -1
-            steps %= len_self
+                for _ in range(steps):
+                    try:
+                        value = self.pop()
+                    except IndexError:
+                        return
+                    else:
+                        self.appendleft(value)
+            else:
+                steps *= -1
+                steps %= len_self
 
-            for _ in range(steps):
-                try:
-                    value = self.popleft()
-                except IndexError:
-                    return
-                else:
-                    self.append(value)
+                for _ in range(steps):
+                    try:
+                        value = self.popleft()
+                    except IndexError:
+                        return
+                    else:
+                        self.append(value)
 
     __hash__ = None  # type: ignore
 
@@ -540,11 +665,27 @@ class Deque(Sequence):
         with self._cache.transact(retry=True):
             yield
     
-    def save(self, path: str = None, compressed: bool = False):
-        return self._cache.save(path, compressed=compressed)
+    def metrics(self, enable=True, reset=False):
+        """Return in-memory metrics of the deque.
+        See `Cache.metrics`.
+        :param bool enable: enable collecting metrics (default True)
+        :param bool reset: reset metrics to zero (default False)
+        :return: dict with 'counters', 'latency' and 'file_value_ratio'
+        """
+        return self._cache.metrics(enable, reset)
+
+    def metrics_prometheus(self, prefix='cachez', labels=None):
+        """Return metrics of the deque in the Prometheus text exposition format.
+        See `Cache.metrics_prometheus`.
+        :return: exposition text
+        """
+        return self._cache.metrics_prometheus(prefix, labels)
+
+    def save(self, path: str = None, compressed: bool = False, chunk_size: int = None, incremental: bool = False):
+        return self._cache.save(path, compressed=compressed, chunk_size=chunk_size, incremental=incremental)
     
-    async def async_save(self, path: str = None, compressed: bool = False):
-        return await self._cache.async_save(path, compressed=compressed)
+    async def async_save(self, path: str = None, compressed: bool = False, chunk_size: int = None, incremental: bool = False):
+        return await self._cache.async_save(path, compressed=compressed, chunk_size=chunk_size, incremental=incremental)
 
     @classmethod
     def load(cls, src_path: str, directory: str, table_name: str = CachezConfigz.default_table, **settings) -> 'Deque':
@@ -557,6 +698,53 @@ class Deque(Sequence):
         return Deque.fromcache(_cache)
 
 
+class DequeView(Sequence):
+    """Lazy window over positions of a `Deque`, returned by slicing.
+    Positions are fixed when the view is created. Items are read from the
+    deque when accessed, contiguous windows are read in key order batches.
+    >>> deque = Deque(range(10))
+    >>> view = deque[2:8:2]
+    >>> len(view)
+    3
+    >>> list(view)
+    [2, 4, 6]
+    >>> view[-1]
+    6
+    """
+
+    def __init__(self, deque: Deque, positions: range):
+        self._deque = deque
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DequeView(self._deque, self._positions[index])
+        return self._deque[self._positions[index]]
+
+    def __iter__(self):
+        positions = self._positions
+        if not positions:
+            return
+        if positions.step in (1, -1):
+            values = self._deque._iter_from(positions[0], reverse=positions.step < 0)
+            yield from islice(values, len(positions))
+            return
+        for position in positions:
+            try:
+                yield self._deque[position]
+            except IndexError:
+                return
+
+    def __reversed__(self):
+        return iter(self[::-1])
+
+    def __repr__(self):
+        return '{0}({1!r}, {2!r})'.format(type(self).__name__, self._deque, self._positions)
+
+
 class Index(MutableMapping):
     """Persistent mutable mapping with insertion order iteration.
     Items are serialized to disk. Index may be initialized from directory path
@@ -702,7 +890,7 @@ class Index(MutableMapping):
             try:
                 return _cache[key]
             except KeyError:
-                _cache.add(key, default, retry=True)
+                _result(_cache.add(key, default, retry=True))
 
     def peekitem(self, last=True):
         """Peek at key and value item pair in index based on iteration order.
@@ -800,7 +988,7 @@ class Index(MutableMapping):
         """
         return self._cache.push(value, prefix, side, retry=True)
 
-    def pull(self, prefix=None, default=(None, None), side='front'):
+    def pull(self, prefix=None, default=(None, None), side='front', block=False, timeout=None):
         """Pull key and value item pair from `side` of queue in index.
         When prefix is None, integer keys are used. Otherwise, string keys are
         used in the format "prefix-integer". Integer starts at 500 trillion.
@@ -829,9 +1017,13 @@ class Index(MutableMapping):
         :param default: value to return if key is missing
             (default (None, None))
         :param str side: either 'front' or 'back' (default 'front')
+        :param bool block: wait for an item when queue is empty
+            (default False)
+        :param float timeout: seconds to wait when blocking
+            (default None, no limit)
         :return: key and value item pair or default if queue is empty
         """
-        return self._cache.pull(prefix, default, side, retry=True)
+        return self._cache.pull(prefix, default, side, retry=True, block=block, timeout=timeout)
 
     def clear(self):
         """Remove all items from index.
@@ -902,6 +1094,72 @@ class Index(MutableMapping):
         """
         return ItemsView(self)
 
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False, values=False):
+        """Iterate keys between `minimum` and `maximum` in sort order.
+        Only str, bytes, int and float keys are part of ranges, see
+        `Cache.irange`.
+        >>> index = Index({'a': 1, 'b': 2, 'c': 3, 'd': 4})
+        >>> list(index.irange('b', 'c'))
+        ['b', 'c']
+        >>> list(index.irange('c', values=True))
+        [('c', 3), ('d', 4)]
+        :param minimum: lower bound key (default None, unbounded)
+        :param maximum: upper bound key (default None, unbounded)
+        :param tuple inclusive: whether minimum and maximum are included
+            (default (True, True))
+        :param bool reverse: iterate in descending order (default False)
+        :param bool values: yield (key, value) pairs (default False)
+        :return: iterator of keys or key and value pairs
+        """
+        return self._cache.irange(minimum, maximum, inclusive, reverse, values)
+
+    def prefix_scan(self, prefix, reverse=False, values=False):
+        """Iterate str or bytes keys starting with `prefix` in sort order.
+        >>> index = Index({'user:1': 'a', 'user:2': 'b', 'group:1': 'c'})
+        >>> list(index.prefix_scan('user:', values=True))
+        [('user:1', 'a'), ('user:2', 'b')]
+        :param prefix: str or bytes key prefix
+        :param bool reverse: iterate in descending order (default False)
+        :param bool values: yield (key, value) pairs (default False)
+        :return: iterator of keys or key and value pairs
+        """
+        return self._cache.prefix_scan(prefix, reverse, values)
+
+    def bisect_left(self, key):
+        """Return the number of keys of the same type sorting before `key`.
+        >>> index = Index({'a': 1, 'c': 2, 'e': 3})
+        >>> index.bisect_left('c'), index.bisect_right('c')
+        (1, 2)
+        :param key: str, bytes, int or float key
+        :return: insertion position of `key` among keys of its type
+        """
+        return self._cache.bisect_left(key)
+
+    def bisect_right(self, key):
+        """Return the number of keys of the same type sorting before or equal
+        to `key`. See `Index.bisect_left`.
+        :param key: str, bytes, int or float key
+        :return: insertion position after `key` among keys of its type
+        """
+        return self._cache.bisect_right(key)
+
+    def page(self, cursor=None, limit=100, minimum=None, maximum=None, inclusive=(True, True), reverse=False, values=False):
+        """Return one page of keys in sort order and the cursor of the next
+        page. See `Cache.page`.
+        >>> index = Index({'a': 1, 'b': 2, 'c': 3})
+        >>> items, cursor = index.page(limit=2, values=True)
+        >>> items
+        [('a', 1), ('b', 2)]
+        >>> index.page(cursor, limit=2, values=True)
+        ([('c', 3)], None)
+        :param cursor: cursor returned with the previous page
+            (default None, first page)
+        :param int limit: max number of keys per page (default 100)
+        :return: (list of keys or items, cursor) with cursor None after the
+            last page
+        """
+        return self._cache.page(cursor, limit, minimum, maximum, inclusive, reverse, values)
+
     __hash__ = None  # type: ignore
 
     def __getstate__(self):
@@ -1030,11 +1288,27 @@ class Index(MutableMapping):
         name = type(self).__name__
         return '{0}({1!r})'.format(name, self.directory)
     
-    def save(self, path: str = None, compressed: bool = False):
-        return self._cache.save(path, compressed=compressed)
+    def metrics(self, enable=True, reset=False):
+        """Return in-memory metrics of the index.
+        See `Cache.metrics`.
+        :param bool enable: enable collecting metrics (default True)
+        :param bool reset: reset metrics to zero (default False)
+        :return: dict with 'counters', 'latency' and 'file_value_ratio'
+        """
+        return self._cache.metrics(enable, reset)
+
+    def metrics_prometheus(self, prefix='cachez', labels=None):
+        """Return metrics of the index in the Prometheus text exposition format.
+        See `Cache.metrics_prometheus`.
+        :return: exposition text
+        """
+        return self._cache.metrics_prometheus(prefix, labels)
+
+    def save(self, path: str = None, compressed: bool = False, chunk_size: int = None, incremental: bool = False):
+        return self._cache.save(path, compressed=compressed, chunk_size=chunk_size, incremental=incremental)
     
-    async def async_save(self, path: str = None, compressed: bool = False):
-        return await self._cache.async_save(path, compressed=compressed)
+    async def async_save(self, path: str = None, compressed: bool = False, chunk_size: int = None, incremental: bool = False):
+        return await self._cache.async_save(path, compressed=compressed, chunk_size=chunk_size, incremental=incremental)
 
     @classmethod
     def load(cls, src_path: str, directory: str, table_name: str = CachezConfigz.default_table, **settings) -> 'Index':
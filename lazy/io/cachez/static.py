@@ -9,6 +9,8 @@ __all__ = (
     'MODE_BINARY',
     'MODE_TEXT',
     'MODE_PICKLE',
+    'MODE_CODEC',
+    'MODE_PICKLE_OOB',
     'METADATA',
 )
 
@@ -42,10 +44,14 @@ MODE_RAW = 1
 MODE_BINARY = 2
 MODE_TEXT = 3
 MODE_PICKLE = 4
+MODE_CODEC = 5
+MODE_PICKLE_OOB = 6
 
 METADATA = {
     u'count': 0,
     u'size': 0,
     u'hits': 0,
     u'misses': 0,
+    u'generation': 0,
+    u'snapshot_time': 0,
 }
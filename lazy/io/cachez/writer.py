@@ -0,0 +1,168 @@
+"""
+Write-behind for Cachez.
+
+Writes are queued to a single writer thread which applies them in batches,
+one transaction per batch, instead of every caller taking the database
+write lock for each key. Callers get a future that resolves once the batch
+holding their write has committed.
+"""
+
+import os
+import queue
+import time
+import threading
+import weakref
+from concurrent import futures
+from typing import Any, Callable, List, Tuple
+
+from .config import CachezConfigz, logger
+
+__all__ = ('WriteBehind',)
+
+# Queued writes: (func, args, kwargs, future)
+_Write = Tuple[Callable, tuple, dict, futures.Future]
+
+_STOP = object()
+
+
+class WriteBehind:
+    "Daemon thread committing queued cache writes in batches."
+
+    def __init__(self, cache, batch_size: int = None, batch_interval: float = None):
+        """Initialize write-behind worker.
+        A batch is committed once it holds `batch_size` writes or
+        `batch_interval` seconds after its first write, whichever comes
+        first. The worker holds a weak reference to `cache`.
+        :param cache: Cache to write to
+        :param int batch_size: max writes per transaction (default CachezConfigz.write_batch_size)
+        :param float batch_interval: max seconds a write waits for its batch to fill (default CachezConfigz.write_batch_interval)
+        """
+        self.batch_size = CachezConfigz.write_batch_size if batch_size is None else batch_size
+        self.batch_interval = CachezConfigz.write_batch_interval if batch_interval is None else batch_interval
+        self._cache = weakref.ref(cache)
+        self._queue: queue.Queue = queue.Queue()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target = self._run,
+            name = 'cachez-writer',
+            daemon = True,
+        )
+
+    @property
+    def alive(self) -> bool:
+        "True while the worker thread runs in this process."
+        return self._pid == os.getpid() and self._thread.is_alive()
+
+    @property
+    def owner(self) -> bool:
+        "True when called from the worker thread."
+        return self._thread is threading.current_thread()
+
+    def start(self):
+        self._thread.start()
+        # Wake the worker so it exits once the cache is garbage collected.
+        weakref.finalize(self._cache(), self._queue.put, _STOP)
+
+    def submit(self, func: Callable, *args, **kwargs) -> futures.Future:
+        """Queue `func(*args, **kwargs)` for the next batch.
+        :return: future resolved with the result once the batch committed
+        """
+        future = futures.Future()
+        self._queue.put((func, args, kwargs, future))
+        return future
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every write queued so far has committed.
+        :param float timeout: max seconds to wait (default None, no limit)
+        :return: True if all writes committed within `timeout`
+        """
+        if not self.alive:
+            return self._queue.empty()
+        done, _ = futures.wait([self.submit(_noop)], timeout)
+        return bool(done)
+
+    def stop(self, timeout: float = None):
+        """Commit queued writes and stop the worker, waiting up to `timeout`
+        seconds.
+        """
+        self._queue.put(_STOP)
+        if self.alive and not self.owner:
+            self._thread.join(timeout)
+
+    def _next_batch(self) -> Tuple[List[_Write], bool]:
+        "Block for a write, then gather more until the batch is full or due."
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout = remaining)
+                except queue.Empty:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if not batch:
+                continue
+            cache = self._cache()
+            if cache is None:
+                for *_, future in batch:
+                    future.cancel()
+                return
+            try:
+                self._commit(cache, batch)
+            except Exception as error:
+                logger.error(f'Write-behind to {cache.directory} failed: {error}')
+            # Queued calls are bound to the cache, drop them before blocking.
+            del cache, batch
+
+    def _commit(self, cache, batch: List[_Write]):
+        """Apply `batch` in one transaction, each write in its own savepoint
+        so a failing write is rolled back alone and reported to its caller.
+        """
+        results: List[Tuple[futures.Future, bool, Any]] = []
+        try:
+            with cache._transact(retry = True) as (sql, _):
+                for func, args, kwargs, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    sql('SAVEPOINT cachez_write')
+                    try:
+                        result = func(*args, **kwargs)
+                    except BaseException as error:
+                        sql('ROLLBACK TO cachez_write')
+                        sql('RELEASE cachez_write')
+                        results.append((future, False, error))
+                    else:
+                        sql('RELEASE cachez_write')
+                        results.append((future, True, result))
+        except BaseException as error:
+            for future, *_ in results:
+                future.set_exception(error)
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            raise
+        for future, ok, result in results:
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+
+def _noop():
+    return None
@@ -7,5 +7,7 @@ from . import base
 
 from . import providers
 from . import generic
+from . import batch
 
-from .generic import *
\ No newline at end of file
+from .generic import *
+from .batch import *
\ No newline at end of file
@@ -0,0 +1,342 @@
+"""
+Concurrent operations over many paths.
+
+Each `batch_*` function takes a list of paths (or `(src, dst)` pairs for
+`batch_copy`), runs at most `max_concurrency` requests at once and returns one
+`BatchResult` per item in input order, holding either the value or the
+error of that item. `callback(done, total)` is called as items complete.
+
+Cloud paths go through the fsspec filesystem of their provider. `batch_rm`
+deletes S3 / MinIO objects with DeleteObjects (1000 keys per request) and GCS
+objects with the JSON batch API (100 per request). `batch_exists` and
+`batch_stat` read and fill the metadata cache of cloud paths.
+
+The sync functions run on the fsspec IO loop with the sync filesystems, the
+`async_` ones on the running loop with the async filesystems.
+"""
+
+import os
+import shutil
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .aiopathz.wrap import to_thread
+from .generic import PathLike, PathzLike, get_path
+from .providers.cfs_metadata import UNSET
+from .providers.cfs_transfer import _is_gcs, async_cloud_copy
+
+__all__ = (
+    'BatchResult',
+    'batch_exists',
+    'async_batch_exists',
+    'batch_stat',
+    'async_batch_stat',
+    'batch_rm',
+    'async_batch_rm',
+    'batch_copy',
+    'async_batch_copy',
+    'batch_read',
+    'async_batch_read',
+)
+
+DEFAULT_BATCH_CONCURRENCY = 32
+_S3_DELETE_LIMIT = 1000
+_GCS_BATCH_LIMIT = 100
+
+ProgressCallback = Callable[[int, int], Any]
+
+
+class BatchResult:
+    """
+    Result of one item of a batch operation.
+    """
+    __slots__ = ('path', 'value', 'error')
+
+    def __init__(self, path: PathzLike, value: Any = None, error: Optional[BaseException] = None):
+        self.path = path
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def result(self) -> Any:
+        """
+        Returns the value, raising the error of the item if it failed.
+        """
+        if self.error is not None: raise self.error
+        return self.value
+
+    def __repr__(self):
+        if self.error is not None: return f'BatchResult({self.path!r}, error={self.error!r})'
+        return f'BatchResult({self.path!r}, value={self.value!r})'
+
+
+class _Batch:
+    """
+    Runs one operation over many items and collects their results.
+    """
+
+    def __init__(self, items: List[Any], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None, sync: bool = False):
+        self.items = items
+        self.results: List[Optional[BatchResult]] = [None] * len(items)
+        self.max_concurrency = max_concurrency or DEFAULT_BATCH_CONCURRENCY
+        self.callback = callback
+        self.sync = sync
+        self.done = 0
+        self._semaphore = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created on the loop the batch runs on.
+        if self._semaphore is None: self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def fs(self, path: PathzLike):
+        "The filesystem of a cloud path matching the calling front end."
+        return path._accessor.filesys if self.sync else path._accessor.async_filesys
+
+    def set_result(self, index: int, path: PathzLike, value: Any = None, error: Optional[BaseException] = None):
+        self.results[index] = BatchResult(path, value, error)
+        self.done += 1
+        if self.callback: self.callback(self.done, len(self.items))
+
+    async def run_one(self, func: Callable, index: int, path: PathzLike, *args):
+        async with self.semaphore:
+            try: value = await func(self, path, *args)
+            except Exception as e: self.set_result(index, path, error = e)
+            else: self.set_result(index, path, value)
+
+    async def run(self, func: Callable) -> List[BatchResult]:
+        "Runs `func(batch, path)` for every path."
+        await asyncio.gather(*[self.run_one(func, i, path) for i, path in enumerate(self.items)])
+        return self.results
+
+
+def _as_paths(paths: Iterable[PathLike]) -> List[PathzLike]:
+    return [get_path(p) for p in paths]
+
+
+def _run_sync(coro_func: Callable, *args, **kwargs):
+    from fsspec.asyn import sync, get_loop
+    return sync(get_loop(), coro_func, *args, **kwargs)
+
+
+"""
+Exists / Stat
+"""
+
+async def _cloud_info(batch: _Batch, path: PathzLike) -> Optional[Dict[str, Any]]:
+    "Info of a cloud path through its metadata cache, None if missing."
+    info = path.metadata_cache.get(path._cloudstr)
+    if info is not UNSET: return info
+    try: info = await batch.fs(path)._info(path._cloudpath)
+    except FileNotFoundError: info = None
+    path.metadata_cache.set(path._cloudstr, info)
+    return info
+
+
+async def _exists(batch: _Batch, path: PathzLike) -> bool:
+    if not path.is_cloud: return await to_thread(os.path.exists, path.string)
+    return await _cloud_info(batch, path) is not None
+
+
+async def _stat(batch: _Batch, path: PathzLike):
+    if not path.is_cloud: return await to_thread(os.stat, path.string)
+    info = await _cloud_info(batch, path)
+    if info is None: raise FileNotFoundError(path._path)
+    return info
+
+
+async def async_batch_exists(paths: Iterable[PathLike], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Whether each path exists.
+    :param paths: paths to check
+    :param int max_concurrency: requests in flight at once (default 32)
+    :param callback: called with (items done, total items) as items complete
+    :return: BatchResult per path with a bool value
+    """
+    return await _Batch(_as_paths(paths), max_concurrency, callback).run(_exists)
+
+
+def batch_exists(paths: Iterable[PathLike], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Sync version of `async_batch_exists`.
+    """
+    return _run_sync(_Batch(_as_paths(paths), max_concurrency, callback, sync = True).run, _exists)
+
+
+async def async_batch_stat(paths: Iterable[PathLike], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Info of each cloud path, `os.stat` result of each local path.
+    :param paths: paths to stat
+    :param int max_concurrency: requests in flight at once (default 32)
+    :param callback: called with (items done, total items) as items complete
+    :return: BatchResult per path, FileNotFoundError for missing paths
+    """
+    return await _Batch(_as_paths(paths), max_concurrency, callback).run(_stat)
+
+
+def batch_stat(paths: Iterable[PathLike], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Sync version of `async_batch_stat`.
+    """
+    return _run_sync(_Batch(_as_paths(paths), max_concurrency, callback, sync = True).run, _stat)
+
+
+"""
+Remove
+"""
+
+async def _rm_s3(batch: _Batch, fs, bucket: str, items: List[Tuple[int, PathzLike, str]]):
+    out = await fs._call_s3('delete_objects', Bucket = bucket, Delete = {'Objects': [{'Key': key} for _, _, key in items], 'Quiet': True})
+    errors = {e['Key']: e for e in out.get('Errors', [])}
+    for index, path, key in items:
+        error = errors.get(key)
+        if error: batch.set_result(index, path, error = OSError(f"{path._path}: {error.get('Code')} {error.get('Message')}"))
+        else: batch.set_result(index, path, True)
+
+
+async def _rm_gcs_one(batch: _Batch, fs, index: int, path: PathzLike):
+    try: await fs._rm_file(path._cloudpath)
+    except FileNotFoundError: batch.set_result(index, path, True)
+    except Exception as e: batch.set_result(index, path, error = e)
+    else: batch.set_result(index, path, True)
+
+
+async def _rm_gcs(batch: _Batch, fs, bucket: str, items: List[Tuple[int, PathzLike, str]]):
+    out = await fs._rm_files([path._cloudpath for _, path, _ in items])
+    deleted = {p for p in out if isinstance(p, str)}
+    # Errors of the batch are not tied to their paths (and are reordered by
+    # its retries), so paths left over are deleted one by one for their own error.
+    failed = []
+    for index, path, _ in items:
+        if path._cloudpath in deleted: batch.set_result(index, path, True)
+        else: failed.append((index, path))
+    if failed: await asyncio.gather(*[_rm_gcs_one(batch, fs, index, path) for index, path in failed])
+
+
+async def _rm_group(batch: _Batch, fs, bucket: str, items: List[Tuple[int, PathzLike, str]], is_gcs: bool):
+    async with batch.semaphore:
+        try:
+            if is_gcs: await _rm_gcs(batch, fs, bucket, items)
+            else: await _rm_s3(batch, fs, bucket, items)
+        except Exception as e:
+            for index, path, _ in items:
+                if batch.results[index] is None: batch.set_result(index, path, error = e)
+    for _, path, _ in items: path._invalidate()
+
+
+async def _rm_local(batch: _Batch, path: PathzLike) -> bool:
+    try: await to_thread(os.remove, path.string)
+    except FileNotFoundError: pass
+    return True
+
+
+async def _rm_all(batch: _Batch) -> List[BatchResult]:
+    groups: Dict[Tuple[int, str], List[Tuple[int, PathzLike, str]]] = {}
+    filesystems: Dict[int, Any] = {}
+    tasks = []
+    for index, path in enumerate(batch.items):
+        if not path.is_cloud:
+            tasks.append(batch.run_one(_rm_local, index, path))
+            continue
+        fs = batch.fs(path)
+        bucket, key, _ = fs.split_path(path._cloudpath)
+        filesystems[id(fs)] = fs
+        groups.setdefault((id(fs), bucket), []).append((index, path, key))
+    for (fs_id, bucket), items in groups.items():
+        fs = filesystems[fs_id]
+        is_gcs = _is_gcs(fs)
+        limit = _GCS_BATCH_LIMIT if is_gcs else _S3_DELETE_LIMIT
+        for i in range(0, len(items), limit):
+            tasks.append(_rm_group(batch, fs, bucket, items[i:i + limit], is_gcs))
+    await asyncio.gather(*tasks)
+    return batch.results
+
+
+async def async_batch_rm(paths: Iterable[PathLike], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Removes each file.
+    Cloud objects are removed with one request per bucket and chunk: S3 /
+    MinIO DeleteObjects of up to 1000 keys, GCS batch requests of up to 100.
+    Missing files count as removed on every provider, as S3 DeleteObjects
+    does not report them.
+    :param paths: files to remove
+    :param int max_concurrency: requests in flight at once (default 32)
+    :param callback: called with (items done, total items) as items complete
+    :return: BatchResult per path with True for removed or missing files
+    """
+    return await _rm_all(_Batch(_as_paths(paths), max_concurrency, callback))
+
+
+def batch_rm(paths: Iterable[PathLike], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Sync version of `async_batch_rm`.
+    """
+    return _run_sync(_rm_all, _Batch(_as_paths(paths), max_concurrency, callback, sync = True))
+
+
+"""
+Copy / Read
+"""
+
+async def _copy(batch: _Batch, src: PathzLike, dst: PathzLike) -> PathzLike:
+    if src.is_cloud and dst.is_cloud: await async_cloud_copy(batch.fs(src), src._cloudpath, batch.fs(dst), dst._cloudpath)
+    elif src.is_cloud: await batch.fs(src)._get_file(src._cloudpath, dst.string)
+    elif dst.is_cloud: await batch.fs(dst)._put_file(src.string, dst._cloudpath)
+    else: await to_thread(shutil.copyfile, src.string, dst.string)
+    if dst.is_cloud: dst._invalidate()
+    return dst
+
+
+async def _read(batch: _Batch, path: PathzLike) -> bytes:
+    if not path.is_cloud: return await to_thread(path.read_bytes)
+    return await batch.fs(path)._cat_file(path._cloudpath)
+
+
+async def _copy_all(batch: _Batch) -> List[BatchResult]:
+    await asyncio.gather(*[batch.run_one(_copy, i, src, dst) for i, (src, dst) in enumerate(batch.items)])
+    return batch.results
+
+
+def _as_pairs(pairs: Iterable[Tuple[PathLike, PathLike]]) -> List[Tuple[PathzLike, PathzLike]]:
+    return [(get_path(src), get_path(dst)) for src, dst in pairs]
+
+
+async def async_batch_copy(pairs: Iterable[Tuple[PathLike, PathLike]], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Copies each `src` file to its `dst` file, between any mix of local and
+    cloud paths. Cloud to cloud copies are server-side within a provider.
+    :param pairs: (src, dst) pairs
+    :param int max_concurrency: copies in flight at once (default 32)
+    :param callback: called with (items done, total items) as items complete
+    :return: BatchResult per pair, keyed by `src`, with `dst` as value
+    """
+    return await _copy_all(_Batch(_as_pairs(pairs), max_concurrency, callback))
+
+
+def batch_copy(pairs: Iterable[Tuple[PathLike, PathLike]], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Sync version of `async_batch_copy`.
+    """
+    return _run_sync(_copy_all, _Batch(_as_pairs(pairs), max_concurrency, callback, sync = True))
+
+
+async def async_batch_read(paths: Iterable[PathLike], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Reads the bytes of each file.
+    :param paths: files to read
+    :param int max_concurrency: reads in flight at once (default 32)
+    :param callback: called with (items done, total items) as items complete
+    :return: BatchResult per path with the file contents
+    """
+    return await _Batch(_as_paths(paths), max_concurrency, callback).run(_read)
+
+
+def batch_read(paths: Iterable[PathLike], max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None) -> List[BatchResult]:
+    """
+    Sync version of `async_batch_read`.
+    """
+    return _run_sync(_Batch(_as_paths(paths), max_concurrency, callback, sync = True).run, _read)
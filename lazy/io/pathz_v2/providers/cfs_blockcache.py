@@ -0,0 +1,178 @@
+"""
+Read-through block cache of cloud objects, stored in `lazy.io.cachez`.
+
+Disabled unless `PathzCFSPath.enable_block_cache()` is called. Once enabled,
+files opened for reading by `open`, `async_open`, `reader`, `async_reader`
+(and so `read_bytes`, `read_text`, ...) read the object in fixed size blocks:
+a block is served from the cache when present, otherwise it is fetched with
+a ranged GET and stored. Partial reads only fetch the blocks they touch.
+
+Blocks are keyed by the generation / ETag of the object, taken from fresh
+info of the path when it is opened, so a rewritten object is never served
+from the blocks of its previous version; those are evicted when a new
+version is seen. Ranged reads are pinned to that version (GCS `generation`,
+S3 `VersionId` or `IfMatch` on the ETag), so a file never mixes bytes of two
+versions: if the object is rewritten while it is read, the read raises
+`ObjectChangedError` and nothing is cached. Objects of other providers, or
+without a version, are read in blocks without caching them.
+
+The cache is a cachez directory bounded by `size_limit` with
+least-recently-used eviction. Processes on a node that use the same
+directory share it.
+"""
+
+import io
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from .cfs_transfer import ObjectChangedError, _remote_tag, _versioned_reader
+
+__all__ = ('BlockCache', 'CachedBlockFile', 'ObjectChangedError', 'DEFAULT_BLOCK_SIZE')
+
+MiB = 1024 * 1024
+DEFAULT_BLOCK_SIZE = 4 * MiB
+DEFAULT_SIZE_LIMIT = 10 * 1024 * MiB
+
+
+class BlockCache:
+    "Blocks of cloud objects stored in a cachez Cache."
+
+    def __init__(self, directory: str = None, size_limit: int = DEFAULT_SIZE_LIMIT, block_size: int = DEFAULT_BLOCK_SIZE, **settings):
+        """Initialize block cache.
+        :param str directory: cache directory, shared by processes using the same one (default ~/.lazy/cache/pathz_blocks)
+        :param int size_limit: max bytes of cached blocks (default 10 GiB)
+        :param int block_size: bytes per block (default 4 MiB)
+        :param settings: other cachez Cache settings
+        """
+        from lazy.io.cachez import Cache
+        if directory is None: directory = os.path.join(os.path.expanduser('~'), '.lazy', 'cache', 'pathz_blocks')
+        self.block_size = block_size
+        self.cache = Cache(directory, size_limit = size_limit, eviction_policy = 'least-recently-used', **settings)
+
+    def validate(self, uri: str, tag: Optional[str]):
+        """Drops the blocks of `uri` cached for another version than `tag`.
+        :param str uri: cloud URI of the object
+        :param str tag: generation / ETag of the current version
+        """
+        key = ('version', uri)
+        seen = self.cache.get(key)
+        if seen == tag: return
+        if seen is not None: self.cache.evict_prefix(('block', uri))
+        self.cache.set(key, tag)
+
+    def get_block(self, uri: str, tag: str, index: int) -> Optional[bytes]:
+        return self.cache.get(('block', uri, tag, self.block_size, index))
+
+    def set_block(self, uri: str, tag: str, index: int, data: bytes):
+        self.cache.set(('block', uri, tag, self.block_size, index), data)
+
+    def invalidate(self, uri: str):
+        "Drops every block of `uri`."
+        self.cache.evict_prefix(('block', uri))
+        self.cache.delete(('version', uri))
+
+    def clear(self):
+        "Drops every block."
+        self.cache.clear()
+
+    def close(self):
+        self.cache.close()
+
+    def open(self, fs, rpath: str, uri: str, info: dict, mode: str = 'rb', encoding: Optional[str] = None, errors: Optional[str] = None, newline: Optional[str] = None):
+        """Returns a file reading `rpath` through the cache.
+        :param fs: sync fsspec filesystem of `rpath`
+        :param str rpath: remote path without uri scheme
+        :param str uri: cloud URI used in the keys
+        :param dict info: info of the object, for its size and version
+        :param str mode: 'rb' or 'r'
+        """
+        raw = CachedBlockFile(self, fs, rpath, uri, info)
+        if raw.cached: self.validate(uri, raw.tag)
+        buffered = io.BufferedReader(raw, buffer_size = self.block_size)
+        if 'b' in mode: return buffered
+        return io.TextIOWrapper(buffered, encoding = encoding, errors = errors, newline = newline)
+
+    def __repr__(self):
+        return f'BlockCache(directory={self.cache.directory!r}, block_size={self.block_size})'
+
+
+class CachedBlockFile(io.RawIOBase):
+    "Read-only file of a cloud object, read block by block through a `BlockCache`."
+
+    def __init__(self, cache: BlockCache, fs, rpath: str, uri: str, info: Dict[str, Any]):
+        self._cache = cache
+        self._fs = fs
+        self._rpath = rpath
+        self._uri = uri
+        self._info = info
+        self._size = info['size']
+        self._reader = _versioned_reader(fs, info)
+        self.tag = _remote_tag(info)
+        self._pos = 0
+        # Last block read, small reads within it don't go back to the cache.
+        self._last: Tuple[int, bytes] = (-1, b'')
+        self.name = uri
+        self.mode = 'rb'
+
+    @property
+    def cached(self) -> bool:
+        "True if blocks are cached, which needs reads pinned to the version of the object."
+        return self._reader is not None and self.tag is not None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET: pos = offset
+        elif whence == io.SEEK_CUR: pos = self._pos + offset
+        elif whence == io.SEEK_END: pos = self._size + offset
+        else: raise ValueError(f'invalid whence ({whence})')
+        if pos < 0: raise ValueError(f'negative seek position {pos}')
+        self._pos = pos
+        return pos
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        if self._reader is None: return self._fs.cat_file(self._rpath, start = start, end = end)
+        from fsspec.asyn import sync
+        return sync(self._fs.loop, self._reader, self._fs, self._rpath, start, end, self._info)
+
+    def _block(self, index: int) -> bytes:
+        if self._last[0] == index: return self._last[1]
+        data = self._cache.get_block(self._uri, self.tag, index) if self.cached else None
+        if data is None:
+            start = index * self._cache.block_size
+            end = min(start + self._cache.block_size, self._size)
+            # raises ObjectChangedError, so a block of another version is never stored
+            data = self._fetch(start, end)
+            if self.cached: self._cache.set_block(self._uri, self.tag, index, data)
+        self._last = (index, data)
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        if self.closed: raise ValueError('I/O operation on closed file')
+        if self._pos >= self._size: return 0
+        index, start = divmod(self._pos, self._cache.block_size)
+        chunk = self._block(index)[start:start + len(buffer)]
+        n = len(chunk)
+        buffer[:n] = chunk
+        self._pos += n
+        return n
+
+    def readall(self) -> bytes:
+        chunks = []
+        while self._pos < self._size:
+            index, start = divmod(self._pos, self._cache.block_size)
+            chunk = self._block(index)[start:]
+            if not chunk: break
+            chunks.append(chunk)
+            self._pos += len(chunk)
+        return b''.join(chunks)
+
+    def __repr__(self):
+        return f'CachedBlockFile({self._uri!r}, size={self._size})'
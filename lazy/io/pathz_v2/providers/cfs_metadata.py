@@ -0,0 +1,191 @@
+"""
+Object metadata cache shared by every PathzCFSPath.
+
+Each `info()` of a cloud path is a HEAD / GET request, and the metadata
+properties (`etag`, `file_size`, `content_type`, ...) or `exists`, `is_file`
+and `is_dir` each call it again. The results are kept here for `ttl` seconds,
+keyed by the cloud URI, so repeated lookups of one object cost one request.
+
+Writes, deletes and renames made through this library invalidate the
+affected entries. While a file is open for writing its path, and its
+parents, are not cached, and they are invalidated again once it is closed
+and the object committed. Changes made by other clients are seen once the
+entry expires, or after `path.refresh()`.
+"""
+
+import time
+import weakref
+import threading
+import contextlib
+import contextvars
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Union
+
+__all__ = ('MetadataCache', 'metadata_cache', 'UNSET')
+
+# Marks a lookup that is not cached, `None` is a cached missing path.
+UNSET = object()
+
+_disabled: contextvars.ContextVar = contextvars.ContextVar('pathz_metadata_cache_disabled', default = False)
+
+
+class MetadataCache:
+    "TTL bounded cache of `info()` results keyed by cloud URI."
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 4096, enabled: bool = True):
+        """Initialize metadata cache.
+        :param float ttl: seconds an entry is valid for (default 30)
+        :param int maxsize: maximum number of entries, the oldest are dropped first (default 4096)
+        :param bool enabled: whether lookups are cached (default True)
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        # paths with files open for writing, and how many
+        self._writers: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        "True if lookups of the calling thread or task are cached."
+        return self._enabled and self.ttl > 0 and not _disabled.get()
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+        if not value: self.clear()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return path.rstrip('/')
+
+    def get(self, path: str) -> Union[Optional[Dict[str, Any]], object]:
+        """Return the cached info of `path`.
+        :param str path: cloud URI
+        :return: info dict, None if the path is cached as missing, or
+            `UNSET` if there is no valid entry
+        """
+        if not self.enabled: return UNSET
+        key = self._key(path)
+        with self._lock:
+            if self._writers and self._writing(key): return UNSET
+            entry = self._entries.get(key)
+            if entry is None: return UNSET
+            expire_time, info = entry
+            if expire_time < time.monotonic():
+                del self._entries[key]
+                return UNSET
+            return info
+
+    def set(self, path: str, info: Optional[Dict[str, Any]]):
+        """Cache the info of `path`.
+        :param str path: cloud URI
+        :param info: info dict, or None if the path does not exist
+        """
+        if not self.enabled: return
+        key = self._key(path)
+        with self._lock:
+            if self._writers and self._writing(key): return
+            self._entries[key] = (time.monotonic() + self.ttl, info)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last = False)
+
+    def invalidate(self, path: str, recursive: bool = False):
+        """Drop the entries of `path` and of its parent directories.
+        Parents are dropped as well since creating or removing an object
+        changes whether its prefix exists.
+        :param str path: cloud URI
+        :param bool recursive: also drop the entries below `path` (default False)
+        """
+        key = self._key(path)
+        scheme, sep, rest = key.partition('://')
+        if not sep: scheme, rest = '', key
+        parts = rest.split('/')
+        with self._lock:
+            if not self._entries: return
+            for i in range(len(parts), 0, -1):
+                self._entries.pop(scheme + sep + '/'.join(parts[:i]), None)
+            if recursive:
+                prefix = key + '/'
+                for child in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[child]
+
+    def _writing(self, key: str) -> bool:
+        "True if `key`, or a path below it, is open for writing. Called with the lock held."
+        prefix = key + '/'
+        return any(path == key or path.startswith(prefix) for path in self._writers)
+
+    def track_write(self, path: str, file: Any) -> '_WriteFile':
+        """Keep `path` uncached while `file` is open for writing.
+        :param str path: cloud URI
+        :param file: file opened for writing
+        :return: file proxy invalidating `path` when it is closed
+        """
+        key = self._key(path)
+        with self._lock:
+            self._writers[key] = self._writers.get(key, 0) + 1
+        self.invalidate(path)
+        return _WriteFile(file, lambda: self._end_write(path))
+
+    def _end_write(self, path: str):
+        key = self._key(path)
+        with self._lock:
+            count = self._writers.get(key, 0) - 1
+            if count > 0: self._writers[key] = count
+            else: self._writers.pop(key, None)
+        self.invalidate(path)
+
+    def clear(self):
+        "Drop every entry."
+        with self._lock:
+            self._entries.clear()
+
+    @contextlib.contextmanager
+    def disabled(self):
+        """Context manager bypassing the cache in the calling thread or task.
+        >>> with PathzCFSPath.metadata_cache.disabled():
+        ...     size = path.file_size
+        """
+        token = _disabled.set(True)
+        try:
+            yield self
+        finally:
+            _disabled.reset(token)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f'MetadataCache(ttl={self.ttl}, maxsize={self.maxsize}, enabled={self._enabled}, entries={len(self)})'
+
+
+class _WriteFile:
+    "Proxy of a file open for writing, runs `on_close` once it is closed or collected."
+
+    def __init__(self, file: Any, on_close: Callable[[], None]):
+        self._file = file
+        self._finalizer = weakref.finalize(self, on_close)
+
+    def close(self):
+        try: self._file.close()
+        finally: self._finalizer()
+
+    def __getattr__(self, name: str):
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return repr(self._file)
+
+
+metadata_cache = MetadataCache()
@@ -15,6 +15,9 @@ if TYPE_CHECKING:
     CloudAuthz: object = None
 
 from .cfs_base import get_accessor, get_cloud_filesystem, AccessorLike, CFSLike
+from .cfs_metadata import MetadataCache, metadata_cache, UNSET
+from .cfs_blockcache import BlockCache, DEFAULT_BLOCK_SIZE, DEFAULT_SIZE_LIMIT
+from .cfs_transfer import upload_file, async_upload_file, download_file, async_download_file, cloud_copy, async_cloud_copy
 
 class PathzCFSPurePath(PurePath):
     _prefix: str = None
@@ -67,6 +70,10 @@ class PathzCFSPath(Path, PathzCFSPurePath):
     _provider = None
     _win_pathz: ClassVar = 'PathzCFSWindowsPath'
     _posix_pathz: ClassVar = 'PathzCFSPosixPath'
+    # shared by every cloud path, see `cfs_metadata.MetadataCache`
+    metadata_cache: ClassVar[MetadataCache] = metadata_cache
+    # opt-in, see `enable_block_cache`
+    block_cache: ClassVar[Optional[BlockCache]] = None
 
     def _init(self, template: Optional['PathzCFSPath'] = None):
         self._accessor: AccessorLike = get_accessor(self._prefix)
@@ -186,7 +193,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Return info of path
         """
-        return self._accessor.info(path=self._path)
+        return self.info()
 
     @property
     def metadata_(self):
@@ -200,7 +207,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Return info of path
         """
-        return self._accessor.info(path=self._cloudpath)
+        return self.info()
     
 
     @property
@@ -208,7 +215,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Size in bytes of file
         """
-        if self.is_file_: return self._accessor.size(self._cloudpath)
+        if self.is_file_: return self.info().get('size')
         return None
     
     @property
@@ -216,7 +223,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Return the last modified timestamp of file at path as a datetime
         """
-        r = self.stat_ #self._accessor.modified(self._cloudpath)
+        r = self.info_ #self._accessor.modified(self._cloudpath)
         ts = r.get('updated', '')
         if ts: return datetime.datetime.strptime(ts, '%Y-%m-%dT%H:%M:%S.%fZ')
         return None
@@ -322,7 +329,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Size in bytes of file
         """
-        if await self.async_is_file_: return await self._accessor.async_size(self._cloudpath)
+        if await self.async_is_file_: return (await self.async_info()).get('size')
         return None
     
     @property
@@ -356,7 +363,8 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Open the file pointed by this path and return a file object, as
         the built-in open() function does.
         """
-        return self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, newline=newline)
+        if self._use_block_cache(mode, compression): return self._open_cached(mode, encoding=encoding, errors=errors, newline=newline)
+        return self._track_write(mode, self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, newline=newline, block_size=block_size))
 
     
     def async_open(self, mode: FileMode = 'r', buffering: int = -1, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE, block_size: int = 5242880, compression: str = None, **kwargs: Any) -> IterableAIOFile:
@@ -368,7 +376,8 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         #self._fileio = self._accessor.open(self._cloudpath, mode=mode, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, buffering=buffering, **kwargs)
         #print(type(self._fileio))
         #return get_cloud_file(self._fileio)
-        return get_cloud_file(self._accessor.open(self._cloudpath, mode=mode, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, buffering=buffering, **kwargs))
+        if self._use_block_cache(mode, compression): return get_cloud_file(self._open_cached(mode, encoding=encoding, errors=errors, newline=newline))
+        return get_cloud_file(self._track_write(mode, self._accessor.open(self._cloudpath, mode=mode, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, buffering=buffering, **kwargs)))
 
 
     def reader(self, mode: FileMode = 'r', buffering: int = -1, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE, block_size: int = 5242880, compression: str = None, **kwargs: Any) -> IO[Union[str, bytes]]:
@@ -376,6 +385,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Open the file pointed by this path and return a file object, as
         the built-in open() function does.
         """
+        if self._use_block_cache(mode, compression): return self._open_cached(mode, encoding=encoding, errors=errors, newline=newline)
         return self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs)
     
     def async_reader(self, mode: FileMode = 'r', buffering: int = -1, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE, block_size: int = 5242880, compression: str = None, **kwargs: Any) -> IterableAIOFile:
@@ -383,6 +393,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Asyncronously Open the file pointed by this path and return a file object, as
         the built-in open() function does.
         """
+        if self._use_block_cache(mode, compression): return get_cloud_file(self._open_cached(mode, encoding=encoding, errors=errors, newline=newline))
         return get_cloud_file(self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs))
     
     def appender(self, mode: FileMode = 'a', buffering: int = -1, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE, block_size: int = 5242880, compression: str = None, **kwargs: Any) -> IO[Union[str, bytes]]:
@@ -390,14 +401,14 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Open the file pointed by this path and return a file object, as
         the built-in open() function does.
         """
-        return self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs)
+        return self._track_write(mode, self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs))
     
     def async_appender(self, mode: FileMode = 'a', buffering: int = -1, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE, block_size: int = 5242880, compression: str = None, **kwargs: Any) -> IterableAIOFile:
         """
         Asyncronously Open the file pointed by this path and return a file object, as
         the built-in open() function does.
         """
-        return get_cloud_file(self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs))
+        return get_cloud_file(self._track_write(mode, self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs)))
     
     def writer(self, mode: FileMode = 'w', buffering: int = -1, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE, block_size: int = 5242880, compression: str = None, **kwargs: Any) -> IO[Union[str, bytes]]:
         """
@@ -405,7 +416,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         the built-in open() function does.
         """
         #self.touch()
-        return self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs)
+        return self._track_write(mode, self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs))
     
     def async_writer(self, mode: FileMode = 'w', buffering: int = -1, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE, block_size: int = 5242880, compression: str = None, **kwargs: Any) -> IterableAIOFile:
         """
@@ -413,7 +424,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         the built-in open() function does.
         """
         #self.touch()
-        return get_cloud_file(self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs))
+        return get_cloud_file(self._track_write(mode, self._accessor.open(self._cloudpath, mode=mode, buffering=buffering, encoding=encoding, errors=errors, block_size=block_size, compression=compression, newline=newline, **kwargs)))
 
     def read_text(self, encoding: str | None = DEFAULT_ENCODING, errors: str | None = ON_ERRORS) -> str:
         with self.open('r', encoding=encoding, errors=errors) as file:
@@ -438,7 +449,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         # type-check for the buffer interface before truncating the file
         view = memoryview(data)
         with self.open(mode='wb') as f:
-            return f.write(data)
+            n = f.write(data)
+        self._invalidate()
+        return n
 
     async def async_write_bytes(self, data: bytes) -> int:
         """
@@ -447,7 +460,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         # type-check for the buffer interface before truncating the file
         view = memoryview(data)
         async with self.async_open(mode='wb') as f:
-            return await f.write(data)
+            n = await f.write(data)
+        self._invalidate()
+        return n
 
     def append_text(self, data: str, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE) -> int:
         """
@@ -457,7 +472,8 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         with self.open(mode='a', encoding=encoding, errors=errors, newline=newline) as f:
             n = f.write(data)
             n += f.write(newline)
-            return n
+        self._invalidate()
+        return n
 
     async def async_append_text(self, data: str, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE) -> int:
         """
@@ -467,7 +483,8 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         async with self.async_open(mode='a', encoding=encoding, errors=errors, newline=newline) as f:
             n = await f.write(data)
             n += await f.write(newline)
-            return n
+        self._invalidate()
+        return n
 
     def write_text(self, data: str, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE) -> int:
         """
@@ -475,7 +492,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         if not isinstance(data, str): raise TypeError(f'data must be str, not {type(data).__name__}')
         with self.open(mode='w', encoding=encoding, errors=errors, newline=newline) as f:
-            return f.write(data)
+            n = f.write(data)
+        self._invalidate()
+        return n
 
     async def async_write_text(self, data: str, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE) -> int:
         """
@@ -483,7 +502,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         if not isinstance(data, str): raise TypeError(f'data must be str, not {type(data).__name__}')
         async with self.async_open(mode='w', encoding=encoding, errors=errors, newline=newline) as f:
-            return await f.write(data)
+            n = await f.write(data)
+        self._invalidate()
+        return n
 
 
     def touch(self, truncate: bool = True, data = None, exist_ok: bool = True, **kwargs):
@@ -501,6 +522,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
             with self.open('wb') as f:
                 f.write(b'')
                 f.flush()
+        self._invalidate()
 
 
     async def async_touch(self, truncate: bool = True, data = None, exist_ok: bool = True, **kwargs):
@@ -513,11 +535,13 @@ class PathzCFSPath(Path, PathzCFSPurePath):
             except OSError: pass
             else: return
         await self._accessor.async_touch(self._cloudpath, truncate = truncate, data = data, **kwargs)
+        self._invalidate()
 
     def mkdir(self, mode: int = 0o777, parents: bool = True, exist_ok: bool = True):
         """
         Create a new directory at this given path.
         """
+        self._invalidate()
         try: self._accessor.mkdir(self._cloudpath, parents = parents, exist_ok = exist_ok)
 
         except FileNotFoundError:
@@ -534,6 +558,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Create a new directory at this given path.
         """
+        self._invalidate()
         try: await self._accessor.async_mkdir(self._cloudpath, create_parents = parents, exist_ok = exist_ok)
 
         except FileNotFoundError:
@@ -550,6 +575,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Create a new directory at this given path.
         """
+        self._invalidate()
         try: await self._accessor.async_makedirs(self._cloudpath, exist_ok = exist_ok)
 
         except FileNotFoundError:
@@ -596,6 +622,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         try: self._accessor.unlink(self._cloudpath)
         except FileNotFoundError:
             if not missing_ok: raise
+        finally: self._invalidate()
 
     async def async_unlink(self, missing_ok: bool = False):
         """
@@ -605,6 +632,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         try: await self._accessor.async_unlink(self._cloudpath, missing_ok = missing_ok)
         except FileNotFoundError:
             if not missing_ok: raise
+        finally: self._invalidate()
 
     def rm(self, recursive: bool = False, maxdepth: int = None, missing_ok: bool = False):
         """
@@ -614,6 +642,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         try: self._accessor.rm(self._path, recursive, maxdepth)
         except:
             if not missing_ok: raise
+        finally: self._invalidate(recursive = recursive)
     
 
     async def async_rm(self, recursive: bool = False, maxdepth: int = None, missing_ok: bool = False):
@@ -624,6 +653,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         try: self._accessor.async_rm(self._path, recursive, maxdepth)
         except:
             if not missing_ok: raise
+        finally: self._invalidate(recursive = recursive)
 
     def rm_file(self, missing_ok: bool = True):
         """
@@ -636,6 +666,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         except Exception as e:
             if missing_ok: return False
             raise e from e
+        finally: self._invalidate()
 
 
     async def async_rm_file(self, missing_ok: bool = True):
@@ -649,6 +680,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         except Exception as e:
             if missing_ok: return False
             raise e from e
+        finally: self._invalidate()
 
 
 
@@ -660,6 +692,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         try: await self._accessor.async_unlink(self._cloudpath, missing_ok = missing_ok)
         except FileNotFoundError:
             if not missing_ok: raise
+        finally: self._invalidate()
 
     def rmdir(self, force: bool = False, recursive: bool = True, skip_errors: bool = True):
         """
@@ -671,6 +704,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
             if force: return self._accessor.rmdir(self._cloudpath, recursive = recursive)
             if skip_errors: return
             raise e
+        finally: self._invalidate(recursive = True)
 
 
     async def async_rmdir(self, force: bool = False, recursive: bool = True, skip_errors: bool = True):
@@ -683,6 +717,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
             if force: return await self._accessor.async_rmdir(self._cloudpath, recursive = recursive)
             if skip_errors: return
             raise e
+        finally: self._invalidate(recursive = True)
 
     def link_to(self, target: str):
         """
@@ -705,7 +740,10 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Returns the new Path instance pointing to the target path.
         """
         self._accessor.rename(self._cloudpath, target)
-        return type(self)(target)
+        self._invalidate(recursive = True)
+        target = type(self)(target)
+        target._invalidate(recursive = True)
+        return target
     
     async def async_rename(self, target: Union[str, Type['PathzCFSPath']]) -> Type['PathzCFSPath']:
         """
@@ -716,7 +754,10 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Returns the new Path instance pointing to the target path.
         """
         await self._accessor.async_rename(self._cloudpath, target)
-        return type(self)(target)
+        self._invalidate(recursive = True)
+        target = type(self)(target)
+        target._invalidate(recursive = True)
+        return target
 
     def replace(self, target: str) -> Type['PathzCFSPath']:
         """
@@ -727,7 +768,10 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Returns the new Path instance pointing to the target path.
         """
         self._accessor.replace(self._cloudpath, target)
-        return type(self)(target)
+        self._invalidate(recursive = True)
+        target = type(self)(target)
+        target._invalidate(recursive = True)
+        return target
     
     async def async_replace(self, target: str) -> Type['PathzCFSPath']:
         """
@@ -738,7 +782,10 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Returns the new Path instance pointing to the target path.
         """
         await self._accessor.async_replace(self._cloudpath, target)
-        return type(self)(target)
+        self._invalidate(recursive = True)
+        target = type(self)(target)
+        target._invalidate(recursive = True)
+        return target
 
     def symlink_to(self, target: str, target_is_directory: bool = False):
         """
@@ -758,14 +805,18 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Whether this path exists.
         """
-        return self._accessor.exists(self._cloudpath)
+        if not self.metadata_cache.enabled: return self._accessor.exists(self._cloudpath)
+        try: return self._get_info() is not None
+        except Exception: return False
         
 
     async def async_exists(self) -> bool:
         """
         Whether this path exists.
         """
-        return await self._accessor.async_exists(self._cloudpath)
+        if not self.metadata_cache.enabled: return await self._accessor.async_exists(self._cloudpath)
+        try: return await self._async_get_info() is not None
+        except Exception: return False
 
     @classmethod
     def cwd(cls: type) -> str:
@@ -963,7 +1014,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         (counterpart to cat)
         """
         if not isinstance(value, bytes): value = value.encode('UTF-8')
-        return self._accessor.pipe(self._cloudstr, value = value, **kwargs)
+        rez = self._accessor.pipe(self._cloudstr, value = value, **kwargs)
+        self._invalidate()
+        return rez
 
     async def async_pipe(self, value: Union[bytes, str], **kwargs):
         """
@@ -972,7 +1025,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         (counterpart to cat)
         """
         if not isinstance(value, bytes): value = value.encode('UTF-8')
-        return await self._accessor.async_pipe(self._cloudstr, value = value, **kwargs)
+        rez = await self._accessor.async_pipe(self._cloudstr, value = value, **kwargs)
+        self._invalidate()
+        return rez
 
     def pipe_file(self, value: Union[bytes, str], **kwargs):
         """
@@ -981,7 +1036,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         (counterpart to cat)
         """
         if not isinstance(value, bytes): value = value.encode('UTF-8')
-        return self._accessor.pipe_file(self._cloudstr, value = value, **kwargs)
+        rez = self._accessor.pipe_file(self._cloudstr, value = value, **kwargs)
+        self._invalidate()
+        return rez
 
     async def async_pipe_file(self, value: Union[bytes, str], **kwargs):
         """
@@ -990,7 +1047,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         (counterpart to cat)
         """
         if not isinstance(value, bytes): value = value.encode('UTF-8')
-        return await self._accessor.async_pipe_file(self._cloudstr, value = value, **kwargs)
+        rez = await self._accessor.async_pipe_file(self._cloudstr, value = value, **kwargs)
+        self._invalidate()
+        return rez
 
 
     def absolute(self) -> Type['PathzCFSPath']:
@@ -1063,14 +1122,121 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         #_info = runnify(self._accessor.async_info)(self._cloudpath)
         #return _info#.result()
         #return self._accessor.info(self._cloudpath)
-        return self._accessor.info(self._cloudpath)
+        if not self.metadata_cache.enabled: return self._accessor.info(self._cloudpath)
+        info = self._get_info()
+        if info is None: raise FileNotFoundError(self._path)
+        return info
     
     async def async_info(self):
         """
         Return the result of the info() system call on this path, like
         os.stat() does.
         """
-        return await self._accessor.async_info(self._cloudpath)
+        if not self.metadata_cache.enabled: return await self._accessor.async_info(self._cloudpath)
+        info = await self._async_get_info()
+        if info is None: raise FileNotFoundError(self._path)
+        return info
+
+    """
+    Metadata Cache
+    """
+    def _get_info(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the info of path from the metadata cache, fetching it on a miss.
+        None if the path does not exist.
+        """
+        info = self.metadata_cache.get(self._cloudstr)
+        if info is not UNSET: return info
+        try: info = self._accessor.info(self._cloudpath)
+        except FileNotFoundError: info = None
+        self.metadata_cache.set(self._cloudstr, info)
+        return info
+
+    async def _async_get_info(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the info of path from the metadata cache, fetching it on a miss.
+        None if the path does not exist.
+        """
+        info = self.metadata_cache.get(self._cloudstr)
+        if info is not UNSET: return info
+        try: info = await self._accessor.async_info(self._cloudpath)
+        except FileNotFoundError: info = None
+        self.metadata_cache.set(self._cloudstr, info)
+        return info
+
+    def _invalidate(self, recursive: bool = False):
+        """
+        Drops the cached metadata of path and its parents, and of everything
+        below it if recursive.
+        """
+        self.metadata_cache.invalidate(self._cloudstr, recursive = recursive)
+
+    def _track_write(self, mode: str, file: Any) -> Any:
+        """
+        Keeps the metadata of path uncached while `file` is open for writing,
+        and drops it again once the file is closed and committed.
+        """
+        if 'r' in mode and '+' not in mode: return file
+        return self.metadata_cache.track_write(self._cloudstr, file)
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """
+        Drops the cached metadata of path and fetches it again.
+        Returns the info of path, None if it does not exist.
+        """
+        self._invalidate()
+        if not self.metadata_cache.enabled:
+            try: return self._accessor.info(self._cloudpath)
+            except FileNotFoundError: return None
+        return self._get_info()
+
+    async def async_refresh(self) -> Optional[Dict[str, Any]]:
+        """
+        Drops the cached metadata of path and fetches it again.
+        Returns the info of path, None if it does not exist.
+        """
+        self._invalidate()
+        if not self.metadata_cache.enabled:
+            try: return await self._accessor.async_info(self._cloudpath)
+            except FileNotFoundError: return None
+        return await self._async_get_info()
+
+    """
+    Block Cache
+    """
+    @classmethod
+    def enable_block_cache(cls, directory: Optional[str] = None, size_limit: int = DEFAULT_SIZE_LIMIT, block_size: int = DEFAULT_BLOCK_SIZE, **settings) -> BlockCache:
+        """
+        Reads files opened for reading through a local disk cache of their blocks,
+        shared by every cloud path and by processes using the same directory.
+        See `cfs_blockcache.BlockCache`.
+        """
+        if PathzCFSPath.block_cache is not None: PathzCFSPath.block_cache.close()
+        PathzCFSPath.block_cache = BlockCache(directory = directory, size_limit = size_limit, block_size = block_size, **settings)
+        return PathzCFSPath.block_cache
+
+    @classmethod
+    def disable_block_cache(cls, clear: bool = False):
+        """
+        Stops reading through the block cache, dropping its blocks if clear.
+        """
+        if PathzCFSPath.block_cache is None: return
+        if clear: PathzCFSPath.block_cache.clear()
+        PathzCFSPath.block_cache.close()
+        PathzCFSPath.block_cache = None
+
+    def _use_block_cache(self, mode: str, compression: Optional[str] = None) -> bool:
+        return self.block_cache is not None and 'r' in mode and '+' not in mode and not compression
+
+    def _open_cached(self, mode: str, encoding: Optional[str] = DEFAULT_ENCODING, errors: Optional[str] = ON_ERRORS, newline: Optional[str] = NEWLINE) -> IO[Union[str, bytes]]:
+        """
+        Opens path for reading through the block cache, the version of the
+        blocks is checked against fresh info of path.
+        """
+        info = self.refresh()
+        if info is None: raise FileNotFoundError(self._path)
+        if info.get('type') == 'directory': raise IsADirectoryError(self._path)
+        return self.block_cache.open(self._accessor.filesys, self._cloudpath, self._cloudstr, info, mode = mode, encoding = encoding, errors = errors, newline = newline)
 
     def lstat(self) -> stat_result:
         """
@@ -1114,14 +1280,20 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         """
         Whether this path is a directory.
         """
-        return self._accessor.is_dir(self._cloudpath)
+        if not self.metadata_cache.enabled: return self._accessor.is_dir(self._cloudpath)
+        try: info = self._get_info()
+        except OSError: return False
+        return info is not None and info.get('type') == 'directory'
 
     
     async def async_is_dir(self) -> bool:
         """
         Whether this path is a directory.
         """
-        return await self._accessor.async_is_dir(self._cloudpath)
+        if not self.metadata_cache.enabled: return await self._accessor.async_is_dir(self._cloudpath)
+        try: info = await self._async_get_info()
+        except OSError: return False
+        return info is not None and info.get('type') == 'directory'
 
     def is_symlink(self) -> bool:
         """
@@ -1141,14 +1313,20 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         Whether this path is a regular file (also True for symlinks pointing
         to regular files).
         """
-        return self._accessor.is_file(self._cloudpath)
+        if not self.metadata_cache.enabled: return self._accessor.is_file(self._cloudpath)
+        try: info = self._get_info()
+        except Exception: return False
+        return info is not None and info.get('type') == 'file'
     
     async def async_is_file(self) -> bool:
         """
         Whether this path is a regular file (also True for symlinks pointing
         to regular files).
         """
-        return await self._accessor.async_is_file(self._cloudpath)
+        if not self.metadata_cache.enabled: return await self._accessor.async_is_file(self._cloudpath)
+        try: info = await self._async_get_info()
+        except Exception: return False
+        return info is not None and info.get('type') == 'file'
     
     @staticmethod
     def _get_pathlike(path: PathLike):
@@ -1168,7 +1346,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         if dest.exists() and not overwrite and dest.is_file():
             if skip_errors: return dest
             raise Exception(f'File {dest._path} exists')
-        if dest.is_cloud: self._accessor.copy(self._path, dest._path, recursive)
+        if dest.is_cloud: 
+            cloud_copy(self._accessor.filesys, self._cloudpath, dest._accessor.filesys, dest._cloudpath, recursive = recursive)
+            dest._invalidate(recursive = recursive)
         else: self._accessor.get(self._path, dest._path, recursive)
         return dest
     
@@ -1182,7 +1362,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         if await dest.async_exists() and not overwrite and await dest.async_is_file():
             if skip_errors: return dest
             raise Exception(f'File {dest._path} exists')
-        if dest.is_cloud: await self._accessor.async_copy(self._cloudpath, dest._cloudpath, recursive = recursive)
+        if dest.is_cloud: 
+            await async_cloud_copy(self._accessor.async_filesys, self._cloudpath, dest._accessor.async_filesys, dest._cloudpath, recursive = recursive)
+            dest._invalidate(recursive = recursive)
         else: await self._accessor.async_get(self._cloudpath, dest.string, recursive = recursive)
         return dest
 
@@ -1196,7 +1378,9 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         if dest.exists() and not overwrite and dest.is_file():
             if skip_errors: return dest
             raise Exception(f'File {dest._path} exists')
-        if dest.is_cloud: self._accessor.copy(self._path, dest._path, recursive)
+        if dest.is_cloud: 
+            cloud_copy(self._accessor.filesys, self._cloudpath, dest._accessor.filesys, dest._cloudpath, recursive = recursive)
+            dest._invalidate(recursive = recursive)
         else: self._accessor.get(self._path, dest._path, recursive)
         return dest
     
@@ -1210,81 +1394,149 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         if await dest.async_exists() and not overwrite and await dest.async_is_file():
             if skip_errors: return dest
             raise Exception(f'File {dest._path} exists')
-        if dest.is_cloud: await self._accessor.async_copy(self._cloudpath, dest._cloudpath, recursive = recursive)
+        if dest.is_cloud: 
+            await async_cloud_copy(self._accessor.async_filesys, self._cloudpath, dest._accessor.async_filesys, dest._cloudpath, recursive = recursive)
+            dest._invalidate(recursive = recursive)
         else: await self._accessor.async_get(self._cloudpath, dest.string, recursive = recursive)
         return dest
 
     def put(self, src: PathLike, recursive: bool = False, callback: Optional[Callable] = None, **kwargs):
         """
         Copy file(s) from src to this FilePath
-        WIP support for cloud-to-cloud
+        Cloud sources are copied server-side within a provider and streamed across providers
         """
         src = self._get_pathlike(src)
-        assert not src.is_cloud, 'Cloud to Cloud support not supported at this time'
-        return self._accessor.put(src.string, self._cloudpath, recursive = recursive, callback = callback)
+        if src.is_cloud: rez = cloud_copy(src._accessor.filesys, src._cloudpath, self._accessor.filesys, self._cloudpath, recursive = recursive, callback = callback)
+        else: rez = self._accessor.put(src.string, self._cloudpath, recursive = recursive, callback = callback)
+        self._invalidate(recursive = True)
+        return rez
     
     async def async_put(self, src: PathLike, recursive: bool = False, callback: Optional[Callable] = None, **kwargs):
         """
         Copy file(s) from src to this FilePath
-        WIP support for cloud-to-cloud
+        Cloud sources are copied server-side within a provider and streamed across providers
         """
         src = self._get_pathlike(src)
-        assert not src.is_cloud, 'Cloud to Cloud support not supported at this time'
-        return await self._accessor.async_put(src.string, self._cloudpath, recursive = recursive, callback = callback)
+        if src.is_cloud: rez = await async_cloud_copy(src._accessor.async_filesys, src._cloudpath, self._accessor.async_filesys, self._cloudpath, recursive = recursive, callback = callback)
+        else: rez = await self._accessor.async_put(src.string, self._cloudpath, recursive = recursive, callback = callback)
+        self._invalidate(recursive = True)
+        return rez
 
     def put_file(self, src: PathLike, callback: Optional[Callable] = None, **kwargs):
         """
         Copy single file to remote
-        WIP support for cloud-to-cloud
+        Cloud sources are copied server-side within a provider and streamed across providers
         """
         src = self._get_pathlike(src)
-        assert not src.is_cloud, 'Cloud to Cloud support not supported at this time'
-        return self._accessor.put_file(src.string, self._cloudpath, callback = callback)
+        if src.is_cloud: rez = cloud_copy(src._accessor.filesys, src._cloudpath, self._accessor.filesys, self._cloudpath, callback = callback)
+        else: rez = self._accessor.put_file(src.string, self._cloudpath, callback = callback)
+        self._invalidate()
+        return rez
     
     async def async_put_file(self, src: PathLike, callback: Optional[Callable] = None, **kwargs):
         """
         Copy single file to remote
-        WIP support for cloud-to-cloud
+        Cloud sources are copied server-side within a provider and streamed across providers
         """
         src = self._get_pathlike(src)
-        assert not src.is_cloud, 'Cloud to Cloud support not supported at this time'
-        return await self._accessor.async_put_file(src.string, self._cloudpath, callback = callback)
+        if src.is_cloud: rez = await async_cloud_copy(src._accessor.async_filesys, src._cloudpath, self._accessor.async_filesys, self._cloudpath, callback = callback)
+        else: rez = await self._accessor.async_put_file(src.string, self._cloudpath, callback = callback)
+        self._invalidate()
+        return rez
     
     def get(self, dest: PathLike, recursive: bool = False, callback: Optional[Callable] = None, **kwargs):
         """
-        Copy the remote file(s) to dest (local)
-        WIP support for cloud-to-cloud
+        Copy the remote file(s) to dest (local or cloud)
+        Cloud destinations are copied server-side within a provider and streamed across providers
         """
         dest = self._get_pathlike(dest)
-        assert not dest.is_cloud, 'Cloud to Cloud support not supported at this time'
-        return self._accessor.get(self._cloudpath, dest.string, recursive = recursive, callback = callback)
+        if not dest.is_cloud: return self._accessor.get(self._cloudpath, dest.string, recursive = recursive, callback = callback)
+        rez = cloud_copy(self._accessor.filesys, self._cloudpath, dest._accessor.filesys, dest._cloudpath, recursive = recursive, callback = callback)
+        dest._invalidate(recursive = True)
+        return rez
     
     async def async_get(self, dest: PathLike, recursive: bool = False, callback: Optional[Callable] = None, **kwargs):
         """
-        Copy the remote file(s) to dest (local)
-        WIP support for cloud-to-cloud
+        Copy the remote file(s) to dest (local or cloud)
+        Cloud destinations are copied server-side within a provider and streamed across providers
         """
         dest = self._get_pathlike(dest)
-        assert not dest.is_cloud, 'Cloud to Cloud support not supported at this time'
-        return await self._accessor.async_get(self._cloudpath, dest.string, recursive = recursive, callback = callback)
+        if not dest.is_cloud: return await self._accessor.async_get(self._cloudpath, dest.string, recursive = recursive, callback = callback)
+        rez = await async_cloud_copy(self._accessor.async_filesys, self._cloudpath, dest._accessor.async_filesys, dest._cloudpath, recursive = recursive, callback = callback)
+        dest._invalidate(recursive = True)
+        return rez
 
     def get_file(self, dest: PathLike, callback: Optional[Callable] = None, **kwargs):
         """
-        Copies this file to dest (local)
-        WIP support for cloud-to-cloud
+        Copies this file to dest (local or cloud)
+        Cloud destinations are copied server-side within a provider and streamed across providers
         """
         dest = self._get_pathlike(dest)
-        assert not dest.is_cloud, 'Cloud to Cloud support not supported at this time'
-        return self._accessor.get_file(self._cloudpath, dest.string, callback = callback)
+        if not dest.is_cloud: return self._accessor.get_file(self._cloudpath, dest.string, callback = callback)
+        rez = cloud_copy(self._accessor.filesys, self._cloudpath, dest._accessor.filesys, dest._cloudpath, callback = callback)
+        dest._invalidate()
+        return rez
     
     async def async_get_file(self, dest: PathLike, callback: Optional[Callable] = None, **kwargs):
         """
-        Copies this file to dest (local)
-        WIP support for cloud-to-cloud
+        Copies this file to dest (local or cloud)
+        Cloud destinations are copied server-side within a provider and streamed across providers
         """
         dest = self._get_pathlike(dest)
-        assert not dest.is_cloud, 'Cloud to Cloud support not supported at this time'
-        return await self._accessor.async_get_file(self._cloudpath, dest.string, callback = callback)
+        if not dest.is_cloud: return await self._accessor.async_get_file(self._cloudpath, dest.string, callback = callback)
+        rez = await async_cloud_copy(self._accessor.async_filesys, self._cloudpath, dest._accessor.async_filesys, dest._cloudpath, callback = callback)
+        dest._invalidate()
+        return rez
+
+    def upload(self, src: PathLike, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, resume: bool = True, callback: Optional[Callable] = None) -> Type['PathzCFSPath']:
+        """
+        Uploads the local file src to this path in parts sent concurrently,
+        through a multipart upload on S3 / MinIO or composed parts on GCS.
+        An interrupted upload resumes with the missing parts if resume.
+        callback is called with (bytes sent, total bytes) after each part.
+        """
+        src = self._get_pathlike(src)
+        assert not src.is_cloud, 'upload takes a local file, use put for cloud sources'
+        upload_file(self._accessor.filesys, src.string, self._cloudpath, part_size = part_size, max_concurrency = max_concurrency, resume = resume, callback = callback)
+        self._invalidate()
+        return self
+
+    async def async_upload(self, src: PathLike, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, resume: bool = True, callback: Optional[Callable] = None) -> Type['PathzCFSPath']:
+        """
+        Uploads the local file src to this path in parts sent concurrently,
+        through a multipart upload on S3 / MinIO or composed parts on GCS.
+        An interrupted upload resumes with the missing parts if resume.
+        callback is called with (bytes sent, total bytes) after each part.
+        """
+        src = self._get_pathlike(src)
+        assert not src.is_cloud, 'upload takes a local file, use put for cloud sources'
+        await async_upload_file(self._accessor.async_filesys, src.string, self._cloudpath, part_size = part_size, max_concurrency = max_concurrency, resume = resume, callback = callback)
+        self._invalidate()
+        return self
+
+    def download(self, dest: PathLike, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, resume: bool = True, callback: Optional[Callable] = None):
+        """
+        Downloads this file to dest (local) with concurrent ranged reads.
+        An interrupted download resumes with the missing parts if resume
+        and the remote file is unchanged.
+        callback is called with (bytes received, total bytes) after each part.
+        """
+        dest = self._get_pathlike(dest)
+        assert not dest.is_cloud, 'download takes a local file, use get for cloud destinations'
+        download_file(self._accessor.filesys, self._cloudpath, dest.string, part_size = part_size, max_concurrency = max_concurrency, resume = resume, callback = callback)
+        return dest
+
+    async def async_download(self, dest: PathLike, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, resume: bool = True, callback: Optional[Callable] = None):
+        """
+        Downloads this file to dest (local) with concurrent ranged reads.
+        An interrupted download resumes with the missing parts if resume
+        and the remote file is unchanged.
+        callback is called with (bytes received, total bytes) after each part.
+        """
+        dest = self._get_pathlike(dest)
+        assert not dest.is_cloud, 'download takes a local file, use get for cloud destinations'
+        await async_download_file(self._accessor.async_filesys, self._cloudpath, dest.string, part_size = part_size, max_concurrency = max_concurrency, resume = resume, callback = callback)
+        return dest
         
 
     def is_mount(self) -> bool:
@@ -1577,6 +1829,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
         return self._accessor.url(self._cloudpath, **kwargs)
     
     def setxattr(self, **kwargs):
+        self._invalidate()
         return self._accessor.setxattr(self._cloudpath, **kwargs)
     
     async def async_url(self, **kwargs):
@@ -1585,6 +1838,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
     def cloze(self, **kwargs):
         if self._fileio: 
             self._fileio.commit()
+        self._invalidate(recursive = True)
         return self._accessor.invalidate_cache(self._cloudpath)
     
     async def async_cloze(self, **kwargs):
@@ -1592,6 +1846,7 @@ class PathzCFSPath(Path, PathzCFSPurePath):
             #self._fileio.flush(True)
             #self._fileio.commit()
         #_f = self._accessor.open(self._cloudpath)
+        self._invalidate(recursive = True)
         return await self._accessor.async_invalidate_cache(self._cloudpath)
 
     
@@ -0,0 +1,527 @@
+"""
+Parallel transfers of large objects between local files and cloud paths.
+
+Uploads split the local file into parts that are sent concurrently: S3 and
+MinIO through a multipart upload, GCS as temporary part objects that are
+composed into the destination. Downloads issue concurrent ranged GETs into
+a temporary file that is moved over the destination once complete. Ranged
+reads are pinned to the version seen when the transfer starts (GCS
+`generation`, S3 `VersionId` or `IfMatch` on the ETag), so a rewrite during
+the transfer raises `ObjectChangedError` instead of mixing two versions.
+
+Progress is kept in a `<local file>.pathz-transfer` state file, so running an
+interrupted transfer again only moves the parts that are missing. The state
+is discarded when the local file or remote object changed in between.
+
+The coroutines use the private async methods of the fsspec filesystems
+(`_call_s3`, `_cat_file`, `_pipe_file`, `_merge`, ...) and run on the loop of
+the sync filesystem for the sync entry points.
+"""
+
+import os
+import json
+import math
+import uuid
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from ..aiopathz.wrap import to_thread
+
+__all__ = (
+    'DEFAULT_PART_SIZE',
+    'DEFAULT_CONCURRENCY',
+    'upload_file',
+    'async_upload_file',
+    'download_file',
+    'async_download_file',
+    'cloud_copy',
+    'async_cloud_copy',
+    'ObjectChangedError',
+)
+
+MiB = 1024 * 1024
+DEFAULT_PART_SIZE = 64 * MiB
+DEFAULT_CONCURRENCY = 8
+# same provider copies above this size run as concurrent part copies
+MULTIPART_COPY_THRESHOLD = 512 * MiB
+# S3 rejects parts below 5 MiB except the last one, above 5 GiB, and more than 10000 parts
+_MIN_PART_SIZE = 5 * MiB
+_MAX_PART_SIZE = 5 * 1024 * MiB
+_MAX_PARTS = 10000
+# GCS composes at most 32 objects per request
+_COMPOSE_LIMIT = 32
+_STATE_SUFFIX = '.pathz-transfer'
+_PARTIAL_SUFFIX = '.pathz-partial'
+
+ProgressCallback = Callable[[int, int], Any]
+
+
+def _is_gcs(fs) -> bool:
+    protocol = fs.protocol
+    if isinstance(protocol, str): protocol = (protocol,)
+    return 'gs' in protocol or 'gcs' in protocol
+
+
+class ObjectChangedError(OSError):
+    "The object was rewritten or removed while it was read."
+
+
+def _is_s3(fs) -> bool:
+    protocol = fs.protocol
+    if isinstance(protocol, str): protocol = (protocol,)
+    return 's3' in protocol or 's3a' in protocol
+
+
+def _s3_error_code(error: BaseException) -> Optional[str]:
+    # s3fs translates botocore errors into OSErrors caused by them
+    response = getattr(error.__cause__, 'response', None) or {}
+    return response.get('Error', {}).get('Code')
+
+
+async def _s3_read_range(fs, rpath: str, start: int, end: int, info: Dict[str, Any]) -> bytes:
+    bucket, key, _ = fs.split_path(rpath)
+    pin = {'VersionId': info['VersionId']} if info.get('VersionId') else {'IfMatch': info['ETag']}
+    try:
+        out = await fs._call_s3('get_object', Bucket = bucket, Key = key, Range = f'bytes={start}-{end - 1}', **pin)
+    except OSError as error:
+        if _s3_error_code(error) in {'PreconditionFailed', 'NoSuchVersion', 'NoSuchKey'}: raise ObjectChangedError(rpath) from error
+        raise
+    try: data = await out['Body'].read()
+    finally: out['Body'].close()
+    etag = info.get('ETag')
+    if etag and out.get('ETag', etag) != etag: raise ObjectChangedError(rpath)
+    return data
+
+
+async def _gcs_read_range(fs, rpath: str, start: int, end: int, info: Dict[str, Any]) -> bytes:
+    generation = str(info['generation'])
+    try:
+        headers, data = await fs._call('GET', fs.url(rpath, generation = generation), headers = {'Range': f'bytes={start}-{end - 1}'})
+    except FileNotFoundError as error:
+        # the generation is gone once the object is rewritten or removed
+        raise ObjectChangedError(rpath) from error
+    if headers.get('x-goog-generation', generation) != generation: raise ObjectChangedError(rpath)
+    return data
+
+
+def _versioned_reader(fs, info: Dict[str, Any]) -> Optional[Callable]:
+    "Ranged read coroutine pinned to the version of `info`, None if reads can't be pinned."
+    if _is_gcs(fs) and info.get('generation'): return _gcs_read_range
+    if _is_s3(fs) and (info.get('VersionId') or info.get('ETag')): return _s3_read_range
+    return None
+
+
+async def _read_remote_range(fs, rpath: str, start: int, end: int, info: Dict[str, Any]) -> bytes:
+    """
+    Ranged read of `rpath` pinned to the version of `info` when the provider
+    supports it, raises ObjectChangedError once the object was rewritten.
+    """
+    reader = _versioned_reader(fs, info)
+    if reader is None: return await fs._cat_file(rpath, start = start, end = end)
+    return await reader(fs, rpath, start, end, info)
+
+
+def _get_part_size(size: int, part_size: Optional[int] = None) -> int:
+    part_size = max(part_size or DEFAULT_PART_SIZE, _MIN_PART_SIZE)
+    while math.ceil(size / part_size) > _MAX_PARTS: part_size *= 2
+    return part_size
+
+
+def _get_parts(size: int, part_size: int) -> List[Tuple[int, int, int]]:
+    "Returns (part number, offset, length) of each part, numbered from 1."
+    return [(n, offset, min(part_size, size - offset)) for n, offset in enumerate(range(0, size, part_size), 1)]
+
+
+def _read_range(path: str, offset: int, length: int) -> bytes:
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def _write_range(path: str, offset: int, data: bytes):
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def _remote_tag(info: Dict[str, Any]) -> Optional[str]:
+    "Value that changes whenever the remote object is rewritten."
+    for key in ('generation', 'ETag', 'etag', 'md5Hash'):
+        if info.get(key): return str(info[key])
+    return None
+
+
+async def _run_parts(func: Callable, parts: List[Tuple], limit: Union[int, asyncio.Semaphore]):
+    """
+    Runs `func(*part)` for every part with at most `limit` running, `limit`
+    may be a semaphore shared with other transfers.
+    Cancels the remaining parts on the first error.
+    """
+    semaphore = asyncio.Semaphore(limit) if isinstance(limit, int) else limit
+
+    async def run(part):
+        async with semaphore:
+            return await func(*part)
+
+    tasks = [asyncio.ensure_future(run(part)) for part in parts]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions = True)
+        raise
+
+
+class _TransferState:
+    """
+    Completed parts of a transfer, saved next to the local file after each part.
+    Transfers without a local file are not resumable.
+    """
+
+    def __init__(self, local_path: Optional[str], resume: bool = True, **expected):
+        self.path = local_path + _STATE_SUFFIX if local_path else None
+        self.resume = resume and bool(local_path)
+        self.data: Dict[str, Any] = {**expected, 'parts': {}}
+        if not self.resume or not os.path.exists(self.path): return
+        try:
+            with open(self.path, 'r') as f: saved = json.load(f)
+        except (OSError, ValueError): return
+        if all(saved.get(k) == v for k, v in expected.items()): self.data = saved
+
+    @property
+    def parts(self) -> Dict[str, Any]:
+        return self.data['parts']
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def update(self, **kwargs):
+        self.data.update(kwargs)
+        self.save()
+
+    def add_part(self, number: int, value: Any = True):
+        self.parts[str(number)] = value
+        self.save()
+
+    def save(self):
+        if not self.resume: return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f: json.dump(self.data, f)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if not self.path: return
+        try: os.remove(self.path)
+        except FileNotFoundError: pass
+
+
+def _as_progress_callback(callback: Any) -> Optional[ProgressCallback]:
+    """
+    Adapts a fsspec `Callback`, as taken by `put` / `get`, to (done, total) calls.
+    """
+    if callback is None or not hasattr(callback, 'absolute_update'): return callback
+
+    def update(done: int, total: int):
+        callback.set_size(total)
+        callback.absolute_update(done)
+    return update
+
+
+class _Progress:
+    def __init__(self, total: int, callback: Optional[ProgressCallback] = None):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+
+    def add(self, nbytes: int):
+        self.done += nbytes
+        if self.callback: self.callback(self.done, self.total)
+
+
+"""
+Uploads
+"""
+
+async def _s3_list_parts(fs, bucket: str, key: str, upload_id: str) -> Dict[int, str]:
+    parts, marker = {}, 0
+    while True:
+        out = await fs._call_s3('list_parts', Bucket = bucket, Key = key, UploadId = upload_id, PartNumberMarker = marker)
+        for part in out.get('Parts', []): parts[part['PartNumber']] = part['ETag']
+        if not out.get('IsTruncated'): return parts
+        marker = out['NextPartNumberMarker']
+
+
+async def _s3_upload(fs, read_part: Callable, rpath: str, parts: List[Tuple[int, int, int]], limit: Union[int, asyncio.Semaphore], state: _TransferState, progress: _Progress):
+    bucket, key, _ = fs.split_path(rpath)
+    upload_id = state.get('upload_id')
+    if upload_id:
+        try:
+            uploaded = await _s3_list_parts(fs, bucket, key, upload_id)
+            state.data['parts'] = {n: etag for n, etag in state.parts.items() if uploaded.get(int(n)) == etag}
+        except Exception:
+            upload_id = None
+    if not upload_id:
+        out = await fs._call_s3('create_multipart_upload', Bucket = bucket, Key = key)
+        upload_id = out['UploadId']
+        state.update(upload_id = upload_id, parts = {})
+
+    async def upload_part(number: int, offset: int, length: int):
+        data = await read_part(offset, length)
+        out = await fs._call_s3('upload_part', Bucket = bucket, Key = key, UploadId = upload_id, PartNumber = number, Body = data)
+        state.add_part(number, out['ETag'])
+        progress.add(length)
+
+    todo = [p for p in parts if str(p[0]) not in state.parts]
+    progress.add(sum(p[2] for p in parts) - sum(p[2] for p in todo))
+    try:
+        await _run_parts(upload_part, todo, limit)
+    except BaseException:
+        # Without a saved state the parts can't be reused, so free them.
+        if not state.resume: await fs._call_s3('abort_multipart_upload', Bucket = bucket, Key = key, UploadId = upload_id)
+        raise
+    etags = [{'PartNumber': n, 'ETag': state.parts[str(n)]} for n, _, _ in parts]
+    await fs._call_s3('complete_multipart_upload', Bucket = bucket, Key = key, UploadId = upload_id, MultipartUpload = {'Parts': etags})
+
+
+async def _gcs_compose(fs, rpath: str, sources: List[str], prefix: str) -> List[str]:
+    """
+    Composes `sources` into `rpath`, through intermediate objects under `prefix`
+    when there are more than the 32 GCS accepts at once.
+    Returns the intermediate objects to remove.
+    """
+    created, level = [], 0
+    while len(sources) > _COMPOSE_LIMIT:
+        groups = [sources[i:i + _COMPOSE_LIMIT] for i in range(0, len(sources), _COMPOSE_LIMIT)]
+        targets = [f'{prefix}/compose-{level}-{i:05d}' for i in range(len(groups))]
+        await asyncio.gather(*[fs._merge(t, g) for t, g in zip(targets, groups)])
+        created += targets
+        sources, level = targets, level + 1
+    await fs._merge(rpath, sources)
+    return created
+
+
+async def _gcs_upload(fs, read_part: Callable, rpath: str, parts: List[Tuple[int, int, int]], limit: Union[int, asyncio.Semaphore], state: _TransferState, progress: _Progress):
+    upload_id = state.get('upload_id')
+    if not upload_id:
+        upload_id = uuid.uuid4().hex
+        state.update(upload_id = upload_id, parts = {})
+    prefix = f'{rpath}.pathz-parts-{upload_id}'
+    part_paths = [f'{prefix}/{n:05d}' for n, _, _ in parts]
+
+    async def upload_part(number: int, offset: int, length: int):
+        data = await read_part(offset, length)
+        await fs._pipe_file(part_paths[number - 1], data)
+        state.add_part(number)
+        progress.add(length)
+
+    todo = [p for p in parts if str(p[0]) not in state.parts]
+    # Parts of an earlier run may have been removed since.
+    if len(todo) < len(parts):
+        for n, offset, length in parts:
+            if str(n) not in state.parts: continue
+            try: info = await fs._info(part_paths[n - 1])
+            except FileNotFoundError: info = {}
+            if info.get('size') != length:
+                del state.parts[str(n)]
+                todo.append((n, offset, length))
+    progress.add(sum(p[2] for p in parts) - sum(p[2] for p in todo))
+    try:
+        await _run_parts(upload_part, todo, limit)
+    except BaseException:
+        if not state.resume: await fs._rm(prefix, recursive = True)
+        raise
+    created = await _gcs_compose(fs, rpath, part_paths, prefix)
+    await fs._rm(part_paths + created)
+
+
+async def _upload_parts(fs, read_part: Callable, rpath: str, size: int, part_size: int, limit: Union[int, asyncio.Semaphore], state: _TransferState, progress: _Progress):
+    """
+    Writes `size` bytes returned by `read_part(offset, length)` to `rpath`,
+    in a single request if they fit in one part.
+    """
+    if size <= part_size:
+        async def upload_whole():
+            await fs._pipe_file(rpath, await read_part(0, size))
+            progress.add(size)
+        return await _run_parts(upload_whole, [()], limit)
+    parts = _get_parts(size, part_size)
+    if _is_gcs(fs): await _gcs_upload(fs, read_part, rpath, parts, limit, state, progress)
+    else: await _s3_upload(fs, read_part, rpath, parts, limit, state, progress)
+
+
+async def async_upload_file(fs, lpath: str, rpath: str, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, resume: bool = True, callback: Optional[ProgressCallback] = None):
+    """
+    Uploads the local file `lpath` to `rpath` in parts sent concurrently.
+    :param fs: async fsspec filesystem of `rpath` (s3fs or gcsfs)
+    :param str lpath: local file path
+    :param str rpath: remote path without uri scheme
+    :param int part_size: bytes per part (default 64 MiB, at least 5 MiB)
+    :param int max_concurrency: parts sent at once (default 8)
+    :param bool resume: keep a state file to resume an interrupted upload (default True)
+    :param callback: called with (bytes sent, total bytes) after each part
+    """
+    size = os.path.getsize(lpath)
+    part_size = _get_part_size(size, part_size)
+    state = _TransferState(lpath, resume = resume, kind = 'upload', remote = rpath, size = size, mtime = os.path.getmtime(lpath), part_size = part_size)
+
+    async def read_part(offset: int, length: int) -> bytes:
+        return await to_thread(_read_range, lpath, offset, length)
+
+    await _upload_parts(fs, read_part, rpath, size, part_size, max_concurrency or DEFAULT_CONCURRENCY, state, _Progress(size, callback))
+    state.remove()
+    fs.invalidate_cache(rpath)
+
+
+def upload_file(fs, lpath: str, rpath: str, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, resume: bool = True, callback: Optional[ProgressCallback] = None):
+    """
+    Sync version of `async_upload_file`, run on the loop of the sync filesystem `fs`.
+    """
+    from fsspec.asyn import sync
+    return sync(fs.loop, async_upload_file, fs, lpath, rpath, part_size = part_size, max_concurrency = max_concurrency, resume = resume, callback = callback)
+
+
+"""
+Downloads
+"""
+
+async def async_download_file(fs, rpath: str, lpath: str, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, resume: bool = True, callback: Optional[ProgressCallback] = None):
+    """
+    Downloads `rpath` to the local file `lpath` with concurrent ranged reads.
+    :param fs: async fsspec filesystem of `rpath` (s3fs or gcsfs)
+    :param str rpath: remote path without uri scheme
+    :param str lpath: local file path
+    :param int part_size: bytes per ranged read (default 64 MiB)
+    :param int max_concurrency: reads issued at once (default 8)
+    :param bool resume: keep a state file to resume an interrupted download (default True)
+    :param callback: called with (bytes received, total bytes) after each part
+    """
+    info = await fs._info(rpath)
+    size = info['size']
+    part_size = _get_part_size(size, part_size)
+    max_concurrency = max_concurrency or DEFAULT_CONCURRENCY
+    state = _TransferState(lpath, resume = resume, kind = 'download', remote = rpath, size = size, tag = _remote_tag(info), part_size = part_size)
+    partial = lpath + _PARTIAL_SUFFIX
+    if not state.parts or not os.path.exists(partial):
+        state.data['parts'] = {}
+        with open(partial, 'wb') as f: f.truncate(size)
+    progress = _Progress(size, callback)
+
+    async def download_part(number: int, offset: int, length: int):
+        # pinned to the version of `info`, so parts of two versions are never mixed
+        data = await _read_remote_range(fs, rpath, offset, offset + length, info)
+        await to_thread(_write_range, partial, offset, data)
+        state.add_part(number)
+        progress.add(length)
+
+    parts = _get_parts(size, part_size)
+    todo = [p for p in parts if str(p[0]) not in state.parts]
+    progress.add(size - sum(p[2] for p in todo))
+    try:
+        await _run_parts(download_part, todo, max_concurrency)
+    except ObjectChangedError:
+        # the parts already received belong to the old version
+        os.remove(partial)
+        state.remove()
+        raise
+    except BaseException:
+        if not state.resume: os.remove(partial)
+        raise
+    os.replace(partial, lpath)
+    state.remove()
+
+
+def download_file(fs, rpath: str, lpath: str, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, resume: bool = True, callback: Optional[ProgressCallback] = None):
+    """
+    Sync version of `async_download_file`, run on the loop of the sync filesystem `fs`.
+    """
+    from fsspec.asyn import sync
+    return sync(fs.loop, async_download_file, fs, rpath, lpath, part_size = part_size, max_concurrency = max_concurrency, resume = resume, callback = callback)
+
+
+"""
+Cloud to Cloud
+"""
+
+async def _s3_part_copy(fs, src: str, dst: str, size: int, part_size: int, limit: Union[int, asyncio.Semaphore], progress: _Progress):
+    "Copies `src` to `dst` with concurrent UploadPartCopy requests."
+    bucket, key, _ = fs.split_path(dst)
+    upload_id = (await fs._call_s3('create_multipart_upload', Bucket = bucket, Key = key))['UploadId']
+
+    async def copy_part(number: int, offset: int, length: int):
+        out = await fs._call_s3('upload_part_copy', Bucket = bucket, Key = key, UploadId = upload_id, PartNumber = number, CopySource = src, CopySourceRange = f'bytes={offset}-{offset + length - 1}')
+        progress.add(length)
+        return {'PartNumber': number, 'ETag': out['CopyPartResult']['ETag']}
+
+    try:
+        etags = await _run_parts(copy_part, _get_parts(size, part_size), limit)
+    except BaseException:
+        await fs._call_s3('abort_multipart_upload', Bucket = bucket, Key = key, UploadId = upload_id)
+        raise
+    await fs._call_s3('complete_multipart_upload', Bucket = bucket, Key = key, UploadId = upload_id, MultipartUpload = {'Parts': etags})
+
+
+async def _copy_object(src_fs, src: str, dst_fs, dst: str, part_size: Optional[int], limit: Union[int, asyncio.Semaphore], callback: Optional[ProgressCallback]):
+    info = await src_fs._info(src)
+    size = info['size']
+    progress = _Progress(size, callback)
+    if src_fs is dst_fs:
+        # Same provider: the bytes never leave it. GCS rewrites the object,
+        # S3 / MinIO copy large objects in concurrent parts.
+        part_size = min(_get_part_size(size, part_size), _MAX_PART_SIZE)
+        if _is_gcs(src_fs) or size <= max(MULTIPART_COPY_THRESHOLD, part_size): 
+            await src_fs._cp_file(src, dst)
+            progress.add(size)
+        else: await _s3_part_copy(src_fs, src, dst, size, part_size, limit, progress)
+    else:
+        # Across providers the parts are streamed, at most `limit` in memory.
+        part_size = _get_part_size(size, part_size)
+
+        async def read_part(offset: int, length: int) -> bytes:
+            return await _read_remote_range(src_fs, src, offset, offset + length, info)
+
+        await _upload_parts(dst_fs, read_part, dst, size, part_size, limit, _TransferState(None), progress)
+    dst_fs.invalidate_cache(dst)
+
+
+async def async_cloud_copy(src_fs, src: str, dst_fs, dst: str, recursive: bool = False, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None):
+    """
+    Copies `src` to `dst` between cloud paths.
+    Within the same filesystem the copy is server-side (S3 CopyObject /
+    UploadPartCopy, GCS rewrite). Between filesystems, e.g. GCS to S3 or S3 to
+    MinIO, parts are read with ranged GETs and written as a multipart upload
+    or composed GCS parts, keeping about `part_size * max_concurrency` bytes
+    in memory.
+    :param src_fs: async fsspec filesystem of `src`
+    :param str src: source path without uri scheme
+    :param dst_fs: async fsspec filesystem of `dst`
+    :param str dst: destination path without uri scheme
+    :param bool recursive: copy every file below `src` to the same relative path below `dst` (default False)
+    :param int part_size: bytes per part (default 64 MiB)
+    :param int max_concurrency: parts in flight at once (default 8)
+    :param callback: called with (bytes copied, total bytes) of each file after each part
+    :return: list of destination paths
+    """
+    max_concurrency = max_concurrency or DEFAULT_CONCURRENCY
+    callback = _as_progress_callback(callback)
+    if not recursive:
+        await _copy_object(src_fs, src, dst_fs, dst, part_size, max_concurrency, callback)
+        return [dst]
+    src = src.rstrip('/')
+    dst = dst.rstrip('/')
+    files = [(f, dst + f[len(src):]) for f in await src_fs._find(src)]
+    # One semaphore for the parts of every file bounds the memory in use.
+    parts_limit = asyncio.Semaphore(max_concurrency)
+
+    async def copy_one(src_file: str, dst_file: str):
+        await _copy_object(src_fs, src_file, dst_fs, dst_file, part_size, parts_limit, callback)
+        return dst_file
+
+    return await _run_parts(copy_one, files, max_concurrency)
+
+
+def cloud_copy(src_fs, src: str, dst_fs, dst: str, recursive: bool = False, part_size: Optional[int] = None, max_concurrency: Optional[int] = None, callback: Optional[ProgressCallback] = None):
+    """
+    Sync version of `async_cloud_copy`, run on the loop of the sync filesystem `dst_fs`.
+    """
+    from fsspec.asyn import sync
+    return sync(dst_fs.loop, async_cloud_copy, src_fs, src, dst_fs, dst, recursive = recursive, part_size = part_size, max_concurrency = max_concurrency, callback = callback)